@@ -11,25 +11,18 @@ __email__ = "contacto@rise-group.org"
 import time as tm
 import numpy as np
 from clusterpy.core.toolboxes.cluster.componentsAlg import AreaManager
-from clusterpy.core.toolboxes.cluster.componentsAlg import ExtendedMemory
-from clusterpy.core.toolboxes.cluster.componentsAlg import RegionMaker
-from multiprocessing import Pool, cpu_count
+from clusterpy.core.toolboxes.cluster.componentsAlg import makeRng
+from clusterpy.core.toolboxes.cluster.componentsAlg.searchbudget import makeDeadline
+from clusterpy.core.toolboxes.cluster.componentsAlg.workerpool import problemKey
+from clusterpy.core.toolboxes.cluster.componentsAlg.workerpool import sharedWorkerPool
+from clusterpy.core.toolboxes.cluster.componentsAlg.workerpool import constructSolution
+from clusterpy.core.toolboxes.cluster.componentsAlg.workerpool import improveSolution
 
 __all__ = ['execArisel']
 
-def constructPossible(am, pRegions, initialSolution, distanceType, distanceStat,
-                      selectionType, objectiveFunctionType):
-    """Create one instance of a region maker"""
-    rm = RegionMaker(am, pRegions,
-                     initialSolution = initialSolution,
-                     distanceType = distanceType,
-                     distanceStat = distanceStat,
-                     selectionType = selectionType,
-                     objectiveFunctionType = objectiveFunctionType)
-    return rm
-
 def execArisel(y, w, pRegions, inits = 3, initialSolution = [],
-               convTabu = 0, tabuLength = 10):
+               convTabu = 0, tabuLength = 10, tabuInits = 1, seed = None,
+               timeLimit = None, maxEvaluations = None):
     """Automatic Rationalization with Initial Seed Location
 
     ARiSeL, proposed by [Duque_Church2004]_ , aggregates N areas into P
@@ -58,6 +51,12 @@ def execArisel(y, w, pRegions, inits = 3, initialSolution = [],
     initial solution obtained so far.
 
 
+    The constructions and the Tabu Searches run in a pool of worker
+    processes that receives the problem once. The pool is kept for the next
+    runs on the same problem, until a run on another problem starts or
+    closeWorkerPools (from componentsAlg.workerpool) is called.
+
+
     The initial solution follows a "growing regions" strategy. It starts with
     a initial set of seeds (as many seed as regions) selected using the
     K-means++ algorithm. From those seeds, other neighbouring areas are
@@ -65,8 +64,8 @@ def execArisel(y, w, pRegions, inits = 3, initialSolution = [],
     has proven better results. ::
 
         Layer.cluster('arisel', vars, regions, <wType>, <std>, <inits>,
-        <initialSolution>, <convTabu>, <tabuLength>,
-        <dissolve>, <dataOperations>)
+        <initialSolution>, <convTabu>, <tabuLength>, <tabuInits>, <seed>,
+        <timeLimit>, <maxEvaluations>, <dissolve>, <dataOperations>)
 
     :keyword vars: Area attribute(s) (e.g. ['SAR1','SAR2'])
     :type vars: list
@@ -98,6 +97,23 @@ def execArisel(y, w, pRegions, inits = 3, initialSolution = [],
     :keyword tabuLength: Number of times a reverse move is prohibited. Default
     value *tabuLength = 10*.
     :type tabuLength: integer
+    :keyword tabuInits: Number of the best initial feasible solutions that are
+    improved with Tabu Search, in parallel. The best of the improved solutions
+    is returned. Default value *tabuInits = 1*.
+    :type tabuInits: integer
+    :keyword seed: Seed of the random number generator. Each initial solution
+    is constructed with its own generator, seeded from this one, so runs with
+    the same seed follow the same search trajectory. Default value seed = None
+    (the generator is seeded from the operating system).
+    :type seed: integer
+    :keyword timeLimit: Number of seconds after which the Tabu Searches stop
+    with the best solution found so far. The initial solutions are always
+    constructed. Default value *timeLimit = None* (no time limit).
+    :type timeLimit: float
+    :keyword maxEvaluations: Number of moves evaluated after which each Tabu
+    Search stops with the best solution found so far. Default value
+    *maxEvaluations = None* (no limit).
+    :type maxEvaluations: integer
     :keyword dissolve: If = 1, then you will get a "child" instance of the layer
     that contains the new regions. Default value *dissolve = 0*.  **Note:**.
     Each child layer is saved in the attribute *layer.results*.  The first
@@ -148,39 +164,35 @@ def execArisel(y, w, pRegions, inits = 3, initialSolution = [],
     distanceStat = "Centroid"
     objectiveFunctionType = "SS"
     selectionType = "Minimum"
-    am = AreaManager(w, y, distanceType)
-    extendedMemory = ExtendedMemory()
-
-    pool = Pool(processes = cpu_count())
-    procs = []
+    rng = makeRng(seed)
+    initSeeds = rng.randint(0, 2 ** 31 - 1, size=inits)
+    tabuInits = max(1, min(tabuInits, inits))
+    tabuSeeds = rng.randint(0, 2 ** 31 - 1, size=tabuInits)
 
     start = tm.time()
-    for dummy in xrange(inits):
-        ans = pool.apply_async(constructPossible, [am, pRegions,
-                                                   initialSolution,
-                                                   distanceType,
-                                                   distanceStat,
-                                                   selectionType,
-                                                   objectiveFunctionType])
-        procs.append(ans)
-
-    results = []
-    for p in procs:
-        results.append(p.get())
-
-    tmp_ans = extendedMemory
-    for rm in results:
-        if rm.objInfo < tmp_ans.objInfo:
-            tmp_ans = rm
-    rm = tmp_ans
-    extendedMemory.updateExtendedMemory(rm)
-
-    rm.recoverFromExtendedMemory(extendedMemory)
-    print "INITIAL SOLUTION: ", rm.returnRegions(), "\nINITIAL OF: ", rm.objInfo
-    rm.tabuMove(tabuLength=tabuLength, convTabu=convTabu)
+    deadline = makeDeadline(timeLimit, start)
+    options = {"distanceType": distanceType,
+               "distanceStat": distanceStat,
+               "selectionType": selectionType,
+               "objectiveFunctionType": objectiveFunctionType}
+    workerPool = sharedWorkerPool(problemKey(y, w, **options),
+                                  lambda: AreaManager(w, y, distanceType,
+                                                      storage="arrays"),
+                                  **options)
+    initSolutions = workerPool.run(constructSolution,
+                                   [(pRegions, initialSolution, int(s))
+                                    for s in initSeeds])
+    initSolutions.sort(key=lambda solution: solution[0])
+    initOf, initLabels = initSolutions[0]
+    print "INITIAL SOLUTION: ", initLabels.tolist(), "\nINITIAL OF: ", initOf
+    results = workerPool.run(improveSolution,
+                             [(labels, int(s), tabuLength, convTabu,
+                               deadline, maxEvaluations)
+                              for (dummy, labels), s
+                              in zip(initSolutions, tabuSeeds)])
+    best = min(results, key=lambda result: result[0])
+    Of, Sol, dummy, terminationReason = best
     time2 = tm.time() - start
-    Sol = rm.regions
-    Of = rm.objInfo
     print "FINAL SOLUTION: ", Sol, "\nFINAL OF: ", Of
     output = { "objectiveFunction": Of,
                "runningTime": time2,
@@ -190,5 +202,7 @@ def execArisel(y, w, pRegions, inits = 3, initialSolution = [],
                "distanceType": distanceType,
                "distanceStat": distanceStat,
                "selectionType": selectionType,
-               "ObjectiveFuncionType": objectiveFunctionType}
+               "ObjectiveFuncionType": objectiveFunctionType,
+               "terminationReason": terminationReason,
+               "evaluations": sum([result[2] for result in results])}
     return output
@@ -11,11 +11,14 @@ __email__ = "contacto@rise-group.org"
 import time as tm
 from componentsAlg import AreaManager
 from componentsAlg import ExtendedMemory
-from componentsAlg import RegionMaker
+from componentsAlg.workerpool import multiStart
+from componentsAlg.workerpool import startSeeds
+from componentsAlg.searchbudget import makeDeadline
 
 __all__ = ['execAZP']
 
-def execAZP(y, w, pRegions, initialSolution=[]):
+def execAZP(y, w, pRegions, initialSolution=[], seed=None, restarts=1,
+            nJobs=1, timeLimit=None, maxEvaluations=None, dontLookBits=False):
     """Automatic Zoning Procedure (AZP) 
 
     AZP is a mildly steepest descent algorithm that aggregates N zones (areas)
@@ -38,7 +41,7 @@ def execAZP(y, w, pRegions, initialSolution=[]):
     neighbouring areas are assigned to its closest (in attribute space)
     growing region. This strategy has proven better results. ::
    
-        Layer.cluster('azp',vars,regions,<wType>,<std>,<initialSolution>,<dissolve>,<dataOperations>)
+        Layer.cluster('azp',vars,regions,<wType>,<std>,<initialSolution>,<seed>,<restarts>,<nJobs>,<timeLimit>,<maxEvaluations>,<dontLookBits>,<dissolve>,<dataOperations>)
 
     :keyword vars: Area attribute(s) (e.g. ['SAR1','SAR2']) 
     :type vars: list
@@ -50,6 +53,18 @@ def execAZP(y, w, pRegions, initialSolution=[]):
     :type std: binary
     :keyword initialSolution: List with a initial solution vector. It is useful when the user wants a solution that is not very different from a preexisting solution (e.g. municipalities,districts, etc.). Note that the number of regions will be the same as the number of regions in the initial feasible solution (regardless the value you assign to parameter "regions"). IMPORTANT: make sure you are entering a feasible solution and according to the W matrix you selected, otherwise the algorithm will not converge.
     :type initialSolution: list
+    :keyword seed: Seed of the random number generator. Runs with the same seed follow the same search trajectory. Default value seed = None (the generator is seeded from the operating system).
+    :type seed: integer
+    :keyword restarts: Number of independent starts (construction and local search) of the algorithm. Each start uses its own seed, drawn from seed, and the best solution is returned. Default value restarts = 1.
+    :type restarts: integer
+    :keyword nJobs: Number of processes that run the starts. The solution does not depend on it. Default value nJobs = 1.
+    :type nJobs: integer
+    :keyword timeLimit: Number of seconds after which the local search stops with the best solution found so far. The construction of a solution is not interrupted. Default value timeLimit = None (no time limit).
+    :type timeLimit: float
+    :keyword maxEvaluations: Number of moves evaluated after which the local search stops with the best solution found so far, in each start. Default value maxEvaluations = None (no limit).
+    :type maxEvaluations: integer
+    :keyword dontLookBits: If = True, the local search skips the areas that were examined without finding a move until they or one of their neighbours change region, and examines all of them again before stopping. It usually needs far fewer evaluations on large maps. Default value dontLookBits = False.
+    :type dontLookBits: boolean
     :keyword dissolve: If = 1, then you will get a "child" instance of the layer that contains the new regions. Default value dissolve = 0.  Note: Each child layer is saved in the attribute layer.results.  The first algorithm that you run with dissolve=1 will have a child layer in layer.results[0]; the second algorithm that you run with dissolve=1 will be in layer.results[1], and so on. You can export a child as a shapefile with layer.result[<1,2,3..>].exportArcData('filename') 
     :type dissolve: binary
     :keyword dataOperations: Dictionary which maps a variable to a list of operations to run on it. The dissolved layer will contains in it's data all the variables specified in this dictionary. Be sure to check the input layer's fieldNames before use this utility.
@@ -89,27 +104,25 @@ def execAZP(y, w, pRegions, initialSolution=[]):
     am = AreaManager(w,y, distanceType)
     start = tm.time()
 
-    #  CONSTRUCTION
+    #  CONSTRUCTION AND LOCAL SEARCH
 
-    print "Constructing regions"
-    rm = RegionMaker(am, pRegions, 
-                    initialSolution=initialSolution,
-                    distanceType=distanceType,
-                    distanceStat=distanceStat,
-                    selectionType=selectionType,
-                    objectiveFunctionType=objectiveFunctionType)
-    Sol = rm.returnRegions()
-    print "initial Solution: ", Sol
-    print "initial O.F: ", rm.objInfo
-
-    #  LOCAL SEARCH
-
-    print "Performing local search"
-    rm.AZPImproving()
-    rm.calcObj()
+    print "Constructing regions and performing local search from", restarts, "start(s)"
+    options = {"distanceType": distanceType,
+               "distanceStat": distanceStat,
+               "selectionType": selectionType,
+               "objectiveFunctionType": objectiveFunctionType,
+               "deadline": makeDeadline(timeLimit, start),
+               "maxEvaluations": maxEvaluations}
+    starts = [(pRegions, initialSolution, startSeed, "AZPImproving",
+               (dontLookBits,), True)
+              for startSeed in startSeeds(seed, restarts)]
+    results = multiStart(am, options, starts, nJobs)
+    for Of, Sol, stats in results:
+        print "initial O.F: ", stats["initialObjectiveFunction"],
+        print "final O.F: ", Of
+    Of, Sol, stats = min(results, key=lambda result: result[0])
+    startStats = [result[2] for result in results]
     time = tm.time() - start
-    Sol = rm.returnRegions()
-    Of = rm.objInfo
     print "FINAL SOLUTION: ", Sol
     print "FINAL O.F.: ", Of
     output = { "objectiveFunction": Of,
@@ -120,6 +133,9 @@ def execAZP(y, w, pRegions, initialSolution=[]):
     "distanceType": distanceType,
     "distanceStat": distanceStat,
     "selectionType": selectionType,
-    "ObjectiveFuncionType": objectiveFunctionType} 
+    "ObjectiveFuncionType": objectiveFunctionType,
+    "terminationReason": stats["terminationReason"],
+    "evaluations": sum([stats["evaluations"] for stats in startStats]),
+    "starts": startStats} 
     print "Done"
     return output
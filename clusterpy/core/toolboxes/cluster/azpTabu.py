@@ -12,11 +12,17 @@ import numpy
 import time as tm
 from componentsAlg import AreaManager
 from componentsAlg import BasicMemory
-from componentsAlg import RegionMaker
+from componentsAlg.workerpool import multiStart
+from componentsAlg.workerpool import startSeeds
+from componentsAlg.workerpool import startCheckpoints
+from componentsAlg.searchbudget import makeDeadline
 
 __all__ = ['execAZPTabu']
 
-def execAZPTabu(y, w, pRegions, initialSolution=[], convTabu=0, tabuLength=10 ):
+def execAZPTabu(y, w, pRegions, initialSolution=[], convTabu=0, tabuLength=10,
+                seed=None, scoringJobs=1, restarts=1, nJobs=1,
+                timeLimit=None, maxEvaluations=None, checkpoint=None,
+                checkpointEvery=100):
     """Tabu variant of Automatic Zoning Procedure (AZP-Tabu) 
 
     
@@ -49,7 +55,7 @@ def execAZPTabu(y, w, pRegions, initialSolution=[], convTabu=0, tabuLength=10 ):
     neighbouring areas are assigned to its closest (in attribute space)
     growing region. This strategy has proven better results. ::
 
-        layer.cluster('azpTabu',vars,regions,<wType>,<std>,<initialSolution>,<convTabu>,<tabuLength>,<dissolve>,<dataOperations>)
+        layer.cluster('azpTabu',vars,regions,<wType>,<std>,<initialSolution>,<convTabu>,<tabuLength>,<seed>,<scoringJobs>,<restarts>,<nJobs>,<timeLimit>,<maxEvaluations>,<checkpoint>,<checkpointEvery>,<dissolve>,<dataOperations>)
 
     :keyword vars: Area attribute(s) (e.g. ['SAR1','SAR2']) 
     :type vars: list
@@ -65,6 +71,22 @@ def execAZPTabu(y, w, pRegions, initialSolution=[], convTabu=0, tabuLength=10 ):
     :type convTabu: integer
     :keyword tabuLength: Number of times a reverse move is prohibited. Default value tabuLength = 10. 
     :type tabuLength: integer
+    :keyword seed: Seed of the random number generator. Runs with the same seed follow the same search trajectory. Default value seed = None (the generator is seeded from the operating system).
+    :type seed: integer
+    :keyword scoringJobs: Number of processes used to score the neighbouring solutions of the tabu search. The solution does not depend on it. Default value scoringJobs = 1.
+    :type scoringJobs: integer
+    :keyword restarts: Number of independent starts (construction and local search) of the algorithm. Each start uses its own seed, drawn from seed, and the best solution is returned. Default value restarts = 1.
+    :type restarts: integer
+    :keyword nJobs: Number of processes that run the starts. The solution does not depend on it. The starts do not score their moves in parallel when nJobs > 1. Default value nJobs = 1.
+    :type nJobs: integer
+    :keyword timeLimit: Number of seconds after which the local search stops with the best solution found so far. The construction of a solution is not interrupted. Default value timeLimit = None (no time limit).
+    :type timeLimit: float
+    :keyword maxEvaluations: Number of moves evaluated after which the local search stops with the best solution found so far, in each start. Default value maxEvaluations = None (no limit).
+    :type maxEvaluations: integer
+    :keyword checkpoint: File where the state of the local search is saved every checkpointEvery iterations. If the file exists, the saved search is continued instead of starting a new one, and it finds the same solution it would have found without interruption. An error is raised if the file was saved by a search with other options or number of regions. The file is removed when the search ends, unless it was stopped by timeLimit. With several starts, the number of the start is appended to the name of the file. Default value checkpoint = None (no checkpoints).
+    :type checkpoint: string
+    :keyword checkpointEvery: Number of iterations of the local search between checkpoints. Default value checkpointEvery = 100.
+    :type checkpointEvery: integer
     :keyword dissolve: If = 1, then you will get a "child" instance of the layer that contains the new regions. Default value = 0. Note:. Each child layer is saved in the attribute layer.results. The first algorithm that you run with dissolve=1 will have a child layer in layer.results[0]; the second algorithm that you run with dissolve=1 will be in layer.results[1], and so on. You can export a child as a shapefile with layer.result[<1,2,3..>].exportArcData('filename')
     :type dissolve: binary
     :keyword dataOperations: Dictionary which maps a variable to a list of operations to run on it. The dissolved layer will contains in it's data all the variables specified in this dictionary. Be sure to check the input layer's fieldNames before use this utility.
@@ -105,27 +127,29 @@ def execAZPTabu(y, w, pRegions, initialSolution=[], convTabu=0, tabuLength=10 ):
     am = AreaManager(w,y, distanceType)
     start = tm.time()
 
-    #  CONSTRUCTION
-
-    print "Constructing regions"
-    rm = RegionMaker(am, pRegions,
-                    initialSolution=initialSolution,
-                    distanceType=distanceType,
-                    distanceStat=distanceStat,
-                    selectionType=selectionType,
-                    objectiveFunctionType=objectiveFunctionType)
-    Sol = rm.returnRegions()
-    print "initial Solution: ", Sol
-    print "initial O.F: ", rm.objInfo
-
-    # LOCAL SEARCH
-
-    print "Performing local search"
-    rm.AZPTabuMove(tabuLength=tabuLength, convTabu=convTabu)
-    rm.calcObj()
+    #  CONSTRUCTION AND LOCAL SEARCH
+
+    print "Constructing regions and performing local search from", restarts, "start(s)"
+    options = {"distanceType": distanceType,
+               "distanceStat": distanceStat,
+               "selectionType": selectionType,
+               "objectiveFunctionType": objectiveFunctionType,
+               "deadline": makeDeadline(timeLimit, start),
+               "maxEvaluations": maxEvaluations,
+               "scoringJobs": scoringJobs if nJobs <= 1 else 1,
+               "checkpointEvery": checkpointEvery}
+    starts = [(pRegions, initialSolution, startSeed, "AZPTabuMove",
+               (tabuLength, convTabu), True, startCheckpoint)
+              for startSeed, startCheckpoint
+              in zip(startSeeds(seed, restarts),
+                     startCheckpoints(checkpoint, restarts))]
+    results = multiStart(am, options, starts, nJobs)
+    for Of, Sol, stats in results:
+        print "initial O.F: ", stats["initialObjectiveFunction"],
+        print "final O.F: ", Of
+    Of, Sol, stats = min(results, key=lambda result: result[0])
+    startStats = [result[2] for result in results]
     time = tm.time() - start
-    Sol = rm.returnRegions()
-    Of = rm.objInfo
     print "FINAL SOLUTION: ", Sol
     print "FINAL OF: ", Of
     output = { "objectiveFunction": Of,
@@ -136,6 +160,9 @@ def execAZPTabu(y, w, pRegions, initialSolution=[], convTabu=0, tabuLength=10 ):
     "distanceType": distanceType,
     "distanceStat": distanceStat,
     "selectionType": selectionType,
-    "ObjectiveFuncionType": objectiveFunctionType}
+    "ObjectiveFuncionType": objectiveFunctionType,
+    "terminationReason": stats["terminationReason"],
+    "evaluations": sum([stats["evaluations"] for stats in startStats]),
+    "starts": startStats}
     print "Done"
     return output
@@ -13,6 +13,7 @@ from clusterpy.core.toolboxes.cluster.componentsAlg.areamanager import AreaManag
 from clusterpy.core.toolboxes.cluster.componentsAlg.helperfunctions import calculateGetisG
 from clusterpy.core.toolboxes.cluster.componentsAlg.helperfunctions import quickSort2
 from clusterpy.core.toolboxes.cluster.componentsAlg.helperfunctions import neighborSort
+from clusterpy.core.toolboxes.cluster.componentsAlg.helperfunctions import makeRng
 from clusterpy.core.toolboxes.cluster.componentsAlg.memory import BasicMemory
 from clusterpy.core.toolboxes.cluster.componentsAlg.memory import ExtendedMemory
 from clusterpy.core.toolboxes.cluster.componentsAlg.regionmaker import RegionMaker
@@ -67,3 +67,92 @@ class AreaCl:
         except:
             dist = areaDistance[0]
         return dist
+
+class AreaArrays:
+    """
+    Collection of areas stored as a contiguous data matrix and a compressed
+    sparse row (CSR) contiguity structure. Items are read-only views that
+    behave as L{AreaCl} instances, so the arrays are shared (never copied)
+    among all the objects that use them.
+    """
+    def __init__(self, data, indptr, indices, thresholdVar=None, neighs=None):
+        """
+        @type data: numpy.ndarray
+        @param data: Matrix (areas x attributes) with the data of the areas.
+
+        @type indptr: numpy.ndarray
+        @param indptr: The neighbours of area i are indices[indptr[i]:indptr[i + 1]].
+
+        @type indices: numpy.ndarray
+        @param indices: Neighbour ids of all the areas.
+
+        @type thresholdVar: numpy.ndarray
+        @keyword thresholdVar: Value of the threshold variable of each area.
+
+        @type neighs: list
+        @keyword neighs: Neighbour ids of each area, as returned by
+        L{neighLists}, if they were already extracted from the CSR arrays.
+        """
+        self.data = data
+        self.indptr = indptr
+        self.indices = indices
+        self.thresholdVar = thresholdVar
+        self.neighs = neighs
+        self.n = data.shape[0]
+
+    def __len__(self):
+        return self.n
+
+    def __iter__(self):
+        return iter(xrange(self.n))
+
+    def __contains__(self, key):
+        return 0 <= key < self.n
+
+    def __getitem__(self, key):
+        if not 0 <= key < self.n:
+            raise KeyError(key)
+        return AreaView(self, key)
+
+    def keys(self):
+        return range(self.n)
+
+    def getNeighs(self, areaID):
+        """
+        Return the neighbour ids of an area as a numpy array view
+        """
+        return self.indices[self.indptr[areaID]:self.indptr[areaID + 1]]
+
+    def neighLists(self):
+        """
+        Return the neighbour ids of every area as a list of lists indexed
+        by area id. The lists are extracted from the CSR arrays on the first
+        call and then shared by all the users of the collection; they must
+        not be modified.
+        """
+        if self.neighs is None:
+            indptr = self.indptr.tolist()
+            indices = self.indices.tolist()
+            self.neighs = [indices[indptr[areaID]:indptr[areaID + 1]]
+                           for areaID in xrange(self.n)]
+        return self.neighs
+
+    def splitThresholdVar(self):
+        """
+        Return a new collection, sharing the same arrays, where the last
+        attribute is used as the threshold variable.
+        """
+        return AreaArrays(self.data[:, 0: -1], self.indptr, self.indices,
+                          thresholdVar=self.data[:, -1],
+                          neighs=self.neighs)
+
+class AreaView(AreaCl):
+    """
+    Area of an L{AreaArrays} collection.
+    """
+    def __init__(self, areaArrays, id):
+        self.id = id
+        self.neighs = areaArrays.neighLists()[id]
+        self.data = areaArrays.data[id]
+        if areaArrays.thresholdVar is not None:
+            self.thresholdVar = areaArrays.thresholdVar[id]
@@ -9,7 +9,8 @@ __version__ = "1.0.0"
 __maintainer__ = "RiSE Group"
 __email__ = "contacto@rise-group.org"
 
-from areacl import AreaCl
+import numpy as np
+from areacl import AreaCl, AreaArrays
 from dist2Regions import distanceStatDispatcher
 
 class AreaManager:
@@ -18,7 +19,8 @@ class AreaManager:
     instances of areas, a wide range of area2area and area2region distance
     functions.
     """
-    def __init__(self, w, y, distanceType="EuclideanSquared", variance="false"):
+    def __init__(self, w, y, distanceType="EuclideanSquared", variance="false",
+                 storage="objects", dtype=np.float64):
         """
         @type w: dictionary
         @param w: With B{key} = area Id, and B{value} = list with Ids of neighbours of
@@ -33,13 +35,34 @@ class AreaManager:
 
         @type variance: boolean
         @keyword variance: Boolean indicating if the data have variance matrix. Default value I{variance = 'false'}.
+
+        @type storage: string
+        @keyword storage: How the areas are stored: "objects" creates one
+        L{AreaCl} per area, "arrays" stores the attributes in one contiguous
+        matrix and the contiguity as CSR arrays (indptr, indices). Default
+        value I{storage = 'objects'}.
+
+        @type dtype: numpy.dtype
+        @keyword dtype: Type of the data matrix when I{storage = 'arrays'}.
+        Default value I{dtype = numpy.float64}.
         """
         self.y = y
         self.areas = {}
         self.noNeighs = set([])
         self.variance = variance
         self.distanceType = distanceType
-        self.createAreas(w, y)
+        self.storage = storage
+        self.dataMatrix = None
+        self.neighs = None
+        if storage == "arrays":
+            if variance != "false":
+                raise Exception("Areas with variance matrix can not be " +
+                                "stored as arrays")
+            self.createAreaArrays(w, y, dtype)
+        elif storage == "objects":
+            self.createAreas(w, y)
+        else:
+            raise Exception("Unknown storage type: " + str(storage))
         self.distanceStatDispatcher = distanceStatDispatcher
 
     def createAreas(self, w, y):
@@ -64,6 +87,42 @@ class AreaManager:
         if len(self.noNeighs) > 0:
             print "Disconnected areas neighs: ", list(self.noNeighs)
 
+    def createAreaArrays(self, w, y, dtype=np.float64):
+        """
+        Creates the data matrix and the CSR contiguity arrays from a sparse
+        weights matrix (w) and a data array (y).
+        """
+        n = len(self.y)
+        self.distances = {}
+        self.dataMatrix = np.array([y[key] for key in xrange(n)], dtype=dtype)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        indices = []
+        for key in xrange(n):
+            neighbours = w.get(key, [])
+            if len(neighbours) == 0:
+                self.noNeighs = self.noNeighs | set([key])
+            indices.extend(neighbours)
+            indptr[key + 1] = len(indices)
+        self.indptr = indptr
+        self.indices = np.array(indices, dtype=np.int32)
+        self.areas = AreaArrays(self.dataMatrix, self.indptr, self.indices)
+        if len(self.noNeighs) > 0:
+            print "Disconnected areas neighs: ", list(self.noNeighs)
+
+    def neighLists(self):
+        """
+        Return the neighbour ids of every area as a list of lists indexed
+        by area id, built once and shared by all the region makers. They
+        must not be modified.
+        """
+        if self.neighs is None:
+            if self.storage == "arrays":
+                self.neighs = self.areas.neighLists()
+            else:
+                self.neighs = [self.areas[areaID].neighs
+                               for areaID in xrange(len(self.areas))]
+        return self.neighs
+
     def returnDistance2Area(self, area, otherArea):
         """
         Returns the distance between two areas
@@ -82,6 +141,17 @@ class AreaManager:
             dist = self.distances[(j, i)]
         return dist
 
+    def getDataMatrix(self):
+        """
+        Returns the data of the areas as a matrix (areas x attributes). With
+        I{storage = 'objects'} the matrix is built on the first call.
+        """
+        if self.dataMatrix is None:
+            self.dataMatrix = np.array([self.areas[aID].data
+                                        for aID in xrange(len(self.areas))],
+                                       dtype=float)
+        return self.dataMatrix
+
     def getDataAverage(self, areaList, dataIndex):
         """
         Returns the attribute centroid of a set of areas
@@ -137,6 +207,7 @@ class AreaManager:
         Checks feasibility of a candidate solution
         """
         n = len(solution)
+        neighs = self.neighLists()
         regions = {}
         for i in range(n):
             try:
@@ -152,7 +223,7 @@ class AreaManager:
 
                 while(len(areas2Eval) > 0):
                     area = areas2Eval.pop()
-                    areaNeighs = (set(self.areas[area].neighs) & set(regions[i]))
+                    areaNeighs = (set(neighs[area]) & set(regions[i]))
                     areas2Eval = areas2Eval | (areaNeighs - newRegion)
                     newRegion = newRegion | areaNeighs
                 if set(regions[i]) -newRegion != set([]):
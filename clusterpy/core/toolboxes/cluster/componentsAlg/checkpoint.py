@@ -0,0 +1,40 @@
+# encoding: latin2
+"""Algorithm utilities
+G{packagetree core}
+"""
+__author__ = "Juan C. Duque"
+__credits__ = "Copyright (c) 2009-11 Juan C. Duque"
+__license__ = "New BSD License"
+__version__ = "1.0.0"
+__maintainer__ = "RiSE Group"
+__email__ = "contacto@rise-group.org"
+
+import cPickle
+import gzip
+import os
+
+def saveCheckpoint(path, state):
+    """
+    Write the state of a local search to a compressed file. The state is
+    written to a temporary file that then replaces path, so an interrupted
+    write never leaves a broken checkpoint.
+    """
+    tmpPath = path + ".tmp"
+    f = gzip.open(tmpPath, "wb", 1)
+    try:
+        cPickle.dump(state, f, cPickle.HIGHEST_PROTOCOL)
+    finally:
+        f.close()
+    if os.name == "nt" and os.path.exists(path):
+        os.remove(path)
+    os.rename(tmpPath, path)
+
+def loadCheckpoint(path):
+    """
+    Read the state of a local search written by L{saveCheckpoint}
+    """
+    f = gzip.open(path, "rb")
+    try:
+        return cPickle.load(f)
+    finally:
+        f.close()
@@ -15,16 +15,26 @@ def getDistance2RegionCentroid(areaManager, area, areaList, indexData=[]):
     """
     The distance from area "i" to the attribute centroid of region "k"
     """
-    sumAttributes = np.zeros(len(area.data))
-    if len(areaManager.areas[areaList[0]].data) - len(area.data) == 1:
-        for aID in areaList:
-            sumAttributes += np.array(areaManager.areas[aID].data[0: -1])
-    else:
-        for aID in areaList:
-            sumAttributes += np.array(areaManager.areas[aID].data)
-    centroidRegion = sumAttributes/len(areaList)
-    regionDistance = sum((np.array(area.data) - centroidRegion) ** 2)
+    nAttributes = len(area.data)
+    regionData = areaManager.getDataMatrix()[areaList, 0: nAttributes]
+    centroidRegion = regionData.sum(0) / len(areaList)
+    regionDistance = ((np.asarray(area.data, dtype=float) -
+                       centroidRegion) ** 2).sum()
     return regionDistance
 
+def getDistance2RegionCentroids(areaData, centroids):
+    """
+    The distances from several areas to the attribute centroids of several
+    regions, as a matrix (areas x regions)
+
+    @type areaData: numpy.ndarray
+    @param areaData: Matrix (areas x attributes) with the data of the areas.
+
+    @type centroids: numpy.ndarray
+    @param centroids: Matrix (regions x attributes) with the centroids.
+    """
+    diff = areaData[:, np.newaxis, :] - centroids[np.newaxis, :, :]
+    return (diff ** 2).sum(2)
+
 distanceStatDispatcher = {}
 distanceStatDispatcher["Centroid"] = getDistance2RegionCentroid
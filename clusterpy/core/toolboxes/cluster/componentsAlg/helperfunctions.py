@@ -162,9 +162,10 @@ def recode(X):
 
     return XP
 
-def sortedKeys(d):
+def sortedKeys(d, rng=np.random):
     """
-    Return keys of the dictionary d sorted based on their values.
+    Return keys of the dictionary d sorted based on their values. Ties in
+    the minimum value are shuffled with rng.
     """
     values = d.values()
     sortedIndices = np.argsort(values)
@@ -175,7 +176,7 @@ def sortedKeys(d):
         minIndices = sortedKeys[0: countMin]
         nInd = len(minIndices)
         idx = range(nInd)
-        np.random.shuffle(idx)
+        rng.shuffle(idx)
         permMins = idx
         c = 0
         for i in range(nInd):
@@ -184,6 +185,97 @@ def sortedKeys(d):
             c += 1
     return sortedKeys
 
+def articulationPoints(areaList, neighs):
+    """
+    Return the set of areas of a region whose removal disconnects the region
+    (cut vertices). It uses an iterative version of Tarjan's algorithm, so
+    it runs in linear time on the number of areas and contiguity links of
+    the region. neighs[area] are the neighbours of each area.
+    """
+    members = set(areaList)
+    discovery = {}
+    low = {}
+    cutAreas = set()
+    time = 0
+    for root in areaList:
+        if root in discovery:
+            continue
+        discovery[root] = time
+        low[root] = time
+        time += 1
+        rootChildren = 0
+        stack = [(root, None, iter(neighs[root]))]
+        while stack:
+            area, parent, areaNeighs = stack[-1]
+            for neigh in areaNeighs:
+                if neigh not in members:
+                    continue
+                if neigh not in discovery:
+                    discovery[neigh] = time
+                    low[neigh] = time
+                    time += 1
+                    stack.append((neigh, area, iter(neighs[neigh])))
+                    break
+                elif neigh != parent and discovery[neigh] < low[area]:
+                    low[area] = discovery[neigh]
+            else:
+                stack.pop()
+                if parent is None:
+                    continue
+                if low[area] < low[parent]:
+                    low[parent] = low[area]
+                if parent == root:
+                    rootChildren += 1
+                elif low[area] >= discovery[parent]:
+                    cutAreas.add(parent)
+        if rootChildren > 1:
+            cutAreas.add(root)
+    return cutAreas
+
+MASK64 = 2 ** 64 - 1
+GOLDEN64 = 0x9E3779B97F4A7C15
+MIX64_1 = 0xBF58476D1CE4E5B9
+MIX64_2 = 0x94D049BB133111EB
+
+def zobristKey(areaKey, regionID):
+    """
+    Return the 64-bit Zobrist key of an area assigned to a region. The key
+    of the area is combined with the region and mixed with splitmix64.
+    """
+    x = (int(areaKey) ^ ((regionID & MASK64) * GOLDEN64 & MASK64)) & MASK64
+    x = (x + GOLDEN64) & MASK64
+    x = ((x ^ (x >> 30)) * MIX64_1) & MASK64
+    x = ((x ^ (x >> 27)) * MIX64_2) & MASK64
+    return x ^ (x >> 31)
+
+def zobristHash(areaKeys, labels):
+    """
+    Return the 64-bit Zobrist hash of a solution given as a label array: the
+    XOR of zobristKey over all the areas, computed with vector operations.
+    """
+    x = areaKeys.astype(np.uint64)
+    regions = labels.astype(np.int64).astype(np.uint64)
+    x ^= regions * np.uint64(GOLDEN64)
+    x += np.uint64(GOLDEN64)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(MIX64_1)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(MIX64_2)
+    x ^= x >> np.uint64(31)
+    return int(np.bitwise_xor.reduce(x)) if len(x) else 0
+
+def makeRng(seed=None):
+    """
+    Return a random number generator (numpy.random.RandomState). seed can
+    be None, an integer or a generator, which is returned as is so several
+    objects can share it. With None the seed is drawn from the global numpy
+    generator, which is seeded from the operating system unless
+    numpy.random.seed was called, so that call still makes runs repeatable.
+    """
+    if isinstance(seed, np.random.RandomState):
+        return seed
+    if seed is None:
+        seed = np.random.randint(0, 2 ** 31 - 1)
+    return np.random.RandomState(seed)
+
 def feasibleRegion(feasDict):
     """
     Return if a list of areas are connected
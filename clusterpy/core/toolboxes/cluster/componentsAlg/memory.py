@@ -9,6 +9,7 @@ __version__ = "1.0.0"
 __maintainer__ = "RiSE Group"
 __email__ = "contacto@rise-group.org"
 
+from collections import deque
 from copy import deepcopy
 
 class BasicMemory:
@@ -72,3 +73,51 @@ class ExtendedMemory(BasicMemory):
         self.region2Area = deepcopy(rm.region2Area)
         self.intraBorderingAreas = deepcopy(rm.intraBorderingAreas)
 
+
+class TabuMemory:
+    """
+    Tabu list of a tabu search. The moves are kept in a ring buffer in the
+    order they were added and in a dictionary with the iteration when they
+    were added, so adding a move and checking whether a move is tabu take
+    constant time. A move stops being tabu after self.tenure additions.
+    """
+    def __init__(self, tenure):
+        """
+        @type tenure: integer
+        @param tenure: Number of iterations a move remains tabu.
+        """
+        self.tenure = tenure
+        self.iteration = 0
+        self.moves = deque()
+        self.added = {}
+
+    def __contains__(self, move):
+        return move in self.added
+
+    def __len__(self):
+        return len(self.added)
+
+    def add(self, move):
+        """
+        Make a move tabu and expire the moves older than the tenure
+        """
+        self.iteration += 1
+        self.moves.append((move, self.iteration))
+        self.added[move] = self.iteration
+        self.expire()
+
+    def age(self):
+        """
+        Advance one iteration without adding a move
+        """
+        self.iteration += 1
+        self.expire()
+
+    def expire(self):
+        """
+        Remove the moves that were added more than tenure iterations ago
+        """
+        while self.moves and self.iteration - self.moves[0][1] >= self.tenure:
+            move, iteration = self.moves.popleft()
+            if self.added.get(move) == iteration:
+                del self.added[move]
@@ -0,0 +1,88 @@
+# encoding: latin2
+"""Algorithm utilities
+G{packagetree core}
+"""
+__author__ = "Juan C. Duque"
+__credits__ = "Copyright (c) 2009-11 Juan C. Duque"
+__license__ = "New BSD License"
+__version__ = "1.0.0"
+__maintainer__ = "RiSE Group"
+__email__ = "contacto@rise-group.org"
+
+import heapq
+
+class MoveQueue:
+    """
+    Priority queue of the moves (area, region) of a solution keyed by the
+    change they produce in the objective function. Entries are invalidated
+    lazily: a move keeps only its latest entry in self.entries and the
+    outdated entries are skipped when they reach the top of the heap.
+    """
+    def __init__(self):
+        self.heap = []
+        self.entries = {}
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, areaID, regionID, delta):
+        """
+        Add a move to the queue, replacing its previous entry if any
+        """
+        entry = (delta, areaID, regionID)
+        moves = self.entries.setdefault(areaID, {})
+        if regionID not in moves:
+            self.size += 1
+        moves[regionID] = entry
+        heapq.heappush(self.heap, entry)
+        if len(self.heap) > 4 * self.size + 64:
+            self.compact()
+
+    def compact(self):
+        """
+        Rebuild the heap with the current entries only
+        """
+        self.heap = [entry for moves in self.entries.itervalues()
+                     for entry in moves.itervalues()]
+        heapq.heapify(self.heap)
+
+    def pop(self):
+        """
+        Remove and return the entry (delta, area, region) with the smallest
+        delta, None if the queue is empty
+        """
+        while self.heap:
+            entry = heapq.heappop(self.heap)
+            delta, areaID, regionID = entry
+            moves = self.entries.get(areaID)
+            if moves is not None and moves.get(regionID) is entry:
+                self.discard(areaID, regionID)
+                return entry
+        return None
+
+    def restore(self, entries):
+        """
+        Push back the entries taken with pop. The list is emptied.
+        """
+        while entries:
+            delta, areaID, regionID = entries.pop()
+            self.push(areaID, regionID, delta)
+
+    def discard(self, areaID, regionID):
+        """
+        Remove a move from the queue
+        """
+        moves = self.entries.get(areaID)
+        if moves is not None and regionID in moves:
+            del moves[regionID]
+            self.size -= 1
+            if not moves:
+                del self.entries[areaID]
+
+    def discardArea(self, areaID):
+        """
+        Remove all the moves of an area from the queue
+        """
+        moves = self.entries.pop(areaID, {})
+        self.size -= len(moves)
@@ -0,0 +1,164 @@
+# encoding: latin2
+"""Algorithm utilities
+G{packagetree core}
+"""
+__author__ = "Juan C. Duque"
+__credits__ = "Copyright (c) 2009-11 Juan C. Duque"
+__license__ = "New BSD License"
+__version__ = "1.0.0"
+__maintainer__ = "RiSE Group"
+__email__ = "contacto@rise-group.org"
+
+import numpy as np
+from multiprocessing import Pool
+from multiprocessing.sharedctypes import RawArray
+
+def moveDeltas(areas, regions, labels, regionN, regionSum, ofData):
+    """
+    Return the change in the sum of squares objective function of moving
+    each area in areas to the region in regions, computed from the number
+    of areas (regionN) and the sum of the attributes (regionSum) of the
+    regions
+    """
+    regionsIn = labels[areas]
+    x = ofData[areas]
+    nIn = regionN[regionsIn]
+    nOut = regionN[regions]
+    dIn = x - regionSum[regionsIn] / nIn[:, np.newaxis]
+    dOut = x - regionSum[regions] / nOut[:, np.newaxis]
+    removal = nIn / (nIn - 1.0) * (dIn ** 2).sum(1)
+    addition = nOut / (nOut + 1.0) * (dOut ** 2).sum(1)
+    return addition - removal
+
+def scoreEdgeMoves(src, dst, labels, regionN, regionSum, ofData):
+    """
+    Return the moves of the areas in src to the regions of their neighbours
+    in dst, as long as the area is not alone in its region, as three arrays
+    (areas, regions and deltas) sorted by area and region. src must be
+    sorted, as in a compressed sparse row contiguity structure.
+    """
+    regionsIn = labels[src]
+    regions = labels[dst]
+    border = (regionsIn != regions) & (regionsIn >= 0) & (regions >= 0)
+    areas = src[border]
+    regions = regions[border]
+    border = regionN[labels[areas]] > 1
+    areas = areas[border]
+    regions = regions[border]
+    nr = len(regionN)
+    moves = np.unique(areas.astype(np.int64) * nr + regions)
+    areas = moves // nr
+    regions = moves % nr
+    deltas = moveDeltas(areas, regions, labels, regionN, regionSum, ofData)
+    return areas, regions, deltas
+
+def contiguityEdges(areas, n):
+    """
+    Return the contiguity of the areas as two arrays (src, dst) with one
+    element per pair of neighbours, sorted by src
+    """
+    if hasattr(areas, "indptr"):
+        src = np.repeat(np.arange(n), np.diff(areas.indptr))
+        return src, np.asarray(areas.indices, dtype=int)
+    src = []
+    dst = []
+    for areaID in xrange(n):
+        neighs = areas[areaID].neighs
+        src.extend([areaID] * len(neighs))
+        dst.extend(neighs)
+    return np.array(src, dtype=int), np.array(dst, dtype=int)
+
+#  State of a worker process of a L{ScoringPool}. It is given to the pool
+#  when the workers are forked: the contiguity and the data never change, and
+#  the labels and the region statistics are read from shared memory.
+
+scoringState = {}
+
+def initScoringWorker(state):
+    """
+    Keep the state of the scoring pool in the worker process
+    """
+    scoringState.clear()
+    scoringState.update(state)
+
+def sharedViews(state):
+    """
+    Return numpy views of the shared labels and region statistics
+    """
+    labels = np.frombuffer(state["labels"], dtype=np.int32)
+    regionN = np.frombuffer(state["regionN"])
+    regionSum = np.frombuffer(state["regionSum"])
+    return labels, regionN, regionSum.reshape(len(regionN), -1)
+
+def scoreEdgeChunk(start, end):
+    """
+    Score the moves of the edges between start and end of the shared
+    contiguity
+    """
+    labels, regionN, regionSum = sharedViews(scoringState)
+    return scoreEdgeMoves(scoringState["src"][start:end],
+                          scoringState["dst"][start:end],
+                          labels, regionN, regionSum, scoringState["ofData"])
+
+class ScoringPool:
+    """
+    Pool of processes that score all the border moves of a solution. The
+    edges of the contiguity are split in contiguous chunks of areas, one
+    per process, and the results are concatenated in order, so the moves
+    are the same, in the same order, as when they are scored by a single
+    process.
+    """
+    def __init__(self, src, dst, ofData, nRegions, processes):
+        """
+        @type src: numpy.ndarray
+        @param src: Area of each edge of the contiguity, sorted.
+
+        @type dst: numpy.ndarray
+        @param dst: Neighbour of each edge of the contiguity.
+
+        @type ofData: numpy.ndarray
+        @param ofData: Matrix (areas x attributes) of the objective function.
+
+        @type nRegions: integer
+        @param nRegions: Maximum number of regions.
+
+        @type processes: integer
+        @param processes: Number of worker processes.
+        """
+        n, k = ofData.shape
+        self.nRegions = nRegions
+        self.state = {"src": src, "dst": dst, "ofData": ofData,
+                      "labels": RawArray("i", n),
+                      "regionN": RawArray("d", nRegions),
+                      "regionSum": RawArray("d", nRegions * k)}
+        cuts = np.linspace(0, n, processes + 1).astype(int)
+        bounds = np.searchsorted(src, cuts).tolist()
+        self.chunks = zip(bounds[:-1], bounds[1:])
+        self.pool = Pool(processes=processes, initializer=initScoringWorker,
+                         initargs=(self.state,))
+
+    def score(self, labels, regionN, regionSum):
+        """
+        Return all the border moves of a solution as three arrays (areas,
+        regions and deltas)
+        """
+        sharedLabels, sharedN, sharedSum = sharedViews(self.state)
+        nr = len(regionN)
+        sharedLabels[:] = labels
+        sharedN[:] = 0.0
+        sharedN[:nr] = regionN
+        sharedSum[:] = 0.0
+        sharedSum[:nr] = regionSum
+        procs = [self.pool.apply_async(scoreEdgeChunk, chunk)
+                 for chunk in self.chunks]
+        results = [p.get() for p in procs]
+        areas, regions, deltas = zip(*results)
+        return (np.concatenate(areas), np.concatenate(regions),
+                np.concatenate(deltas))
+
+    def close(self):
+        """
+        Stop the worker processes
+        """
+        self.pool.close()
+        self.pool.join()
@@ -10,6 +10,7 @@ __version__ = "1.0.0"
 __maintainer__ = "RiSE Group"
 __email__ = "contacto@rise-group.org"
 
+from collections import OrderedDict
 from distanceFunctions import distMethods
 import numpy as np
 
@@ -35,7 +36,59 @@ def getObjectiveFunctionSumSquares(regionMaker,
             objDict[region] += areaDistance[0][0]
     return sum(objDict.values())
 
-cachedObj = {}
+class ObjectiveCache:
+    """
+    Least recently used cache of the objective function value of regions.
+    Each L{RegionMaker} owns one cache, so the values are never shared among
+    unrelated runs, and the oldest entries are evicted when the cache
+    exceeds its memory budget.
+    """
+    entrySize = 200  #  approximate number of bytes used by one entry
+
+    def __init__(self, maxMemory=32 * 2 ** 20):
+        """
+        @type maxMemory: integer
+        @keyword maxMemory: Memory budget of the cache in bytes.
+        """
+        self.maxEntries = max(1, int(maxMemory) / self.entrySize)
+        self.values = OrderedDict()
+
+    def __len__(self):
+        return len(self.values)
+
+    def get(self, key):
+        """
+        Return the value stored with key, None if it is not in the cache.
+        """
+        try:
+            value = self.values.pop(key)
+        except KeyError:
+            return None
+        self.values[key] = value
+        return value
+
+    def put(self, key, value):
+        """
+        Store a value, evicting the least recently used one if needed.
+        """
+        self.values[key] = value
+        if len(self.values) > self.maxEntries:
+            self.values.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove all the values.
+        """
+        self.values.clear()
+
+def getRegionKey(regionMaker, areaList):
+    """
+    Return a 62 bits key for a set of areas. The key is the exclusive or of
+    the random 62 bits keys of the areas, so it does not depend on their
+    order.
+    """
+    return int(np.bitwise_xor.reduce(regionMaker.areaKeys[areaList]))
+
 def getObjectiveFunctionSumSquaresFast(regionMaker,
                                        region2AreaDict,
                                        modifiedRegions,
@@ -44,17 +97,15 @@ def getObjectiveFunctionSumSquaresFast(regionMaker,
     Sum of squares from each area to the region's centroid
     """
     obj = 0.0
+    objCache = regionMaker.objCache
     r2aDictKeys = region2AreaDict.keys()
     for region in r2aDictKeys:
         if region in modifiedRegions:
-            valRegion = 0.0
             areasIdsIn = region2AreaDict[region]
-            key = areasIdsIn
-            key.sort()
-            key = tuple(key)
-            if cachedObj.has_key(key):
-                valRegion = cachedObj[key]
-            else:
+            key = getRegionKey(regionMaker, areasIdsIn)
+            valRegion = objCache.get(key)
+            if valRegion is None:
+                valRegion = 0.0
                 areasInNow = [regionMaker.areas[_aid] for _aid in areasIdsIn]
                 dataAvg = regionMaker.am.getDataAverage(areasIdsIn, indexData)
 
@@ -68,7 +119,7 @@ def getObjectiveFunctionSumSquaresFast(regionMaker,
                     dist = distMethods[regionMaker.distanceType](areaData)[0][0]
                     valRegion += dist
 
-                cachedObj[key] = valRegion
+                objCache.put(key, valRegion)
             obj += valRegion
         else:
             obj += regionMaker.objDict[region]
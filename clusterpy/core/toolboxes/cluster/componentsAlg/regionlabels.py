@@ -0,0 +1,140 @@
+# encoding: latin2
+"""Algorithm utilities
+G{packagetree core}
+"""
+__author__ = "Juan C. Duque"
+__credits__ = "Copyright (c) 2009-11 Juan C. Duque"
+__license__ = "New BSD License"
+__version__ = "1.0.0"
+__maintainer__ = "RiSE Group"
+__email__ = "contacto@rise-group.org"
+
+import numpy as np
+
+#  Label of the areas that have not been assigned to a region yet. The label
+#  -1 is used for the areas without neighbours.
+UNASSIGNED = -99
+
+class AreaLabels:
+    """
+    Region of each area (area2Region) stored as an int32 label array. It
+    behaves as a dictionary whose keys are the assigned areas, so copying,
+    comparing or hashing a solution are vector operations over self.labels.
+    """
+    def __init__(self, n, labels=None):
+        """
+        @type n: integer
+        @param n: Number of areas.
+
+        @type labels: numpy.array
+        @keyword labels: Initial labels, by default all the areas are unassigned.
+        """
+        if labels is None:
+            self.labels = np.empty(n, dtype=np.int32)
+            self.labels.fill(UNASSIGNED)
+        else:
+            self.labels = np.array(labels, dtype=np.int32)
+
+    def __getitem__(self, areaID):
+        region = self.labels[areaID]
+        if region == UNASSIGNED:
+            raise KeyError(areaID)
+        return int(region)
+
+    def __setitem__(self, areaID, regionID):
+        self.labels[areaID] = regionID
+
+    def __delitem__(self, areaID):
+        if self.labels[areaID] == UNASSIGNED:
+            raise KeyError(areaID)
+        self.labels[areaID] = UNASSIGNED
+
+    def __contains__(self, areaID):
+        return (0 <= areaID < len(self.labels) and
+                self.labels[areaID] != UNASSIGNED)
+
+    def __len__(self):
+        return int((self.labels != UNASSIGNED).sum())
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __deepcopy__(self, memo):
+        return AreaLabels(len(self.labels), self.labels)
+
+    def copy(self):
+        return AreaLabels(len(self.labels), self.labels)
+
+    def get(self, areaID, default=None):
+        try:
+            return self[areaID]
+        except (KeyError, IndexError):
+            return default
+
+    def keys(self):
+        return np.flatnonzero(self.labels != UNASSIGNED).tolist()
+
+    def values(self):
+        return self.labels[self.labels != UNASSIGNED].tolist()
+
+    def items(self):
+        return zip(self.keys(), self.values())
+
+    def iteritems(self):
+        return iter(self.items())
+
+
+class RegionMembers(dict):
+    """
+    Areas of each region (region2Area). Each region keeps a list of its
+    areas and self.position keeps the index of each area inside that list, so
+    an area leaves its region in constant time by swapping it with the last
+    area of the list.
+    """
+    def __init__(self, n):
+        """
+        @type n: integer
+        @param n: Number of areas.
+        """
+        dict.__init__(self)
+        self.position = np.zeros(n, dtype=np.int32)
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def copy(self):
+        members = RegionMembers(0)
+        for regionID, areas in self.iteritems():
+            dict.__setitem__(members, regionID, list(areas))
+        members.position = self.position.copy()
+        return members
+
+    def addArea(self, regionID, areaID):
+        """
+        Add an area to the end of the list of a region
+        """
+        areas = self.setdefault(regionID, [])
+        self.position[areaID] = len(areas)
+        areas.append(areaID)
+
+    def removeArea(self, regionID, areaID):
+        """
+        Remove an area from a region in constant time
+        """
+        areas = self[regionID]
+        index = self.position[areaID]
+        last = areas.pop()
+        if last != areaID:
+            areas[index] = last
+            self.position[last] = index
+
+    @classmethod
+    def fromLabels(cls, labels):
+        """
+        Build the areas of each region from a label array. Areas without
+        neighbours (region -1) and unassigned areas are left out.
+        """
+        members = cls(len(labels))
+        for areaID in np.flatnonzero(labels >= 0):
+            members.addArea(int(labels[areaID]), int(areaID))
+        return members
@@ -10,16 +10,25 @@ __maintainer__ = "RiSE Group"
 __email__ = "contacto@rise-group.org"
 
 from copy import deepcopy
+from math import sqrt
+import heapq
 import numpy as np
 from objFunctions import makeObjDict, objectiveFunctionTypeDispatcher
+from objFunctions import ObjectiveCache
 from selectionTypeFunctions import selectionTypeDispatcher
+from dist2Regions import getDistance2RegionCentroids
+from seedSelectionFunctions import seedSelectionDispatcher
 from warnings import warn
-from time import time
 
-from memory import ExtendedMemory as ExtMem
-from areacl import AreaCl
-from helperfunctions import sortedKeys
-from os import getpid
+from memory import TabuMemory
+from areacl import AreaArrays
+from regionlabels import UNASSIGNED, AreaLabels, RegionMembers
+from movequeue import MoveQueue
+from searchbudget import SearchBudget
+from checkpoint import saveCheckpoint, loadCheckpoint
+from movescoring import ScoringPool, contiguityEdges, moveDeltas, scoreEdgeMoves
+from helperfunctions import sortedKeys, articulationPoints
+from helperfunctions import zobristKey, zobristHash, makeRng
 
 class RegionMaker:
     """
@@ -40,7 +49,16 @@ class RegionMaker:
                  weightsDistanceStat = [],
                  weightsObjectiveFunctionType = [],
                  indexDataStat = [],
-                 indexDataOF = []):
+                 indexDataOF = [],
+                 cacheMemory = 32 * 2 ** 20,
+                 seed = None,
+                 scoringJobs = 1,
+                 deadline = None,
+                 maxEvaluations = None,
+                 checkpoint = None,
+                 checkpointEvery = 100,
+                 feasibleRegions = None,
+                 initialLabels = None):
         """
         @type am: AreaManager
         @param am: Area manager object.
@@ -51,6 +69,11 @@ class RegionMaker:
         @type seeds: list
         @keyword seeds: List of area IDs for initial seeds.
 
+        @type seedSelection: string
+        @keyword seedSelection: Method to select the initial seeds: "kmeans"
+        (k-means++), "greedyKmeans" (greedy k-means++) or "farthest"
+        (farthest-first), by default "kmeans"
+
         @type distanceType: string
         @keyword distanceType: Type of distance to be used, by default "EuclideanSquared"
 
@@ -84,9 +107,61 @@ class RegionMaker:
 
         @type indexDataOf = list
         @keyword indexDataOf:
+
+        @type cacheMemory: integer
+        @keyword cacheMemory: Memory budget, in bytes, of the cache with the
+        objective function value of the regions, by default 32 MB. The cache
+        only serves the objective functions computed from scratch: the sum
+        of squares with the squared Euclidean distance is updated
+        incrementally and never uses it.
+
+        @type seed: integer or numpy.random.RandomState
+        @keyword seed: Seed of the random number generator, or the generator
+        itself, used for all the random choices of the construction and
+        local search phases. By default the generator is seeded from the
+        operating system.
+
+        @type scoringJobs: integer
+        @keyword scoringJobs: Number of processes used to score all the border
+        moves of a solution in the tabu searches, by default 1. The moves and
+        their values do not depend on the number of processes.
+
+        @type deadline: float
+        @keyword deadline: Time, as given by time.time(), after which the
+        local searches stop with the best solution found so far, by default
+        None (no time limit).
+
+        @type maxEvaluations: integer
+        @keyword maxEvaluations: Number of moves evaluated after which the
+        local searches stop with the best solution found so far, by default
+        None (no limit).
+
+        @type checkpoint: string
+        @keyword checkpoint: File where the tabu searches and the simulated
+        annealing save their state periodically, so they can be continued
+        with L{resumeSearch}, by default None (no checkpoints).
+
+        @type checkpointEvery: integer
+        @keyword checkpointEvery: Number of iterations of the local search
+        between checkpoints, by default 100.
+
+        @type feasibleRegions: dictionary
+        @keyword feasibleRegions: Areas of each feasible region of a max-p
+        solution, starting with the seed of the region. If given with
+        numRegionsType "EndogenousThreshold", the regions are not grown: the
+        solution is rebuilt from them and the enclaves are assigned, as in
+        L{assignFeasibleRegions}. By default None.
+
+        @type initialLabels: numpy.array
+        @keyword initialLabels: Label array of a solution of the same
+        problem, as returned by L{getLabels}. If given with numRegionsType
+        "Exogenous", the solution is used as it is instead of growing its
+        regions again from initialSolution. By default None.
         """
         self.am = am
-        self.areas = deepcopy(am.areas)
+        self.areas = am.areas
+        self.neighs = am.neighLists()
+        self.rng = makeRng(seed)
         self.distanceType = distanceType
         self.distanceStat = distanceStat
         self.weightsDistanceStat = weightsDistanceStat
@@ -94,15 +169,20 @@ class RegionMaker:
         self.weightsObjectiveFunctionType = weightsObjectiveFunctionType
         self.indexDataOF = indexDataOF
         self.selectionType = selectionType
+        self.seedSelection = seedSelection
         self.objectiveFunctionType = objectiveFunctionType
         self.n = len(self.areas)
         self.unassignedAreas = self.areas.keys()
         self.assignedAreas = []
-        self.area2Region = {}
-        self.region2Area = {}
+        self.area2Region = AreaLabels(self.n)
+        self.region2Area = RegionMembers(self.n)
         self.potentialRegions4Area = {}
+        self.regionCandidates = {}
         self.intraBorderingAreas = {}
+        self.regionBorders = {}
+        self.neighRegionCounts = {}
         self.candidateInfo = {}
+        self.candidateHeap = []
         self.externalNeighs = set()
         self.alpha = alpha
         self.numRegionsType = numRegionsType
@@ -113,6 +193,27 @@ class RegionMaker:
         self.N = 0
         self.data = {}
         self.objInfo = -1
+        self.incrementalObj = (objectiveFunctionType == "SS" and
+                               distanceType == "EuclideanSquared")
+        self.ofData = None
+        self.regionN = None
+        self.regionSum = None
+        self.regionObj = None
+        self.scoringJobs = scoringJobs
+        self.budget = SearchBudget(deadline, maxEvaluations)
+        self.terminationReason = None
+        self.checkpoint = checkpoint
+        self.checkpointEvery = checkpointEvery
+        self.iterations = 0
+        self.scoringPool = None
+        self.edges = None
+        self.centroidData = None
+        self.centroidSum = None
+        self.cutAreas = {}
+        self.moveJournal = []
+        self.solutionHash = None
+        self.objCache = ObjectiveCache(cacheMemory)
+        self.areaKeys = self.rng.randint(1, 2 ** 62, size=self.n, dtype=np.int64)
         self.assignAreasNoNeighs()
 
         #  PREDEFINED NUMBER OF REGIONS
@@ -126,7 +227,10 @@ class RegionMaker:
         i = 0
         lseeds = 0
         if numRegionsType == "Exogenous":
-            if not initialSolution:
+            if initialLabels is not None:
+                self.assignLabels(initialLabels)
+                self.objInfo = self.getObj()
+            elif not initialSolution:
                 self.pRegions = pRegions
                 seeds = self.kmeansInit()
                 self.setSeeds(seeds)
@@ -137,18 +241,20 @@ class RegionMaker:
                     c += 1
                 self.objInfo = self.getObj()
             else:
-                uniqueInitSolution = set(initialSolution)
-                self.pRegions = len(uniqueInitSolution)
-                seeds = []
-                for s in uniqueInitSolution:
-                    seeds.append(initialSolution.index(s))
-                self.setSeeds(seeds)
+                #  Areas without neighbours are already in region -1
+
                 regions2create = {}
                 c = 0
-
                 for i in initialSolution:
-                    regions2create.setdefault(i, []).append(c)
+                    if c not in self.am.noNeighs:
+                        regions2create.setdefault(i, []).append(c)
                     c += 1
+                uniqueInitSolution = set(regions2create)
+                self.pRegions = len(uniqueInitSolution)
+                seeds = []
+                for s in uniqueInitSolution:
+                    seeds.append(regions2create[s][0])
+                self.setSeeds(seeds)
                 c = 0
                 regions2createKeys = regions2create.keys()
                 for i in regions2createKeys:
@@ -169,45 +275,15 @@ class RegionMaker:
             except:
                 self.extractThresholdVar()
             self.regionalThreshold = threshold
-            c = 0
-            self.feasibleRegions = {}
-            self.regionValue = {}
-            seeds = []
-            for aID in self.areas:
-                if self.areas[aID].thresholdVar >= self.regionalThreshold:
-                    seed = aID
-                    seeds = seeds + [seed]
-                    self.regionValue[c] = self.areas[seed].thresholdVar
-                    self.feasibleRegions[c] = [seed]
-                    self.removeRegionAsCandidate()
-                    c += 1
-            self.setSeeds(seeds)
-            while len(self.unassignedAreas) != 0:
-                np.random.shuffle(self.unassignedAreas)
-                vals = []
-                for index in self.unassignedAreas:
-                    vals += [self.areas[index].thresholdVar]
-                seed = self.unassignedAreas[0]
-                self.setSeeds([seed], c)
-                self.regionValue[c] = self.areas[seed].thresholdVar
-                if self.regionValue[c] >= self.regionalThreshold:
-                    self.feasibleRegions[c] = [seed]
-                    self.removeRegionAsCandidate()
-                    c += 1
-                else:
-                    feasibleThreshold = 1
-                    while self.regionValue[c] < self.regionalThreshold:
-                        self.addedArea = -1
-                        try:
-                            self.constructRegions()
-                            self.regionValue[c] += self.areas[self.addedArea].thresholdVar
-                        except:
-                            feasibleThreshold = 0
-                            break
-                    if feasibleThreshold == 1:
-                        self.feasibleRegions[c] = self.region2Area[c]
-                        self.removeRegionAsCandidate()
-                    c += 1
+            if feasibleRegions is not None:
+                self.regionValue = {}
+                self.assignFeasibleRegions(feasibleRegions)
+            elif (self.distanceStat == "Centroid" and
+                self.selectionType == "Minimum" and
+                self.objectiveFunctionType != "GWalt"):
+                self.growThresholdRegions()
+            else:
+                self.growCandidateRegions()
 
         #  NUMBER OF REGIONS IS ENDOGENOUS WITH A RANGE VALUE
 
@@ -224,7 +300,7 @@ class RegionMaker:
 
                 #  select seed
 
-                np.random.shuffle(self.unassignedAreas)
+                self.rng.shuffle(self.unassignedAreas)
                 seed = self.unassignedAreas[0]
                 self.setSeeds([seed],c)
 
@@ -265,91 +341,286 @@ class RegionMaker:
                         except:
                             stop = 1
                 self.feasibleRegions[c] = self.region2Area[c]
-                self.removeRegionAsCandidate()
+                self.removeRegionAsCandidate(c)
                 c += 1
         self.getIntraBorderingAreas()
 
     def kmeansInit(self):
-        cachedDistances = {}
-        y = self.am.y
-        n = len(y)
-        distances = np.ones(n)
-        total = sum(distances)
-        probabilities = map(lambda x: x / float(total), distances)
-        seeds = []
-        localDistanceType = self.distanceType
-        returnDistance2Area = AreaCl.returnDistance2Area
-        np.random.seed(int(time() * getpid()) % 4294967295)
-        for k in xrange(self.pRegions):
-            random = np.random.uniform(0, 1)
-            find = False
-            acum = 0
-            cont = 0
-            while not find:
-                inf = acum
-                sup = acum + probabilities[cont]
-                if inf <= random <= sup:
-                    find = True
-                    seeds += [cont]
-                    selfAmAreas = self.am.areas
-
-                    for area in selfAmAreas:
-                        currentArea = selfAmAreas[area]
-                        tempMap = []
-                        for x in seeds:
-                            if x < area:
-                                k = (x, area)
-                            elif x > area:
-                                k = (area, x)
-                            else:
-                                k = (0,0)
-                            cached = cachedDistances.get(k, -1)
-                            if cached < 0:
-                                newDist = returnDistance2Area(currentArea,
-                                                               selfAmAreas[x],
-                                                               distanceType = localDistanceType)
-                                tempMap.append(newDist)
-                                cachedDistances[k] = newDist
-
-                            else:
-                                tempMap.append(cached)
-                        distancei = min(tempMap)
-                        distances[area] = distancei
-                    total = sum(distances)
-                    probabilities = map(lambda x: x / float(total), distances)
-                else:
-                    cont += 1
-                    acum = sup
-        del cachedDistances
-        return seeds
+        """
+        Select pRegions seeds with the method given by self.seedSelection.
+        Areas without neighbours are never selected as seeds.
+        """
+        if self.seedSelection not in seedSelectionDispatcher:
+            raise Exception("Unknown seed selection: " + str(self.seedSelection))
+        n = len(self.am.areas)
+        candidates = np.ones(n, dtype=bool)
+        candidates[list(self.am.noNeighs)] = False
+        if self.distanceType == "EuclideanSquared":
+            data = self.am.getDataMatrix()
+            def distance2Area(areaID):
+                return ((data - data[areaID]) ** 2).sum(1)
+        else:
+            areas = self.am.areas
+            def distance2Area(areaID):
+                return np.array([areas[aID].returnDistance2Area(areas[areaID],
+                                     distanceType=self.distanceType)
+                                 for aID in xrange(n)], dtype=float)
+        return seedSelectionDispatcher[self.seedSelection](distance2Area,
+                                                          self.pRegions,
+                                                          candidates,
+                                                          rng=self.rng)
 
     def extractThresholdVar(self):
         """
         Separate aggregation variables (data) from the variable selected
         to satisfy a threshold value (thresholdVar)
         """
+        self.centroidData = None
+        self.centroidSum = None
+        if isinstance(self.areas, AreaArrays):
+            self.areas = self.areas.splitThresholdVar()
+            self.totalThresholdVar = float(self.areas.thresholdVar.sum())
+            return
+        self.areas = deepcopy(self.areas)
         self.totalThresholdVar = 0.0
         for areaId in self.areas.keys():
             self.areas[areaId].thresholdVar = self.areas[areaId].data[-1]
             self.areas[areaId].data = self.areas[areaId].data[0: -1]
             self.totalThresholdVar += self.areas[areaId].thresholdVar
 
-    def removeRegionAsCandidate(self):
+    def removeRegionAsCandidate(self, regionID):
+        """
+        Remove a region that became feasible from the candidates. Only the
+        candidates of its unassigned neighbours are visited.
+        """
+        for areaID in self.regionCandidates.get(regionID, ()):
+            self.candidateInfo.pop((areaID, regionID), None)
+
+    def growCandidateRegions(self):
+        """
+        Grow the regions of the max-p-regions model with the generic
+        construction of L{constructRegions}. The seeds are taken from the
+        unassigned areas, shuffled again for each region, and the regions
+        grow until they reach the threshold or have no candidates left.
+        """
+        c = 0
+        self.feasibleRegions = {}
+        self.regionValue = {}
+        seeds = []
+        for aID in self.areas:
+            if self.areas[aID].thresholdVar >= self.regionalThreshold:
+                seed = aID
+                seeds = seeds + [seed]
+                self.regionValue[c] = self.areas[seed].thresholdVar
+                self.feasibleRegions[c] = [seed]
+                c += 1
+        self.setSeeds(seeds)
+        while len(self.unassignedAreas) != 0:
+            self.rng.shuffle(self.unassignedAreas)
+            seed = self.unassignedAreas[0]
+            self.setSeeds([seed], c)
+            self.regionValue[c] = self.areas[seed].thresholdVar
+            if self.regionValue[c] >= self.regionalThreshold:
+                self.feasibleRegions[c] = [seed]
+                self.removeRegionAsCandidate(c)
+                c += 1
+            else:
+                feasibleThreshold = 1
+                while self.regionValue[c] < self.regionalThreshold:
+                    self.addedArea = -1
+                    try:
+                        self.constructRegions()
+                        self.regionValue[c] += self.areas[self.addedArea].thresholdVar
+                    except:
+                        feasibleThreshold = 0
+                        break
+                if feasibleThreshold == 1:
+                    self.feasibleRegions[c] = self.region2Area[c]
+                    self.removeRegionAsCandidate(c)
+                c += 1
+
+    def growThresholdRegions(self):
+        """
+        Grow the regions of the max-p-regions model. The areas that reach
+        the threshold by themselves are regions of one area. Then, each new
+        region starts from the next unassigned area of a random permutation
+        and adds the area of its frontier (its unassigned neighbours) closest
+        to its centroid until it reaches the threshold, or until its frontier
+        is empty, in which case the region is not feasible. Only one region
+        grows at a time, so the frontier is kept for that region alone and
+        dropped when it is complete; the value of the threshold variable and
+        the sum of the attributes of the region are updated on every
+        addition.
+
+        The frontier is a heap whose keys are the Euclidean distances of the
+        areas to the centroid, plus the distance the centroid had moved when
+        they were computed. A key minus the distance moved so far is a lower
+        bound of the current distance of the area, so only the areas at the
+        top of the heap are evaluated again to find the closest one. Ties are
+        broken by a random priority given to each area.
+
+        Unlike L{growCandidateRegions}, the seeds come from one permutation
+        and the ties from those priorities, so the regions grown for a given
+        seed are not the same, but the number of feasible regions found is
+        the same on average.
+        """
+        if self.centroidData is None:
+            self.initCentroidSums()
+        data = self.centroidData
+        thresholdVar = [self.areas[areaID].thresholdVar
+                        for areaID in xrange(self.n)]
+        unassigned = np.zeros(self.n, dtype=bool)
+        unassigned[self.unassignedAreas] = True
+        self.feasibleRegions = {}
+        self.regionValue = {}
+        self.seeds = []
+        c = 0
+        for aID in self.areas:
+            if thresholdVar[aID] >= self.regionalThreshold:
+                self.assignGrowingArea(aID, c, unassigned)
+                self.seeds.append(aID)
+                self.regionValue[c] = thresholdVar[aID]
+                self.feasibleRegions[c] = [aID]
+                c += 1
+        for seed in self.rng.permutation(np.flatnonzero(unassigned)).tolist():
+            if not unassigned[seed]:
+                continue
+            self.assignGrowingArea(seed, c, unassigned)
+            self.seeds.append(seed)
+            value = thresholdVar[seed]
+            regionSum = data[seed].copy()
+            centroid = data[seed]
+            moved = 0.0
+            step = 0
+            frontier = []
+            inFrontier = set()
+            areaID = seed
+            while value < self.regionalThreshold:
+                for neigh in self.neighs[areaID]:
+                    if unassigned[neigh] and neigh not in inFrontier:
+                        inFrontier.add(neigh)
+                        diff = data[neigh] - centroid
+                        heapq.heappush(frontier,
+                                       (sqrt(diff.dot(diff)) + moved,
+                                        self.rng.random_sample(), neigh, step))
+                areaID = None
+                while frontier:
+                    key, tie, neigh, computed = frontier[0]
+                    if computed == step:
+                        heapq.heappop(frontier)
+                        areaID = neigh
+                        break
+                    diff = data[neigh] - centroid
+                    heapq.heapreplace(frontier,
+                                      (sqrt(diff.dot(diff)) + moved, tie,
+                                       neigh, step))
+                if areaID is None:
+                    break
+                inFrontier.discard(areaID)
+                self.assignGrowingArea(areaID, c, unassigned)
+                value += thresholdVar[areaID]
+                regionSum += data[areaID]
+                newCentroid = regionSum / len(self.region2Area[c])
+                diff = newCentroid - centroid
+                moved += sqrt(diff.dot(diff))
+                centroid = newCentroid
+                step += 1
+            self.regionValue[c] = value
+            if value >= self.regionalThreshold:
+                self.feasibleRegions[c] = self.region2Area[c]
+            c += 1
+        self.unassignedAreas = []
+        self.externalNeighs = set()
+        self.centroidSum = None
+
+    def assignGrowingArea(self, areaID, regionID, unassigned):
         """
-        Remove a region from candidates
+        Assign an area to the region grown by L{growThresholdRegions}
         """
-        for i in self.candidateInfo.keys():
-          a, r = i
-          if r in self.feasibleRegions:
-            self.candidateInfo.pop(i)
+        self.area2Region[areaID] = regionID
+        self.region2Area.addArea(regionID, areaID)
+        self.assignedAreas.append(areaID)
+        unassigned[areaID] = False
+        self.regionN = None
+        self.solutionHash = None
+        self.cutAreas.pop(regionID, None)
 
     def returnRegions(self):
         """
         Return regions created
         """
-        areasId = self.area2Region.keys()
-        areasId = np.sort(areasId).tolist()
-        return [self.area2Region[area] for area in areasId]
+        labels = self.area2Region.labels
+        return labels[labels != UNASSIGNED].tolist()
+
+    def getLabels(self):
+        """
+        Return a copy of the label array of the current solution
+        """
+        return self.area2Region.labels.copy()
+
+    def assignLabels(self, labels):
+        """
+        Assign all the areas to the regions given by a label array, without
+        growing the regions
+        """
+        self.area2Region = AreaLabels(self.n, labels)
+        self.region2Area = RegionMembers.fromLabels(self.area2Region.labels)
+        self.pRegions = len(self.region2Area)
+        self.NRegion = [0] * self.pRegions
+        self.assignedAreas = range(self.n)
+        self.unassignedAreas = []
+        self.solutionHash = None
+
+    def setLabels(self, labels):
+        """
+        Replace the current solution by the one given as a label array
+        """
+        labels = np.asarray(labels, dtype=np.int32)
+        current = self.area2Region.labels
+        changed = np.flatnonzero(current != labels)
+        if (current[changed] < 0).any() or (labels[changed] < 0).any():
+            self.area2Region = AreaLabels(self.n, labels)
+            self.region2Area = RegionMembers.fromLabels(self.area2Region.labels)
+            self.solutionHash = None
+            self.cutAreas = {}
+            self.centroidSum = None
+            if self.intraBorderingAreas:
+                self.getIntraBorderingAreas()
+            return
+        if len(changed) > 0:
+            self.centroidSum = None
+        for areaID in changed.tolist():
+            oldRegion = int(current[areaID])
+            regionID = int(labels[areaID])
+            self.region2Area.removeArea(oldRegion, areaID)
+            self.region2Area.addArea(regionID, areaID)
+            current[areaID] = regionID
+            self.updateSolutionHash(areaID, oldRegion, regionID)
+            self.updateBorderIndex(areaID, oldRegion, regionID)
+            self.cutAreas.pop(oldRegion, None)
+            self.cutAreas.pop(regionID, None)
+        for regionID in self.region2Area.keys():
+            if len(self.region2Area[regionID]) == 0:
+                del self.region2Area[regionID]
+
+    def getSolutionHash(self):
+        """
+        Return the 64-bit Zobrist hash of the current solution. It is
+        computed from the labels once and then updated on every move.
+        """
+        if self.solutionHash is None:
+            self.solutionHash = zobristHash(self.areaKeys,
+                                            self.area2Region.labels)
+        return self.solutionHash
+
+    def updateSolutionHash(self, areaID, oldRegion, regionID):
+        """
+        Update the hash of the solution when an area changes its region
+        """
+        if self.solutionHash is not None:
+            areaKey = self.areaKeys[areaID]
+            self.solutionHash ^= (zobristKey(areaKey, oldRegion) ^
+                                  zobristKey(areaKey, regionID))
 
     def resetNow(self):
         """
@@ -357,13 +628,21 @@ class RegionMaker:
         """
         self.unassignedAreas = self.areas.keys()
         self.assignedAreas = []
-        self.area2Region = {}
-        self.region2Area = {}
+        self.area2Region = AreaLabels(self.n)
+        self.region2Area = RegionMembers(self.n)
         self.potentialRegions4Area = {}
+        self.regionCandidates = {}
         self.intraBorderingAreas = {}
+        self.regionBorders = {}
+        self.neighRegionCounts = {}
         self.candidateInfo = {}
+        self.candidateHeap = []
         self.externalNeighs = set([])
         self.neighsMinusAssigned = set([])
+        self.regionN = None
+        self.centroidSum = None
+        self.cutAreas = {}
+        self.solutionHash = None
 
     def setSeeds(self, seeds, c=0):
         """
@@ -372,7 +651,7 @@ class RegionMaker:
         if self.numRegionsType == "Exogenous" and len(seeds) <= self.pRegions:
             idx = range(self.n)
             didx = list((set(idx) - set(seeds)) - self.am.noNeighs)
-            np.random.shuffle(didx)
+            self.rng.shuffle(didx)
             self.seeds = seeds + didx[0:(self.pRegions - len(seeds))]
         else:
             self.seeds = seeds
@@ -385,10 +664,11 @@ class RegionMaker:
         """
         Assign an area to a region
         """
-        a = self.areas[areaID]
-        neighs = a.neighs
-        try:
-            self.region2Area[regionID].append(areaID)
+        neighs = self.neighs[areaID]
+        if self.objectiveFunctionType == "GWalt":
+            a = self.areas[areaID]
+        if regionID in self.region2Area:
+            self.region2Area.addArea(regionID, areaID)
             if self.objectiveFunctionType == "GWalt":
                 try:
                     self.NRegion[regionID] += a.data[0]
@@ -399,8 +679,8 @@ class RegionMaker:
                     for index in range(1, len(a.data)):
                         self.data[regionID][index - 1] = a.data[index] * a.data[0]
                 self.N += a.data[0]
-        except:
-            self.region2Area[regionID] = [areaID]
+        else:
+            self.region2Area.addArea(regionID, areaID)
             if self.objectiveFunctionType == "GWalt":
                 self.NRegion[regionID] = a.data[0]
                 for index in range(1, len(a.data)):
@@ -410,6 +690,15 @@ class RegionMaker:
                         self.data[regionID] += [a.data[index] * a.data[0]]
                 self.N += a.data[0]
         self.area2Region[areaID] = regionID
+        self.regionN = None
+        if self.centroidSum is not None:
+            x = self.centroidData[areaID]
+            if regionID in self.centroidSum:
+                self.centroidSum[regionID] += x
+            else:
+                self.centroidSum[regionID] = x.copy()
+        self.cutAreas.pop(regionID, None)
+        self.solutionHash = None
         try:
             aid = self.unassignedAreas.remove(areaID)
         except:
@@ -429,15 +718,52 @@ class RegionMaker:
         Parameters
         """
         self.assignAreaStep1(areaID, regionID)
+        self.updatePotentialRegions(areaID, regionID)
+        self.changedRegion = 'null'
+        self.newExternal = self.potentialRegions4Area.keys()
+
+    def updatePotentialRegions(self, areaID, regionID):
+        """
+        Add regionID as a potential region of the unassigned neighbours of
+        an area that was just assigned, and remove the area as a candidate
+        """
         for neigh in self.neighsMinusAssigned:
             self.potentialRegions4Area.setdefault(neigh, set()).add(regionID)
+            self.regionCandidates.setdefault(regionID, set()).add(neigh)
+        for region in self.potentialRegions4Area.pop(areaID, ()):
+            self.regionCandidates[region].discard(areaID)
 
-        try:
-            self.potentialRegions4Area.pop(areaID)
-        except:
-            pass
-        self.changedRegion = 'null'
-        self.newExternal = self.potentialRegions4Area.keys()
+    def setCandidate(self, areaID, regionID, distance):
+        """
+        Set the distance of a candidate (area, region) of the construction
+        phase. The candidate is also pushed to a heap; outdated entries of
+        the heap are discarded when they are popped.
+        """
+        self.candidateInfo[(areaID, regionID)] = distance
+        heapq.heappush(self.candidateHeap,
+                       (distance, self.rng.random_sample(), areaID, regionID))
+        if len(self.candidateHeap) > 4 * len(self.candidateInfo) + 64:
+            self.candidateHeap = [(value, self.rng.random_sample()) + key
+                                  for key, value in self.candidateInfo.iteritems()]
+            heapq.heapify(self.candidateHeap)
+
+    def popCandidate(self):
+        """
+        Return the candidate (area, region) with the minimum distance, ties
+        are broken randomly. Return None if there are no candidates.
+        """
+        while self.candidateHeap:
+            distance, tie, areaID, regionID = heapq.heappop(self.candidateHeap)
+            if self.candidateInfo.get((areaID, regionID)) == distance:
+                return areaID, regionID
+        return None
+
+    def removeCandidateArea(self, areaID):
+        """
+        Remove all the candidates of an area
+        """
+        for region in self.potentialRegions4Area.get(areaID, ()):
+            self.candidateInfo.pop((areaID, region), None)
 
     def assignAreasNoNeighs(self):
         """
@@ -445,6 +771,7 @@ class RegionMaker:
         """
         noNeighs = list(self.am.noNeighs)
         nr = -1
+        self.solutionHash = None
         for areaID in noNeighs:
             self.area2Region[areaID] = nr
             try:
@@ -462,64 +789,111 @@ class RegionMaker:
         self.changedRegion = regionID
         self.addedArea = areaID
         self.assignAreaStep1(areaID, regionID)
-        for neigh in self.neighsMinusAssigned:
-            self.potentialRegions4Area.setdefault(neigh, set()).add(regionID)
-
-        try:
-            self.potentialRegions4Area.pop(areaID)
-        except:
-            pass
+        self.updatePotentialRegions(areaID, regionID)
 
     def returnBorderingAreas(self, regionID):
         """
-        Returns bordering areas of a region
+        Returns bordering areas of a region: the areas of the region with
+        neighbours in other regions. The set is kept up to date on every
+        move and must not be modified.
         """
-        areas2Eval = self.region2Area[regionID]
-        borderingAreas = set()
-        for area in areas2Eval:
-            try:
-                if len(self.intraBorderingAreas[area]) > 0:
-                    borderingAreas.add(area)
-            except:
-                pass
-        return borderingAreas
+        return self.regionBorders.get(regionID, set())
 
     def getIntraBorderingAreas(self):
         """
         Gets the intrabordering areas
         """
         self.intraBorderingAreas = {}
+        self.neighRegionCounts = {}
         if self.numRegionsType == "Exogenous":
             nr = range(self.pRegions)
         else:
             nr = self.feasibleRegions
         for regionID in nr:
-            setNeighsNoRegion = set()
             try:
                 areas2Eval = self.region2Area[regionID]
             except:
                 areas2Eval = []
 
             for area in areas2Eval:
-                setNeighsNoRegion.update(self.areas[area].neighs)
-            setNeighsNoRegion.difference_update(areas2Eval)
-
-            for neigh in setNeighsNoRegion:
+                for neigh in self.neighs[area]:
+                    counts = self.neighRegionCounts.setdefault(neigh, {})
+                    counts[regionID] = counts.get(regionID, 0) + 1
+                    if regionID != self.area2Region.get(neigh):
+                        self.intraBorderingAreas.setdefault(neigh, set()).add(regionID)
+        self.regionBorders = {}
+        for area in self.intraBorderingAreas:
+            regionID = self.area2Region.get(area)
+            if regionID is not None:
+                self.regionBorders.setdefault(regionID, set()).add(area)
+
+    def updateBorderIndex(self, areaID, oldRegion, regionID):
+        """
+        Update the number of neighbours each area has in every region
+        (neighRegionCounts), the intrabordering areas and the bordering areas
+        of each region (regionBorders) after an area moves from oldRegion to
+        regionID. Only the area and its neighbours change.
+        """
+        for neigh in self.neighs[areaID]:
+            counts = self.neighRegionCounts.setdefault(neigh, {})
+            neighRegion = self.area2Region.get(neigh)
+            if oldRegion in counts:
+                counts[oldRegion] -= 1
+                if counts[oldRegion] == 0:
+                    del counts[oldRegion]
+                    if neigh in self.intraBorderingAreas:
+                        self.intraBorderingAreas[neigh].discard(oldRegion)
+            counts[regionID] = counts.get(regionID, 0) + 1
+            if regionID != neighRegion:
                 self.intraBorderingAreas.setdefault(neigh, set()).add(regionID)
+            elif neigh in self.intraBorderingAreas:
+                self.intraBorderingAreas[neigh].discard(regionID)
+            if neigh in self.intraBorderingAreas and not self.intraBorderingAreas[neigh]:
+                del self.intraBorderingAreas[neigh]
+            self.updateRegionBorder(neigh, neighRegion)
+        borderRegions = set(self.neighRegionCounts.get(areaID, {}))
+        borderRegions.discard(regionID)
+        if borderRegions:
+            self.intraBorderingAreas[areaID] = borderRegions
+        else:
+            self.intraBorderingAreas.pop(areaID, None)
+        self.regionBorders.get(oldRegion, set()).discard(areaID)
+        self.updateRegionBorder(areaID, regionID)
+
+    def updateRegionBorder(self, areaID, regionID):
+        """
+        Keep an area among the bordering areas of its region (regionBorders)
+        only while it has neighbours in other regions
+        """
+        if regionID is None:
+            return
+        if areaID in self.intraBorderingAreas:
+            self.regionBorders.setdefault(regionID, set()).add(areaID)
+        elif regionID in self.regionBorders:
+            self.regionBorders[regionID].discard(areaID)
 
     def constructRegions(self, filteredCandidates=-99, filteredReg=-99):
         """
         Construct potential regions per area
         """
-        _d_stat = self.distanceStat
-        _wd_stat = self.weightsDistanceStat
-        _ida_stat = self.indexDataStat
-        _fun_am_d2r = self.am.getDistance2Region
-
         lastRegion = 0
-        for areaID in self.potentialRegions4Area.keys():
-            a = self.areas[areaID]
-            regionIDs = list(self.potentialRegions4Area[areaID])
+        if filteredCandidates == -99:
+
+            #  Only the distances to the region that just grew change, except
+            #  for the new external areas (after assigning seeds, all areas)
+
+            newExternal = set(self.newExternal)
+            areas2Eval = [(areaID, list(self.potentialRegions4Area[areaID]))
+                          for areaID in newExternal
+                          if areaID in self.potentialRegions4Area]
+            for areaID in self.regionCandidates.get(self.changedRegion, ()):
+                if areaID not in newExternal:
+                    areas2Eval.append((areaID, [self.changedRegion]))
+        else:
+            areas2Eval = [(areaID, list(regionIDs)) for areaID, regionIDs
+                          in self.potentialRegions4Area.iteritems()]
+        candidates = []
+        for areaID, regionIDs in areas2Eval:
             for region in regionIDs:
                 if (self.numRegionsType != "Exogenous" and
                     self.constructionStage == "growing"
@@ -529,29 +903,19 @@ class RegionMaker:
                     continue
                 else:
                     if filteredCandidates == -99:
-                        if (areaID not in self.newExternal and
-                            region != self.changedRegion):
-                            lastRegion = region
-                            pass
-                        else:
-                            _reg_dist = 0.0
-                            if self.selectionType != "FullRandom":
-                                _reg_dist = _fun_am_d2r(self.areas[areaID],
-                                                        self.region2Area[region],
-                                                        distanceStat = _d_stat,
-                                                        weights = _wd_stat,
-                                                        indexData = _ida_stat)
-                            self.candidateInfo[(areaID, region)] = _reg_dist
-
-                    elif (filteredCandidates != -99 and
-                          areaID in filteredCandidates and
+                        candidates.append((areaID, region))
+                    elif (areaID in filteredCandidates and
                           region == filteredReg):
-                        _reg_dist = _fun_am_d2r(self.areas[areaID],
-                                                self.region2Area[region],
-                                                distanceStat = _d_stat,
-                                                weights = _wd_stat,
-                                                indexData = _ida_stat)
-                        self.candidateInfo[(areaID, region)] = _reg_dist
+                        candidates.append((areaID, region))
+                    else:
+                        lastRegion = region
+
+        if filteredCandidates == -99 and self.selectionType == "FullRandom":
+            distances = [0.0] * len(candidates)
+        else:
+            distances = self.getCandidateDistances(candidates)
+        for (areaID, region), distance in zip(candidates, distances):
+            self.setCandidate(areaID, region, distance)
 
         if len(self.candidateInfo) == 0:
             self.changedRegion = lastRegion
@@ -559,18 +923,65 @@ class RegionMaker:
             self.filterCandidate(self.toRemove)
         selectionTypeDispatcher[self.selectionType](self)
 
+    def getCandidateDistances(self, candidates):
+        """
+        Return the distance from each candidate area to its region. With
+        the "Centroid" distance the regions keep the running sum of the
+        attributes of their areas, so all the distances are computed with
+        one matrix operation over the centroids.
+
+        @type candidates: list
+        @param candidates: List of candidates (areaID, regionID).
+        """
+        if len(candidates) == 0:
+            return []
+        if self.distanceStat != "Centroid":
+            return [self.am.getDistance2Region(self.areas[areaID],
+                                               self.region2Area[region],
+                                               distanceStat=self.distanceStat,
+                                               weights=self.weightsDistanceStat,
+                                               indexData=self.indexDataStat)
+                    for areaID, region in candidates]
+        if self.centroidSum is None:
+            self.initCentroidSums()
+        areaIndex = {}
+        regionIndex = {}
+        for areaID, region in candidates:
+            areaIndex.setdefault(areaID, len(areaIndex))
+            regionIndex.setdefault(region, len(regionIndex))
+        areaIDs = sorted(areaIndex, key=areaIndex.get)
+        regionIDs = sorted(regionIndex, key=regionIndex.get)
+        centroids = np.array([self.centroidSum[region] /
+                              len(self.region2Area[region])
+                              for region in regionIDs])
+        distances = getDistance2RegionCentroids(self.centroidData[areaIDs],
+                                                centroids)
+        return [distances[areaIndex[areaID], regionIndex[region]]
+                for areaID, region in candidates]
+
+    def initCentroidSums(self):
+        """
+        Compute the sum of the attributes of the areas of each region. The
+        sums are then updated each time an area is assigned.
+        """
+        if self.centroidData is None:
+            if isinstance(self.areas, AreaArrays):
+                self.centroidData = np.asarray(self.areas.data, dtype=float)
+            else:
+                self.centroidData = np.array([self.areas[areaID].data
+                                              for areaID in xrange(self.n)],
+                                             dtype=float)
+        self.centroidSum = {}
+        for region, areas in self.region2Area.iteritems():
+            if len(areas) > 0:
+                self.centroidSum[region] = self.centroidData[areas].sum(0)
+
     def filterCandidate(self, removeCandidate=[]):
         """
         Filter candidates
         """
-        if len(removeCandidate) > 0:
-            toRemove = []
-            for _id in removeCandidate:
-                for cand, reg in self.candidateInfo.keys():
-                    if cand == _id:
-                        toRemove.append((cand, reg))
-            for remov in toRemove:
-                self.candidateInfo.pop(remov)
+        for _id in removeCandidate:
+            self.removeCandidateArea(_id)
 
     def graspList(self, xList, alpha=0.0):
         """
@@ -583,7 +994,7 @@ class RegionMaker:
         indices = indexMultiple(candidates, 1)
         nCandidates = len(indices)
         idx = range(nCandidates)
-        np.random.shuffle(idx)
+        self.rng.shuffle(idx)
         random = idx[0]
         index4Grasp = indices[random]
         return index4Grasp
@@ -695,7 +1106,195 @@ class RegionMaker:
         """
         Calculate the value of the objective function
         """
-        self.objInfo = self.getObjective(self.region2Area)
+        if self.incrementalObj:
+            self.buildRegionStats()
+            self.objInfo = float(self.regionObj.sum())
+        else:
+            self.objInfo = self.getObjective(self.region2Area)
+
+    def rebuildSolutionState(self):
+        """
+        Rebuild the structures derived from the current solution after
+        region2Area is replaced.
+        """
+        self.cutAreas = {}
+        self.solutionHash = None
+        self.buildRegionStats()
+
+    def dropRegionStats(self):
+        """
+        Discard the statistics of the regions after the solution is replaced
+        with setLabels. They are rebuilt the next time they are needed.
+        """
+        self.regionN = None
+        self.regionSum = None
+        self.regionObj = None
+
+    def buildRegionStats(self):
+        """
+        Build the per-region sufficient statistics of the sum of squares
+        objective function: number of areas (regionN), sum of the attributes
+        (regionSum) and sum of squares to the centroid (regionObj).
+        """
+        if not self.incrementalObj:
+            return
+        if self.ofData is None:
+            if len(self.indexDataOF) == 0:
+                indexData = range(len(self.areas[0].data))
+            else:
+                indexData = self.indexDataOF
+            if isinstance(self.areas, AreaArrays):
+                data = self.areas.data
+            else:
+                data = np.array([self.areas[aID].data
+                                 for aID in xrange(self.n)], dtype=float)
+            self.ofData = np.asarray(data[:, indexData], dtype=float)
+        nr = max(self.region2Area.keys() + [-1]) + 1
+        self.regionN = np.zeros(nr)
+        self.regionSum = np.zeros((nr, self.ofData.shape[1]))
+        self.regionObj = np.zeros(nr)
+        for region, areasIdsIn in self.region2Area.iteritems():
+            if len(areasIdsIn) == 0:
+                continue
+            regionData = self.ofData[areasIdsIn]
+            self.regionN[region] = len(areasIdsIn)
+            self.regionSum[region] = regionData.sum(0)
+            centroid = self.regionSum[region] / self.regionN[region]
+            self.regionObj[region] = ((regionData - centroid) ** 2).sum()
+
+    def getMoveDelta(self, areaID, regionID):
+        """
+        Return the change in the sum of squares objective function when an
+        area is moved to regionID. It only uses the statistics of the two
+        regions involved in the move.
+        """
+        removal, addition = self.getMoveDeltaParts(areaID, regionID)
+        return addition - removal
+
+    def getMoveDeltaParts(self, areaID, regionID):
+        """
+        Return the decrease of the sum of squares of the region that loses
+        the area and the increase of the region that receives it
+        """
+        regionIn = self.area2Region[areaID]
+        x = self.ofData[areaID]
+        nIn = self.regionN[regionIn]
+        nOut = self.regionN[regionID]
+        removal = 0.0
+        if nIn > 1:
+            dIn = x - self.regionSum[regionIn] / nIn
+            removal = nIn / (nIn - 1.0) * np.dot(dIn, dIn)
+        dOut = x - self.regionSum[regionID] / nOut
+        addition = nOut / (nOut + 1.0) * np.dot(dOut, dOut)
+        return removal, addition
+
+    def scoreBorderMoves(self):
+        """
+        Return all the moves of a bordering area to a neighbouring region, as
+        long as the area is not alone in its region, together with the change
+        in the sum of squares objective function of each move. The moves are
+        returned as three arrays (areas, regions and deltas) sorted by area
+        and region. They are found and scored with vector operations over the
+        contiguity edges, split among self.scoringJobs processes.
+        """
+        if self.regionN is None:
+            self.calcObj()
+        if self.edges is None:
+            self.edges = contiguityEdges(self.areas, self.n)
+        src, dst = self.edges
+        labels = self.area2Region.labels
+        if self.scoringJobs > 1:
+            if (self.scoringPool is None or
+                self.scoringPool.nRegions < len(self.regionN)):
+                self.closeScoringPool()
+                self.scoringPool = ScoringPool(src, dst, self.ofData,
+                                               len(self.regionN),
+                                               self.scoringJobs)
+            moves = self.scoringPool.score(labels, self.regionN,
+                                           self.regionSum)
+        else:
+            moves = scoreEdgeMoves(src, dst, labels, self.regionN,
+                                   self.regionSum, self.ofData)
+        self.budget.count(len(moves[0]))
+        return moves
+
+    def closeScoringPool(self):
+        """
+        Stop the processes used to score the border moves, if any
+        """
+        if self.scoringPool is not None:
+            self.scoringPool.close()
+            self.scoringPool = None
+
+    def scoreMoves(self, areas, regions):
+        """
+        Return the moves given as lists of areas and target regions together
+        with the change in the sum of squares objective function of each
+        move, as three arrays (areas, regions and deltas)
+        """
+        if self.regionN is None:
+            self.calcObj()
+        areas = np.array(areas, dtype=int)
+        regions = np.array(regions, dtype=int)
+        self.budget.count(len(areas))
+        deltas = moveDeltas(areas, regions, self.area2Region.labels,
+                            self.regionN, self.regionSum, self.ofData)
+        return areas, regions, deltas
+
+    def evaluateMove(self, areaID, regionID):
+        """
+        Return the value of the objective function if an area is moved to
+        regionID, without moving it.
+        """
+        self.budget.count()
+        if self.incrementalObj:
+            if self.regionN is None:
+                self.calcObj()
+            return self.objInfo + self.getMoveDelta(areaID, regionID)
+        regionIn = self.area2Region[areaID]
+        self.trialMove(areaID, regionID)
+        obj = self.recalcObj(self.region2Area, [regionIn, regionID])
+        self.undoMove()
+        return obj
+
+    def trialMove(self, areaID, regionID):
+        """
+        Move an area to a region in place and record the move in the
+        journal, so it can be reverted with undoMove. Only the membership of
+        the regions is changed; the move must be undone before using the
+        indexes derived from the solution (bordering areas, cut areas and
+        region statistics).
+        """
+        oldRegion = self.area2Region[areaID]
+        self.moveJournal.append((areaID, oldRegion))
+        self.swapArea(areaID, regionID, self.region2Area, self.area2Region)
+        self.updateSolutionHash(areaID, oldRegion, regionID)
+
+    def undoMove(self):
+        """
+        Revert the last move recorded in the journal
+        """
+        areaID, regionID = self.moveJournal.pop()
+        self.updateSolutionHash(areaID, self.area2Region[areaID], regionID)
+        self.swapArea(areaID, regionID, self.region2Area, self.area2Region)
+
+    def checkThresholdMove(self, areaID, regionID):
+        """
+        Check that both regions satisfy the threshold after moving an area
+        to regionID
+        """
+        value = self.areas[areaID].thresholdVar
+        regionIn = self.area2Region[areaID]
+        return (self.regionValue[regionID] + value >= self.regionalThreshold and
+                self.regionValue[regionIn] - value >= self.regionalThreshold)
+
+    def dropObjDict(self):
+        """
+        Remove the objective function per region computed for the current
+        iteration of a tabu search, so it is never used once it is outdated
+        """
+        if hasattr(self, 'objDict'):
+            del self.objDict
 
     def recalcObj(self, region2AreaDict, modifiedRegions=[]):
         """
@@ -707,13 +1306,27 @@ class RegionMaker:
             obj = self.getObjective(region2AreaDict)
         return obj
 
+    def getCutAreas(self, regionID):
+        """
+        Return the areas that can not leave a region without breaking its
+        contiguity. The index is only recomputed for the regions modified
+        since the last query.
+        """
+        try:
+            return self.cutAreas[regionID]
+        except KeyError:
+            cutAreas = articulationPoints(self.region2Area[regionID],
+                                          self.neighs)
+            self.cutAreas[regionID] = cutAreas
+            return cutAreas
+
     def checkFeasibility(self, regionID, areaID,
                          region2AreaDict = None):
         """
         Check feasibility from a change region (remove an area from a region)
         """
-        if not region2AreaDict:
-            region2AreaDict = self.region2Area
+        if not region2AreaDict or region2AreaDict is self.region2Area:
+            return int(areaID not in self.getCutAreas(regionID))
         areas2Eval = list(region2AreaDict[regionID])
         a2r = set(region2AreaDict[regionID])
         aIDset = set([areaID])
@@ -721,7 +1334,7 @@ class RegionMaker:
         seedArea = areas2Eval[0]
         newRegion = set()
         newRegion.add(seedArea)
-        newRegion.update(self.areas[seedArea].neighs)
+        newRegion.update(self.neighs[seedArea])
         newRegion.intersection_update(areas2Eval)
         areas2Eval.remove(seedArea)
         flag = 1
@@ -731,7 +1344,7 @@ class RegionMaker:
 
         while flag:
             for area in newAdded:
-                newNeighs.update(self.areas[area].neighs)
+                newNeighs.update(self.neighs[area])
                 areas2Eval.remove(area)
             newNeighs.intersection_update(a2r)
             newNeighs.difference_update(aIDset, newRegion, newAdded)
@@ -769,70 +1382,170 @@ class RegionMaker:
             for area in areas2Eval:
                 self.regionValue[regionID] += self.areas[area].thresholdVar
 
+    def assignFeasibleRegions(self, feasibleRegions):
+        """
+        Rebuild a max-p solution from its feasible regions and assign the
+        enclaves (the areas left out of them) to the regions
+
+        @type feasibleRegions: dictionary
+        @param feasibleRegions: Areas of each feasible region, starting with
+        the seed of the region.
+        """
+        self.resetNow()
+        regionId = 0
+        for growReg in feasibleRegions:
+            areas = feasibleRegions[growReg]
+            self.assignSeeds(areas[0], regionId)
+            for areaInGrow in areas[1:]:
+                self.assignArea(areaInGrow, regionId)
+            regionId += 1
+        self.feasibleRegions = deepcopy(self.region2Area)
+        self.getIntraBorderingAreas()
+        self.newExternal = set(self.unassignedAreas)
+        if len(self.unassignedAreas) != 0:
+            self.constructionStage = "enclaves"
+            while len(self.unassignedAreas) != 0:
+                self.constructRegions()
+        self.objInfo = self.getObjective(self.region2Area)
+        self.feasibleRegions = deepcopy(self.region2Area)
+        self.getIntraBorderingAreas()
+        self.calculateRegionValueThreshold()
+        self.calcObj()
+
     def improvingCandidates(self):
         """
         Select solutions that improve the current objective function.
         """
-        intraCopy = deepcopy(self.intraBorderingAreas)
-        region2AreaCopy = deepcopy(self.region2Area)
-        area2RegionCopy = deepcopy(self.area2Region)
         self.neighSolutions = {}
-        for area in intraCopy.keys():
+        for area, regions4Move in self.intraBorderingAreas.iteritems():
             regionIn = self.area2Region[area]
-            regions4Move = list(self.intraBorderingAreas[area])
             if (len(self.region2Area[regionIn]) > 1):
                 for region in regions4Move:
-                    self.swapArea(area, region, region2AreaCopy, area2RegionCopy)
-                    obj = self.recalcObj(region2AreaCopy)
-                    self.swapArea(area, regionIn, region2AreaCopy, area2RegionCopy)
+                    obj = self.evaluateMove(area, region)
                     if obj < self.objInfo:
                         _feasible = self.checkFeasibility(regionIn, area, self.region2Area)
                         if _feasible == 1:
                             if self.numRegionsType == "Exogenous":
                                 self.neighSolutions[(area, region)] = obj
                             elif self.numRegionsType == "EndogenousThreshold":
-                                if (self.regionValue[region] >= self.regionalThreshold and
-                                    self.regionValue[regionIn] >= self.regionalThreshold):
+                                if self.checkThresholdMove(area, region):
                                     self.neighSolutions[(area,region)] = obj
 
     def allCandidates(self):
         """
         Select neighboring solutions.
         """
-        intraCopy = deepcopy(self.intraBorderingAreas)
-        reg2AreaCp = deepcopy(self.region2Area)
-        area2RegionCp = deepcopy(self.area2Region)
         neighSolutions = {}
-
-        for area in intraCopy.keys():
+        if self.incrementalObj:
+            moves, deltas = self.filterMoves(*self.scoreBorderMoves())
+            objs = (self.objInfo + deltas).tolist()
+            self.neighSolutions = dict(zip(moves, objs))
+            return
+
+        self.objDict = makeObjDict(self)
+        for area, regions4Move in self.intraBorderingAreas.iteritems():
             regionIn = self.area2Region[area]
-            regions4Move = list(self.intraBorderingAreas[area])
             if (len(self.region2Area[regionIn]) > 1):
                 for region in regions4Move:
                     _feasible = self.checkFeasibility(regionIn, area)
                     if _feasible == 1:
-                        self.swapArea(area, region, reg2AreaCp, area2RegionCp)
                         if self.numRegionsType == "Exogenous":
-                            modifiedRegions = [region, regionIn]
-                            obj = self.recalcObj(reg2AreaCp, modifiedRegions)
+                            obj = self.evaluateMove(area, region)
                             neighSolutions[(area, region)] = obj
                         elif (self.numRegionsType == "EndogenousThreshold" and
-                              self.regionValue[region] >= self.regionalThreshold and
-                              self.regionValue[regionIn] >= self.regionalThreshold):
-                            obj = self.recalcObj(reg2AreaCp)
+                              self.checkThresholdMove(area, region)):
+                            obj = self.evaluateMove(area, region)
                             neighSolutions[(area, region)] = obj
-                        self.swapArea(area, regionIn, reg2AreaCp, area2RegionCp)
 
         self.neighSolutions = neighSolutions
 
+    def filterMoves(self, areas, regions, deltas):
+        """
+        Keep the scored moves that do not break the contiguity of the region
+        that loses the area (and, for max-p, that keep both regions above the
+        threshold). Return the list of moves and the array of their deltas.
+        """
+        cut = np.zeros(self.n, dtype=bool)
+        for regionIn in np.unique(self.area2Region.labels[areas]):
+            cut[list(self.getCutAreas(regionIn))] = True
+        feasible = ~cut[areas]
+        moves = zip(areas[feasible].tolist(), regions[feasible].tolist())
+        deltas = deltas[feasible]
+        if self.numRegionsType == "EndogenousThreshold":
+            keep = np.array([self.checkThresholdMove(*move) for move in moves],
+                            dtype=bool)
+            moves = [move for move, k in zip(moves, keep) if k]
+            deltas = deltas[keep]
+        return moves, deltas
+
+    def buildMoveQueue(self):
+        """
+        Return a queue with the feasible border moves of the current solution
+        """
+        queue = MoveQueue()
+        moves, deltas = self.filterMoves(*self.scoreBorderMoves())
+        for (area, region), delta in zip(moves, deltas.tolist()):
+            queue.push(area, region, delta)
+        self.queuedMoves = []
+        return queue
+
+    def queueCandidates(self, queue, tabuList):
+        """
+        Select neighboring solutions from a queue of moves. The moves are
+        taken in increasing order of the objective function until one that is
+        not tabu is found; better moves that are tabu are also kept as
+        candidates.
+        """
+        queue.restore(self.queuedMoves)
+        self.neighSolutions = {}
+        entry = queue.pop()
+        while entry is not None:
+            self.queuedMoves.append(entry)
+            delta, area, region = entry
+            self.neighSolutions[(area, region)] = self.objInfo + delta
+            if (area, region) not in tabuList:
+                break
+            entry = queue.pop()
+
+    def updateMoveQueue(self, queue, regionIDs):
+        """
+        Update the queue of moves after the regions in regionIDs changed.
+        Only the moves of the areas in those regions, or into them, are
+        scored again.
+        """
+        queue.restore(self.queuedMoves)
+        changed = set(regionIDs)
+        toUpdate = set()
+        for region in changed:
+            for area in self.region2Area[region]:
+                toUpdate.add(area)
+                toUpdate.update(self.neighs[area])
+        areas = []
+        regions = []
+        for area in toUpdate:
+            regionIn = self.area2Region[area]
+            if regionIn in changed:
+                queue.discardArea(area)
+                regions4Move = self.intraBorderingAreas.get(area, ())
+            else:
+                for region in changed:
+                    queue.discard(area, region)
+                regions4Move = changed & self.intraBorderingAreas.get(area, set())
+            if len(self.region2Area[regionIn]) > 1:
+                areas.extend([area] * len(regions4Move))
+                regions.extend(regions4Move)
+        moves, deltas = self.filterMoves(*self.scoreMoves(areas, regions))
+        for (area, region), delta in zip(moves, deltas.tolist()):
+            queue.push(area, region, delta)
+
     def allMoves(self):
         """
         Select all posible moves.
         """
         moves = []
-        for area in self.intraBorderingAreas:
+        for area in sorted(self.intraBorderingAreas):
             regionIn = self.area2Region[area]
-            regions4Move = list(self.intraBorderingAreas[area])
+            regions4Move = sorted(self.intraBorderingAreas[area])
             if len(self.region2Area[regionIn]) > 1:
                 for region in regions4Move:
                     moves.append((area, region))
@@ -843,8 +1556,8 @@ class RegionMaker:
         Take an area from a region and give it to another
         """
         oldRegion = area2RegionDict[area]
-        region2AreaDict[oldRegion].remove(area)
-        region2AreaDict[newRegion].append(area)
+        region2AreaDict.removeArea(oldRegion, area)
+        region2AreaDict.addArea(newRegion, area)
         area2RegionDict[area] = newRegion
         if self.objectiveFunctionType == "GWalt":
             a = self.areas[area]
@@ -871,9 +1584,9 @@ class RegionMaker:
             if len(self.neighSolutions.keys()) == 0:
                 flag = 0
             else:
-                sortedk = sortedKeys(self.neighSolutions)
+                sortedk = sortedKeys(self.neighSolutions, self.rng)
                 if typeGreedy == "exact":
-                    move = sortedk[np.random.randint(0, len(sortedk))]
+                    move = sortedk[self.rng.randint(0, len(sortedk))]
                     area, region = move
                 else:
                     values = self.neighSolutions.values()
@@ -881,22 +1594,18 @@ class RegionMaker:
                     indicesMin = indexMultiple(values, minVal)
                     nInd = len(indicesMin)
                     idx = range(nInd)
-                    np.random.shuffle(idx)
+                    self.rng.shuffle(idx)
                     minIndex = indicesMin[idx[0]]
                     area,region = self.neighSolutions.keys()[minIndex]
                 self.moveArea(area, region)
 
         self.regions = self.returnRegions()
 
-    def updateTabuList(self, newValue, aList, endInd):
-        """
-        Add a new value to the tabu list.
-        """
-        return [newValue] + aList[0:endInd-1]
-
-    def tabuMove(self, tabuLength = 5, convTabu = 5, typeTabu="exact"):
+    def tabuMove(self, tabuLength = 5, convTabu = 5, typeTabu="exact",
+                 resume = None):
         """
-        Conduct a solution to the best posible with tabu search
+        Conduct a solution to the best posible with tabu search. If resume is
+        given, the search continues from the variables saved in a checkpoint.
         """
         is_exact_type = (typeTabu == "exact")
         is_rand_type = (typeTabu == "random")
@@ -904,138 +1613,170 @@ class RegionMaker:
         currentOBJ = self.objInfo
         aspireRegions = self.returnRegions()
         currentRegions = aspireRegions
-        region2AreaAspire = deepcopy(self.region2Area)
-        area2RegionAspire = deepcopy(self.area2Region)
+        labelsAspire = self.getLabels()
         bestAdmisable = 9999999.0
-        tabuList = [0]*tabuLength
+        tabuList = TabuMemory(tabuLength)
         cBreak = []
         c = 1
         self.round = 0
         resList = []
         epsilon = 1e-10
-
-        while c <= convTabu:
-            if is_exact_type:
-                self.objDict = makeObjDict(self)
-                self.allCandidates()
-            else:
-                moves = self.allMoves()
-
-            if ((is_exact_type and len(self.neighSolutions) == 0) or
-                (is_rand_type and len(moves) == 0)):
-                c += convTabu
-            else:
-                if is_exact_type:
-                    sortedk = sortedKeys(self.neighSolutions)
-                    end = len(sortedk)
+        useQueue = is_exact_type and self.incrementalObj
+        try:
+            if resume is not None:
+                aspireOBJ = resume["aspireOBJ"]
+                currentOBJ = resume["currentOBJ"]
+                labelsAspire = resume["labelsAspire"]
+                aspireRegions = labelsAspire[labelsAspire != UNASSIGNED].tolist()
+                currentRegions = aspireRegions
+                tabuList = resume["tabuList"]
+                cBreak = resume["cBreak"]
+                c = resume["c"]
+                resList = resume["resList"]
+                if useQueue:
+                    queue = resume["queue"]
+                    self.queuedMoves = resume["queuedMoves"]
+            elif useQueue:
+                queue = self.buildMoveQueue()
+
+            while c <= convTabu and not self.budget.exhausted():
+                if self.checkpointDue():
+                    loop = {"aspireOBJ": aspireOBJ, "currentOBJ": currentOBJ,
+                            "labelsAspire": labelsAspire, "tabuList": tabuList,
+                            "cBreak": cBreak, "c": c, "resList": resList}
+                    if useQueue:
+                        loop["queue"] = queue
+                        loop["queuedMoves"] = self.queuedMoves
+                    self.saveSearchState("tabuMove",
+                                         (tabuLength, convTabu, typeTabu), loop)
+                if useQueue:
+                    self.queueCandidates(queue, tabuList)
+                elif is_exact_type:
+                    self.allCandidates()
                 else:
-                    end = len(moves)
-                run = 0
+                    moves = self.allMoves()
 
-                while run < end:
+                if ((is_exact_type and len(self.neighSolutions) == 0) or
+                    (is_rand_type and len(moves) == 0)):
+                    c += convTabu
+                else:
                     if is_exact_type:
-                        move = sortedk[run]
-                        area, region = move
-                        obj4Move = self.neighSolutions[move]
-                        candidate = 1
+                        sortedk = sortedKeys(self.neighSolutions, self.rng)
+                        end = len(sortedk)
                     else:
-                        candidate = 0
-                        region2AreaCopy = deepcopy(self.region2Area)
-                        area2RegionCopy = deepcopy(self.area2Region)
-                        while (candidate == 0 and len(moves) > 0):
-                            move = moves[np.random.randint(0, len(moves))]
-                            moves.remove(move)
-                            area, region = move
-                            run += 1
-                            regionIn = self.area2Region[area]
-                            _feasible = self.checkFeasibility(regionIn, area)
-                            if _feasible == 1:
-                                self.swapArea(area, region, region2AreaCopy,
-                                              area2RegionCopy)
-
-                                if self.numRegionsType == "Exogenous":
-                                    obj4Move = self.recalcObj(region2AreaCopy)
-                                    candidate = 1
-                                elif (self.numRegionsType == "EndogenousThreshold" and
-                                      self.regionValue[region] >= self.regionalThreshold and
-                                      self.regionValue[regionIn] >= self.regionalThreshold):
-                                    obj4Move = self.recalcObj(region2AreaCopy)
-                                    candidate = 1
-
-                                self.swapArea(area, regionIn, region2AreaCopy,
-                                              area2RegionCopy)
-
-                    tabuCount = 0
-                    if candidate == 0:
-                        c += convTabu
-                        continue
+                        end = len(moves)
+                    run = 0
 
-                    if move in tabuList:
-                        if (aspireOBJ - obj4Move) > epsilon:
+                    while run < end:
+                        if is_exact_type:
+                            move = sortedk[run]
+                            area, region = move
+                            obj4Move = self.neighSolutions[move]
+                            candidate = 1
+                        else:
+                            candidate = 0
+                            while (candidate == 0 and len(moves) > 0):
+                                move = moves[self.rng.randint(0, len(moves))]
+                                moves.remove(move)
+                                area, region = move
+                                run += 1
+                                regionIn = self.area2Region[area]
+                                _feasible = self.checkFeasibility(regionIn, area)
+                                if _feasible == 1:
+                                    if self.numRegionsType == "Exogenous":
+                                        obj4Move = self.evaluateMove(area, region)
+                                        candidate = 1
+                                    elif (self.numRegionsType == "EndogenousThreshold" and
+                                          self.checkThresholdMove(area, region)):
+                                        obj4Move = self.evaluateMove(area, region)
+                                        candidate = 1
+
+                        tabuCount = 0
+                        if candidate == 0:
+                            c += convTabu
+                            continue
+
+                        if move in tabuList:
+                            if (aspireOBJ - obj4Move) > epsilon:
+                                oldRegion = self.area2Region[area]
+                                tabuList.add((area, oldRegion))
+                                self.moveArea(area, region)
+                                if useQueue:
+                                    self.updateMoveQueue(queue, [oldRegion, region])
+                                self.objInfo = obj4Move
+                                aspireOBJ = obj4Move
+                                currentOBJ = obj4Move
+                                aspireRegions = self.returnRegions()
+                                currentRegions = aspireRegions
+                                labelsAspire = self.getLabels()
+                                bestAdmisable = obj4Move
+                                cBreak.append(c)
+                                c = 1
+                                run = end
+                                resList.append([obj4Move, aspireOBJ])
+                            else:
+                                run += 1
+                                tabuCount += 1
+                                tabuList.age()
+                                if tabuCount == end:
+                                    c = convTabu
+                        else:
                             oldRegion = self.area2Region[area]
-                            tabuList = self.updateTabuList((area, oldRegion),
-                                                           tabuList, tabuLength)
+                            tabuList.add((area, oldRegion))
                             self.moveArea(area, region)
+                            if useQueue:
+                                self.updateMoveQueue(queue, [oldRegion, region])
                             self.objInfo = obj4Move
-                            aspireOBJ = obj4Move
                             currentOBJ = obj4Move
-                            aspireRegions = self.returnRegions()
-                            currentRegions = aspireRegions
-                            region2AreaAspire = deepcopy(self.region2Area)
-                            area2RegionAspire = deepcopy(self.area2Region)
+                            if (aspireOBJ - obj4Move) > epsilon:
+                                aspireOBJ = obj4Move
+                                aspireRegions = self.returnRegions()
+                                currentRegions = self.returnRegions()
+                                labelsAspire = self.getLabels()
+                                cBreak.append(c)
+                                c = 1
+                            else:
+                                currentRegions = self.returnRegions()
+                                c += 1
                             bestAdmisable = obj4Move
-                            cBreak.append(c)
-                            c = 1
                             run = end
                             resList.append([obj4Move, aspireOBJ])
-                        else:
-                            run += 1
-                            tabuCount += 1
-                            tabuList = self.updateTabuList((-1, 0),
-                                                           tabuList, tabuLength)
-                            if tabuCount == end:
-                                c = convTabu
-                    else:
-                        oldRegion = self.area2Region[area]
-                        tabuList = self.updateTabuList((area, oldRegion),
-                                                       tabuList, tabuLength)
-                        self.moveArea(area, region)
-                        self.objInfo = obj4Move
-                        currentOBJ = obj4Move
-                        if (aspireOBJ - obj4Move) > epsilon:
-                            aspireOBJ = obj4Move
-                            aspireRegions = self.returnRegions()
-                            currentRegions = self.returnRegions()
-                            region2AreaAspire = deepcopy(self.region2Area)
-                            area2RegionAspire = deepcopy(self.area2Region)
-                            cBreak.append(c)
-                            c = 1
-                        else:
-                            currentRegions = self.returnRegions()
-                            c += 1
-                        bestAdmisable = obj4Move
-                        run = end
-                        resList.append([obj4Move, aspireOBJ])
+        finally:
+            self.closeScoringPool()
 
         self.objInfo = aspireOBJ
         self.regions = aspireRegions
-        self.region2Area = deepcopy(region2AreaAspire)
-        self.area2Region = deepcopy(area2RegionAspire)
+        self.setLabels(labelsAspire)
+        self.rebuildSolutionState()
+        self.dropObjDict()
+        self.terminationReason = self.budget.reason or "convergence"
         self.resList = resList
         self.cBreak = cBreak
 
-    def AZPImproving(self):
+    def AZPImproving(self, dontLookBits=False):
         """
+        Openshaw's AZP local search: visit the regions in random order and
+        move their bordering areas to a neighbouring region when the
+        objective function does not get worse, until a pass over the regions
+        ends without a move in the last region visited.
+
+        @type dontLookBits: boolean
+        @keyword dontLookBits: Use L{AZPImprovingDontLook} instead, which skips
+        the areas examined without finding a move until they or one of their
+        neighbours change region.
         """
+        if dontLookBits:
+            self.AZPImprovingDontLook()
+            return
         improve = 1
-        while improve == 1:
+        while improve == 1 and not self.budget.exhausted():
             regions = range(0, self.pRegions)
             while len(regions) > 0:
 
                 # step 3
 
                 if len(regions) > 1:
-                    randomRegion = np.random.randint(0, len(regions))
+                    randomRegion = self.rng.randint(0, len(regions))
                 else:
                     randomRegion = 0
                 region = regions[randomRegion]
@@ -1043,76 +1784,183 @@ class RegionMaker:
 
                 # step 4
 
-                borderingAreas = list(set(self.returnBorderingAreas(region)) & set(self.region2Area[region]))
+                borderingAreas = self.areasToLook(region)
                 improve = 0
-                while len(borderingAreas) > 0:
+                while (len(borderingAreas) > 0 and
+                       not self.budget.exhausted()):
 
                     # step 5
 
-                    randomArea = np.random.randint(0, len(borderingAreas))
+                    randomArea = self.rng.randint(0, len(borderingAreas))
                     area = borderingAreas[randomArea]
                     borderingAreas.remove(area)
-                    posibleMove = list(self.intraBorderingAreas[area])
+                    posibleMove = sorted(self.intraBorderingAreas[area])
                     if len(self.region2Area[region]) >= 2:
                         f = self.checkFeasibility(region, area, self.region2Area)
                     else:
                         f = 0
                     if f == 1:
                         for move in posibleMove:
-                            self.swapArea(area, move, self.region2Area, self.area2Region)
-                            obj = self.recalcObj(self.region2Area)
-                            self.swapArea(area, region, self.region2Area, self.area2Region)
+                            obj = self.evaluateMove(area, move)
                             if obj <= self.objInfo:
                                 self.moveArea(area, move)
                                 improve = 1
-                                borderingAreas = list(set(self.returnBorderingAreas(region)) & set(self.region2Area[region]))
+                                borderingAreas = self.areasToLook(region)
                                 break
+        self.terminationReason = self.budget.reason or "convergence"
 
-    def AZPSA(self, alpha = 0.85, maxit = 2):
-        """ Openshaw's Simulated Annealing for AZP algorithm
+    def AZPImprovingDontLook(self):
+        """
+        AZP local search with don't-look bits. The areas examined without
+        finding a move are skipped in later passes until they or one of their
+        neighbours change region. The search stops when a pass over all the
+        areas, with the bits cleared, does not improve the objective function
+        by more than a tolerance.
         """
-        basicMemory = ExtMem()
-        localBasicMemory = ExtMem()
+        epsilon = 1e-10
+        dontLook = np.zeros(self.n, dtype=bool)
+        fullPass = True
+        improve = 1
+        while improve == 1 and not self.budget.exhausted():
+            improve = 0
+            regions = range(0, self.pRegions)
+            while len(regions) > 0:
+
+                # step 3
+
+                if len(regions) > 1:
+                    randomRegion = self.rng.randint(0, len(regions))
+                else:
+                    randomRegion = 0
+                region = regions[randomRegion]
+                regions.remove(region)
+
+                # step 4
+
+                borderingAreas = self.areasToLook(region, dontLook)
+                while (len(borderingAreas) > 0 and
+                       not self.budget.exhausted()):
+
+                    # step 5
+
+                    randomArea = self.rng.randint(0, len(borderingAreas))
+                    area = borderingAreas[randomArea]
+                    borderingAreas.remove(area)
+                    posibleMove = sorted(self.intraBorderingAreas[area])
+                    if len(self.region2Area[region]) >= 2:
+                        f = self.checkFeasibility(region, area, self.region2Area)
+                    else:
+                        f = 0
+                    moved = 0
+                    if f == 1:
+                        for move in posibleMove:
+                            obj = self.evaluateMove(area, move)
+                            if obj <= self.objInfo:
+                                if self.objInfo - obj > epsilon:
+                                    improve = 1
+                                self.moveArea(area, move)
+                                moved = 1
+                                dontLook[area] = False
+                                dontLook[self.neighs[area]] = False
+                                borderingAreas = self.areasToLook(region, dontLook)
+                                break
+                    if moved == 0:
+                        dontLook[area] = True
+            if improve == 1:
+                fullPass = False
+            elif not fullPass:
+                dontLook[:] = False
+                fullPass = True
+                improve = 1
+        self.terminationReason = self.budget.reason or "convergence"
+
+    def areasToLook(self, region, dontLook=None):
+        """
+        Return, sorted, the bordering areas of a region whose don't-look bit
+        is not set
+        """
+        borderingAreas = sorted(self.returnBorderingAreas(region))
+        if dontLook is None:
+            return borderingAreas
+        return [area for area in borderingAreas if not dontLook[area]]
+
+    def AZPSA(self, alpha = 0.85, maxit = 2, resume = None):
+        """ Openshaw's Simulated Annealing for AZP algorithm. The best solution
+        is kept as a label array that is only copied when a pass of
+        L{modified_azp_for_sa} improves it, and it is restored when the
+        temperature loop ends. The moves of each temperature are counted in
+        self.annealingStats. If resume is given, the search continues from
+        the variables saved in a checkpoint.
+        """
+        bestOBJ = float("inf")
+        labelsBest = None
         T = 1
         k = 0
-        while k < 3:
+        self.annealingStats = []
+        if resume is not None:
+            bestOBJ = resume["bestOBJ"]
+            labelsBest = resume["labelsBest"]
+            T = resume["T"]
+            k = resume["k"]
+            self.annealingStats = resume["annealingStats"]
+        while k < 3 and not self.budget.exhausted():
+            if self.checkpointDue():
+                loop = {"bestOBJ": bestOBJ, "labelsBest": labelsBest,
+                        "T": T, "k": k,
+                        "annealingStats": self.annealingStats}
+                self.saveSearchState("AZPSA", (alpha, maxit), loop)
             improved = 0
+            stats = {"temperature": T, "improvingMoves": 0,
+                     "totalMoves": 0, "acceptedMoves": 0}
             for i in range(maxit):
-                localBasicMemory.updateExtendedMemory(self)
-                self.modified_azp_for_sa(alpha, T)
-                if self.objInfo < localBasicMemory.objInfo:
+                if self.budget.exhausted():
+                    break
+                localOBJ = self.objInfo
+                improving, total, accepted = self.modified_azp_for_sa(alpha, T)
+                stats["improvingMoves"] += improving
+                stats["totalMoves"] += total
+                stats["acceptedMoves"] += accepted
+                if self.objInfo < localOBJ:
                     improved = 1
-                if self.objInfo < basicMemory.objInfo:
-                    basicMemory.updateExtendedMemory(self)
+                if self.objInfo < bestOBJ:
+                    bestOBJ = self.objInfo
+                    labelsBest = self.getLabels()
+            self.annealingStats.append(stats)
             T *= alpha
             if improved == 1:
                 k = 0
             else:
                 k += 1
-        self.recoverFromExtendedMemory(basicMemory)
+        if (labelsBest is not None and
+            (self.area2Region.labels != labelsBest).any()):
+            self.setLabels(labelsBest)
+            self.dropRegionStats()
+            self.objInfo = bestOBJ
+        self.terminationReason = self.budget.reason or "convergence"
 
     def modified_azp_for_sa(self, alpha, temperature):
         """
-        Openshaw's modified step #5 for AZP-SA algorithm
+        Openshaw's modified step #5 for AZP-SA algorithm. The best solution
+        of the pass is only copied, as a label array, when a non-improving
+        move leaves it, and it is only restored if the pass does not end
+        there. Return the number of improving moves, of non-improving moves
+        evaluated and of non-improving moves accepted.
         """
+        improvingMoves = 0
         totalMoves = 0
         acceptedMoves = 0
         bestOBJ = self.objInfo
         currentOBJ = self.objInfo
-        bestRegions = self.returnRegions()
-        currentRegions = self.returnRegions()
-        region2AreaBest = deepcopy(self.region2Area)
-        area2RegionBest = deepcopy(self.area2Region)
-
+        labelsBest = None
         improve = 1
-        while improve == 1:
+        while improve == 1 and not self.budget.exhausted():
             regions = range(0, self.pRegions)
             while len(regions) > 0:
 
                 #  step 3
 
                 if len(regions) > 1:
-                    randomRegion = np.random.randint(0, len(regions) - 1)
+                    randomRegion = self.rng.randint(0, len(regions) - 1)
                 else:
                     randomRegion = 0
                 region = regions[randomRegion]
@@ -1120,16 +1968,17 @@ class RegionMaker:
 
                 # step 4
 
-                borderingAreas = list(set(self.returnBorderingAreas(region)) & set(self.region2Area[region]))
+                borderingAreas = sorted(self.returnBorderingAreas(region))
                 improve = 0
-                while len(borderingAreas) > 0:
+                while (len(borderingAreas) > 0 and
+                       not self.budget.exhausted()):
 
                     # step 5
 
-                    randomArea = np.random.randint(0, len(borderingAreas))
+                    randomArea = self.rng.randint(0, len(borderingAreas))
                     area = borderingAreas[randomArea]
                     borderingAreas.remove(area)
-                    posibleMove = list(self.intraBorderingAreas[area])
+                    posibleMove = sorted(self.intraBorderingAreas[area])
                     if len(self.region2Area[region]) >= 2:
                         f = self.checkFeasibility(region, area, self.region2Area)
                     else:
@@ -1139,306 +1988,452 @@ class RegionMaker:
 
                             #  if len(region2AreaCopy[area2RegionCopy[area]]) > 1:
 
-                            self.swapArea(area, move, self.region2Area, self.area2Region)
-                            obj = self.recalcObj(self.region2Area)
-                            self.swapArea(area, region, self.region2Area, self.area2Region)
+                            obj = self.evaluateMove(area, move)
                             if obj <= bestOBJ:
                                 self.moveArea(area, move)
                                 improve = 1
+                                improvingMoves += 1
                                 self.objInfo = obj
                                 bestOBJ = obj
                                 currentOBJ = obj
-                                bestRegions = self.returnRegions()
-                                currentRegions = self.returnRegions()
-                                region2AreaBest = deepcopy(self.region2Area)
-                                area2RegionBest = deepcopy(self.area2Region)
-                                borderingAreas = list(set(self.returnBorderingAreas(region)) & set(self.region2Area[region]))
+                                labelsBest = None
+                                borderingAreas = sorted(self.returnBorderingAreas(region))
                                 break
                             else:
-                                random = np.random.rand(1)[0]
+                                random = self.rng.rand(1)[0]
                                 totalMoves += 1
                                 if (np.exp(-(obj - currentOBJ) / (currentOBJ * temperature))) > random:
                                     acceptedMoves += 1
+                                    if labelsBest is None:
+                                        labelsBest = self.getLabels()
                                     self.moveArea(area, move)
                                     self.objInfo = obj
                                     currentOBJ = obj
-                                    currentRegions = self.returnRegions()
 
                                     #  print "--- NON-improving move (area, region)", area, move
                                     #  print "--- New Objective Function value: ", obj
                                     #  step 4
-                                    borderingAreas = list(set(self.returnBorderingAreas(region)) & set(self.region2Area[region]))
+                                    borderingAreas = sorted(self.returnBorderingAreas(region))
                                     break
+        if labelsBest is not None:
+            self.setLabels(labelsBest)
+            self.dropRegionStats()
         self.objInfo = bestOBJ
-        self.region2Area = deepcopy(region2AreaBest)
-        self.area2Region = deepcopy(area2RegionBest)
-        self.getIntraBorderingAreas()
+        return improvingMoves, totalMoves, acceptedMoves
 
-    def AZPTabuMove(self, tabuLength=5, convTabu=5):
+    def AZPTabuMove(self, tabuLength=5, convTabu=5, resume=None):
         """
-        Tabu search algorithm for Openshaws AZP-tabu (1995)
+        Tabu search algorithm for Openshaws AZP-tabu (1995). If resume is
+        given, the search continues from the variables saved in a checkpoint.
         """
         aspireOBJ = self.objInfo
         currentOBJ = self.objInfo
         aspireRegions = self.returnRegions()
-        region2AreaAspire = deepcopy(self.region2Area)
-        area2RegionAspire = deepcopy(self.area2Region)
+        labelsAspire = self.getLabels()
         currentRegions = deepcopy(aspireRegions)
-        tabuList = np.zeros(tabuLength)
-        tabuList = tabuList.tolist()
+        tabuList = TabuMemory(tabuLength)
         cBreak = []
         c = 1
         self.round = 0
         resList = []
         epsilon = 1e-10
-
-        while c <= convTabu:
-            self.objDict = makeObjDict(self)
-            self.allCandidates()
-            if len(self.neighSolutions) == 0:
-                c += convTabu
-            else:
-                minFound = 0
-                neighSolutionsCopy = deepcopy(self.neighSolutions)
-                c += 1
-                neighNoTabuKeys = list(set(neighSolutionsCopy.keys()) - set(tabuList))
-                neighNoTabuDict = dict((key, neighSolutionsCopy[key]) for key in neighNoTabuKeys)
-                if len(neighNoTabuDict) > 0:
-                    move = min(neighNoTabuDict, key = lambda x: neighNoTabuDict.get(x))
-                    obj4Move = self.neighSolutions[move]
-                    moveNoTabu = move
-                    obj4MoveNoTabu = obj4Move
-                    if (currentOBJ - obj4Move) >= epsilon:
-                        minFound = 1
-                    else:
-                        neighTabuKeys = list(set(neighSolutionsCopy.keys()) & set(tabuList))
-                        neighTabuDict = dict((key, neighSolutionsCopy[key]) for key in neighTabuKeys)
-                        if len(neighTabuDict) > 0:
-                            move = min(neighTabuDict, key = lambda x: neighTabuDict.get(x))
-                            obj4Move = self.neighSolutions[move]
-                            moveTabu = move
-                            obj4MoveTabu = obj4Move
-                            if (aspireOBJ - obj4Move) > epsilon:
-                                minFound = 1
-                if minFound == 1:
-                    area, region = move
-                    obj4Move = self.neighSolutions[move]
-                    oldRegion = self.area2Region[area]
-                    tabuList = self.updateTabuList((area, oldRegion), tabuList, tabuLength)
-                    self.moveArea(area, region)
-                    self.objInfo = obj4Move
-                    if (aspireOBJ - obj4Move) > epsilon:
-                        aspireOBJ = obj4Move
-                        aspireRegions = self.returnRegions()
-                        region2AreaAspire = deepcopy(self.region2Area)
-                        area2RegionAspire = deepcopy(self.area2Region)
-                        c = 1
-                    currentOBJ = obj4Move
-                    currentRegions = self.returnRegions()
+        useQueue = self.incrementalObj
+        try:
+            if resume is not None:
+                aspireOBJ = resume["aspireOBJ"]
+                currentOBJ = resume["currentOBJ"]
+                labelsAspire = resume["labelsAspire"]
+                aspireRegions = labelsAspire[labelsAspire != UNASSIGNED].tolist()
+                currentRegions = self.returnRegions()
+                tabuList = resume["tabuList"]
+                c = resume["c"]
+                if useQueue:
+                    queue = resume["queue"]
+                    self.queuedMoves = resume["queuedMoves"]
+            elif useQueue:
+                queue = self.buildMoveQueue()
+
+            while c <= convTabu and not self.budget.exhausted():
+                if self.checkpointDue():
+                    loop = {"aspireOBJ": aspireOBJ, "currentOBJ": currentOBJ,
+                            "labelsAspire": labelsAspire, "tabuList": tabuList,
+                            "c": c}
+                    if useQueue:
+                        loop["queue"] = queue
+                        loop["queuedMoves"] = self.queuedMoves
+                    self.saveSearchState("AZPTabuMove", (tabuLength, convTabu),
+                                         loop)
+                if useQueue:
+                    self.queueCandidates(queue, tabuList)
                 else:
-                    move = moveNoTabu
-                    area, region = move
-                    obj4Move = self.neighSolutions[move]
-                    oldRegion = self.area2Region[area]
-                    tabuList = self.updateTabuList((area, oldRegion), tabuList, tabuLength)
-                    self.moveArea(area, region)
-                    self.objInfo = obj4Move
-                    currentOBJ = obj4Move
-                    currentRegions = self.returnRegions()
+                    self.allCandidates()
+                if len(self.neighSolutions) == 0:
+                    c += convTabu
+                else:
+                    minFound = 0
+                    neighSolutionsCopy = deepcopy(self.neighSolutions)
+                    c += 1
+                    neighNoTabuKeys = [key for key in neighSolutionsCopy
+                                       if key not in tabuList]
+                    neighNoTabuDict = dict((key, neighSolutionsCopy[key]) for key in neighNoTabuKeys)
+                    if len(neighNoTabuDict) > 0:
+                        move = min(neighNoTabuDict, key = lambda x: neighNoTabuDict.get(x))
+                        obj4Move = self.neighSolutions[move]
+                        moveNoTabu = move
+                        obj4MoveNoTabu = obj4Move
+                        if (currentOBJ - obj4Move) >= epsilon:
+                            minFound = 1
+                        else:
+                            neighTabuKeys = [key for key in neighSolutionsCopy
+                                             if key in tabuList]
+                            neighTabuDict = dict((key, neighSolutionsCopy[key]) for key in neighTabuKeys)
+                            if len(neighTabuDict) > 0:
+                                move = min(neighTabuDict, key = lambda x: neighTabuDict.get(x))
+                                obj4Move = self.neighSolutions[move]
+                                moveTabu = move
+                                obj4MoveTabu = obj4Move
+                                if (aspireOBJ - obj4Move) > epsilon:
+                                    minFound = 1
+                    if minFound == 1:
+                        area, region = move
+                        obj4Move = self.neighSolutions[move]
+                        oldRegion = self.area2Region[area]
+                        tabuList.add((area, oldRegion))
+                        self.moveArea(area, region)
+                        if useQueue:
+                            self.updateMoveQueue(queue, [oldRegion, region])
+                        self.objInfo = obj4Move
+                        if (aspireOBJ - obj4Move) > epsilon:
+                            aspireOBJ = obj4Move
+                            aspireRegions = self.returnRegions()
+                            labelsAspire = self.getLabels()
+                            c = 1
+                        currentOBJ = obj4Move
+                        currentRegions = self.returnRegions()
+                    else:
+                        move = moveNoTabu
+                        area, region = move
+                        obj4Move = self.neighSolutions[move]
+                        oldRegion = self.area2Region[area]
+                        tabuList.add((area, oldRegion))
+                        self.moveArea(area, region)
+                        if useQueue:
+                            self.updateMoveQueue(queue, [oldRegion, region])
+                        self.objInfo = obj4Move
+                        currentOBJ = obj4Move
+                        currentRegions = self.returnRegions()
+        finally:
+            self.closeScoringPool()
         self.objInfo = aspireOBJ
         self.regions = aspireRegions
-        self.region2Area = deepcopy(region2AreaAspire)
-        self.area2Region = deepcopy(area2RegionAspire)
+        self.setLabels(labelsAspire)
+        self.rebuildSolutionState()
+        self.dropObjDict()
+        self.terminationReason = self.budget.reason or "convergence"
         self.resList = resList
 
-    def reactiveTabuMove(self, convTabu=99):
+    def reactiveTabuMove(self, convTabu=99, resume=None):
         """
         AZP
-        Openshaw's Reactive Tabu algorithm
+        Openshaw's Reactive Tabu algorithm. If resume is given, the search
+        continues from the variables saved in a checkpoint.
         """
 
         #  step 2
 
         tabuLength = 1
-        tabuList = np.zeros(tabuLength)
-        tabuList = tabuList.tolist()
+        tabuList = TabuMemory(tabuLength)
         rAvg = 1
         K1 = 3
         K2 = 3
-        visitedSolutions = []
+        visitedSolutions = {}
         allVisitedSolutions = {}
         self.round = 0
         epsilon = 1e-10
         aspireOBJ = self.objInfo
         aspireRegions = self.returnRegions()
-        region2AreaAspire = deepcopy(self.region2Area)
-        area2RegionAspire = deepcopy(self.area2Region)
+        labelsAspire = self.getLabels()
         c = 1
-        while c <= convTabu:
-            improved = 0
+        try:
+            if resume is not None:
+                tabuLength = resume["tabuLength"]
+                tabuList = resume["tabuList"]
+                rAvg = resume["rAvg"]
+                visitedSolutions = resume["visitedSolutions"]
+                allVisitedSolutions = resume["allVisitedSolutions"]
+                aspireOBJ = resume["aspireOBJ"]
+                labelsAspire = resume["labelsAspire"]
+                aspireRegions = labelsAspire[labelsAspire != UNASSIGNED].tolist()
+                c = resume["c"]
+            while c <= convTabu and not self.budget.exhausted():
+                if self.checkpointDue():
+                    loop = {"tabuLength": tabuLength, "tabuList": tabuList,
+                            "rAvg": rAvg, "visitedSolutions": visitedSolutions,
+                            "allVisitedSolutions": allVisitedSolutions,
+                            "aspireOBJ": aspireOBJ, "labelsAspire": labelsAspire,
+                            "c": c}
+                    self.saveSearchState("reactiveTabuMove", (convTabu,), loop)
+                improved = 0
 
-            #  step 3
+                #  step 3
 
-            self.objDict = makeObjDict(self)
-            self.allCandidates()
-            if len(self.neighSolutions) == 0:
-                c += convTabu
-            else:
-                neighSolutionsCopy = deepcopy(self.neighSolutions)
-                neighNoTabuKeys = list(set(neighSolutionsCopy.keys()) - set(tabuList))
-                neighNoTabuDict = dict((key, neighSolutionsCopy[key]) for key in neighNoTabuKeys)
+                self.allCandidates()
+                if len(self.neighSolutions) == 0:
+                    c += convTabu
+                else:
+                    neighSolutionsCopy = deepcopy(self.neighSolutions)
+                    neighNoTabuKeys = [key for key in neighSolutionsCopy
+                                       if key not in tabuList]
+                    neighNoTabuDict = dict((key, neighSolutionsCopy[key]) for key in neighNoTabuKeys)
 
-                # step 4
+                    # step 4
 
-                if len(neighNoTabuDict) > 0:
-                    move = min(neighNoTabuDict, key = lambda x: neighNoTabuDict.get(x))
+                    if len(neighNoTabuDict) > 0:
+                        move = min(neighNoTabuDict, key = lambda x: neighNoTabuDict.get(x))
+                        obj4Move = self.neighSolutions[move]
+                    else:
+                        c += convTabu
+                        break;
+
+                    #  step 5
+
+                    area, region = move
                     obj4Move = self.neighSolutions[move]
-                else:
-                    c += convTabu
-                    break;
+                    oldRegion = self.area2Region[area]
+                    tabuList.add((area, oldRegion))
+                    self.moveArea(area, region)
+                    self.objInfo = obj4Move
 
-                #  step 5
+                    #  update aspirational
 
-                area, region = move
-                obj4Move = self.neighSolutions[move]
-                oldRegion = self.area2Region[area]
-                tabuList = self.updateTabuList((area, oldRegion), tabuList, tabuLength)
-                self.moveArea(area, region)
-                self.objInfo = obj4Move
+                    if  (aspireOBJ - obj4Move) > epsilon:
+                        aspireOBJ = obj4Move
+                        aspireRegions = self.returnRegions()
+                        labelsAspire = self.getLabels()
+                        improved = 1
 
-                #  update aspirational
+                    #  step 6
 
-                if  (aspireOBJ - obj4Move) > epsilon:
-                    aspireOBJ = obj4Move
-                    aspireRegions = self.returnRegions()
-                    region2AreaAspire = deepcopy(self.region2Area)
-                    area2RegionAspire = deepcopy(self.area2Region)
-                    improved = 1
+                    currentSystem = self.getSolutionHash()
+                    nVisits = visitedSolutions.get(currentSystem, 0)
+                    if nVisits == 0:
 
-                #  step 6
+                        #  zoning system not found (go to step 10)
+                        #  step 10
 
-                currentSystem = self.returnRegions()
-                nVisits = visitedSolutions.count(currentSystem)
-                if nVisits == 0:
+                        visitedSolutions[currentSystem] = 1
 
-                    #  zoning system not found (go to step 10)
-                    #  step 10
+                    #  step 7
 
-                    visitedSolutions.append(currentSystem)
+                    elif nVisits > K1:
+                        nVisitsAll = allVisitedSolutions.get(currentSystem, 0) + 1
+                        allVisitedSolutions[currentSystem] = nVisitsAll
+                        if nVisitsAll >= K2:
 
-                #  step 7
+                            #  go to step 11
+                            #  step 11a
 
-                elif nVisits > K1:
-                    try:
-                        nVisitsAll = allVisitedSolutions[currentSystem]
-                    except:
-                        nVisitsAll = 0
-                    nVisitsAll =+ 1
-                    allVisitedSolutions[currentSystem] = nVisitsAll
-                    if nVisitsAll >= K2:
-
-                        #  go to step 11
-                        #  step 11a
-
-                        visitedSolutions = []
-                        self.objDict = makeObjDict(self)
-                        self.allCandidates()
-                        moveIndex = range(len(self.neighSolutions))
-                        np.random.suffle(moveIndex)
-                        for move in moveIndex[0:int(1 + 0.5 * rAvg)]:
-                            area, region = move
-                            obj4Move = self.neighSolutions[move]
-                            oldRegion = self.area2Region[area]
-                            tabuList = self.updateTabuList((area,oldRegion), tabuList, tabuLength)
-                            self.moveArea(area, region)
-                            obj4Move = self.neighSolutions[move]
+                            visitedSolutions = {}
+                            self.allCandidates()
+                            randomMoves = self.neighSolutions.keys()
+                            self.rng.shuffle(randomMoves)
+                            for move in randomMoves[0:int(1 + 0.5 * rAvg)]:
+                                area, region = move
+                                oldRegion = self.area2Region[area]
+                                if (region not in self.intraBorderingAreas.get(area, ()) or
+                                    len(self.region2Area[oldRegion]) == 1 or
+                                    self.checkFeasibility(oldRegion, area) == 0):
+                                    #  an earlier random move changed the region
+                                    continue
+                                obj4Move = self.evaluateMove(area, region)
+                                tabuList.add((area,oldRegion))
+                                self.moveArea(area, region)
+                                self.objInfo = obj4Move
 
-                            #  update aspirational
+                                #  update aspirational
 
-                            if (aspireOBJ-obj4Move) > epsilon:
-                                aspireOBJ = obj4Move
-                                aspireRegions = self.returnRegions()
-                                region2AreaAspire = deepcopy(self.region2Area)
-                                area2RegionAspire = deepcopy(self.area2Region)
-                                improved = 1
+                                if (aspireOBJ-obj4Move) > epsilon:
+                                    aspireOBJ = obj4Move
+                                    aspireRegions = self.returnRegions()
+                                    labelsAspire = self.getLabels()
+                                    improved = 1
 
-                #  step 8
+                    #  step 8
 
-                elif nVisits < K1:
-                    rAvg += 1
-                    tabuLength = 1.1*tabuLength
+                    elif nVisits < K1:
+                        rAvg += 1
+                        tabuLength = 1.1*tabuLength
 
-                    #  step 9
+                        #  step 9
 
-                    if tabuLength > rAvg:
-                        tabuLength = max(0.9 * tabuLength, 1)
-                    tabuLength = int(round(tabuLength))
+                        if tabuLength > rAvg:
+                            tabuLength = max(0.9 * tabuLength, 1)
+                        tabuLength = int(round(tabuLength))
+                        tabuList.tenure = tabuLength
 
-                    #  step 10
+                        #  step 10
 
-                    visitedSolutions.append(currentSystem)
-                if improved == 1:
-                    c = 1
-                else:
-                    c += 1
+                        visitedSolutions[currentSystem] = nVisits + 1
+                    if improved == 1:
+                        c = 1
+                    else:
+                        c += 1
+        finally:
+            self.closeScoringPool()
 
         self.objInfo = aspireOBJ
         self.regions = aspireRegions
-        self.region2Area = deepcopy(region2AreaAspire)
-        self.area2Region = deepcopy(area2RegionAspire)
+        self.setLabels(labelsAspire)
+        self.rebuildSolutionState()
+        self.dropObjDict()
+        self.terminationReason = self.budget.reason or "convergence"
 
     def moveArea(self, areaID, regionID):
         """
         Move an area to a region
         """
         oldRegion = self.area2Region[areaID]
-        self.region2Area[oldRegion].remove(areaID)
-        self.region2Area[regionID].append(areaID)
+        updateStats = self.incrementalObj and self.regionN is not None
+        if updateStats:
+            removal, addition = self.getMoveDeltaParts(areaID, regionID)
+            x = self.ofData[areaID]
+            self.regionN[oldRegion] -= 1
+            self.regionN[regionID] += 1
+            self.regionSum[oldRegion] -= x
+            self.regionSum[regionID] += x
+            self.regionObj[oldRegion] -= removal
+            self.regionObj[regionID] += addition
+            self.objInfo += float(addition - removal)
+        self.region2Area.removeArea(oldRegion, areaID)
+        self.region2Area.addArea(regionID, areaID)
         self.area2Region[areaID] = regionID
-        a = self.areas[areaID]
-        toUpdate = [areaID] + a.neighs
+        self.centroidSum = None
+        self.updateSolutionHash(areaID, oldRegion, regionID)
+        self.cutAreas.pop(oldRegion, None)
+        self.cutAreas.pop(regionID, None)
         if self.objectiveFunctionType == "GWalt":
+            a = self.areas[areaID]
             self.NRegion[regionID] += a.data[0]
             self.NRegion[oldRegion] -= a.data[0]
+            try:
+                for index in range(1, len(a.data)):
+                    self.data[regionID][index - 1] += a.data[index] * a.data[0]
+                #for index in range(1, len(a.data)):
+                    self.data[oldRegion][index - 1] -= a.data[index] *a.data[0]
+            except:
+                pass
         if self.numRegionsType == "EndogenousThreshold":
-            self.regionValue[regionID] += self.areas[areaID].thresholdVar
-            self.regionValue[oldRegion] -= self.areas[areaID].thresholdVar
-        try:
-            for index in range(1, len(a.data)):
-                self.data[regionID][index - 1] += a.data[index] * a.data[0]
-            #for index in range(1, len(a.data)):
-                self.data[oldRegion][index - 1] -= a.data[index] *a.data[0]
-        except:
-            pass
-        for area in toUpdate:
-            regionIn = self.area2Region[area]
-            areasIdsIn = self.region2Area[regionIn]
-            areasInNow = [self.areas[aID] for aID in areasIdsIn]
-            areasInRegion = set(areasIdsIn)
-            aNeighs = set(self.areas[area].neighs)
-            neighsInOther = aNeighs - areasInRegion # neighs of this area in other regions
-            if len(neighsInOther) == 0 and area in self.intraBorderingAreas:
-                self.intraBorderingAreas.pop(area)
-            else:
-                borderRegions = set([])
-                for neigh in neighsInOther:
-                    borderRegions = borderRegions | set([self.area2Region[neigh]])
-                if area in self.intraBorderingAreas:
-                    self.intraBorderingAreas.pop(area)
-                self.intraBorderingAreas[area] = borderRegions
-                #_tmp = set()
-                #for neig in self.areas[area].neighs:
-                #    _tmp.add(self.area2Region[neig])
-
-                #_tmp.discard(self.area2Region[area])
-                #self.intraBorderingAreas[area] = _tmp
-        self.calcObj()
+            value = self.areas[areaID].thresholdVar
+            self.regionValue[regionID] += value
+            self.regionValue[oldRegion] -= value
+        self.updateBorderIndex(areaID, oldRegion, regionID)
+        if not updateStats:
+            self.calcObj()
 
     def recoverFromExtendedMemory(self, extendedMemory):
         """
         Recover a solution form the extended memory
         """
         self.objInfo = extendedMemory.objInfo
-        self.area2Region = extendedMemory.area2Region
-        self.region2Area = extendedMemory.region2Area
-        self.intraBorderingAreas = extendedMemory.intraBorderingAreas
+        self.setLabels(extendedMemory.area2Region.labels)
+        self.rebuildSolutionState()
+
+    def checkpointDue(self):
+        """
+        Count an iteration of the local search and return True if its state
+        must be saved to the checkpoint before the iteration
+        """
+        if self.checkpoint is None:
+            return False
+        self.iterations += 1
+        return self.iterations % self.checkpointEvery == 0
+
+    def saveSearchState(self, search, args, loop):
+        """
+        Save the state of a local search to the checkpoint: the method and
+        its arguments, the variables of its loop (loop), the current
+        solution with its statistics, the state of the random number
+        generator and the counters.
+        """
+        state = {"search": search,
+                 "args": args,
+                 "loop": loop,
+                 "problem": self.checkpointProblem(),
+                 "labels": self.getLabels(),
+                 "pRegions": self.pRegions,
+                 "objInfo": self.objInfo,
+                 "regionStats": (self.regionN, self.regionSum, self.regionObj),
+                 "regionValue": getattr(self, "regionValue", None),
+                 "solutionHash": self.solutionHash,
+                 "areaKeys": self.areaKeys,
+                 "rng": self.rng.get_state(),
+                 "iterations": self.iterations - 1,
+                 "evaluations": self.budget.evaluations}
+        saveCheckpoint(self.checkpoint, state)
+
+    def checkpointProblem(self):
+        """
+        Return the number of areas and the options of the problem, which
+        are saved in the checkpoints to recognize the problem they belong to
+        """
+        return {"n": self.n,
+                "distanceType": self.distanceType,
+                "distanceStat": self.distanceStat,
+                "selectionType": self.selectionType,
+                "objectiveFunctionType": self.objectiveFunctionType,
+                "numRegionsType": self.numRegionsType,
+                "threshold": getattr(self, "regionalThreshold", None)}
+
+    def resumeSearch(self, state=None, pRegions=None, search=None, args=None):
+        """
+        Continue the local search saved in a checkpoint, by default the one
+        in self.checkpoint. The region maker must solve the same problem, with
+        the same options, as the one that saved the checkpoint; its solution
+        is replaced by the saved one. With the sum of squares objective
+        function the search follows the same trajectory, and finds the same
+        solution, as if it had never been interrupted.
+
+        @type state: dictionary
+        @keyword state: Checkpoint read with L{loadCheckpoint}.
+
+        @type pRegions: integer
+        @keyword pRegions: Number of regions expected in the checkpoint, by
+        default None (not checked).
+
+        @type search: string
+        @keyword search: Name of the local search method expected in the
+        checkpoint, by default None (not checked).
+
+        @type args: tuple
+        @keyword args: Arguments of the local search expected in the
+        checkpoint, by default None (not checked).
+        """
+        if state is None:
+            state = loadCheckpoint(self.checkpoint)
+        expected = [("problem", state.get("problem"), self.checkpointProblem()),
+                    ("pRegions", state["pRegions"], pRegions),
+                    ("search", state["search"], search),
+                    ("args", tuple(state["args"]), args)]
+        for name, saved, value in expected:
+            if value is not None and saved != value:
+                message = "\n The checkpoint %s was saved by a different "\
+                "search: %s is %r in the checkpoint and %r in this run. "\
+                "Remove the checkpoint or use another file." % \
+                (self.checkpoint, name, saved, value)
+                raise Exception(message)
+        self.area2Region = AreaLabels(self.n, state["labels"])
+        self.region2Area = RegionMembers.fromLabels(self.area2Region.labels)
+        self.pRegions = state["pRegions"]
+        self.centroidSum = None
+        self.getIntraBorderingAreas()
+        self.rebuildSolutionState()
+        self.objInfo = state["objInfo"]
+        self.regionN, self.regionSum, self.regionObj = state["regionStats"]
+        if state["regionValue"] is not None:
+            self.regionValue = state["regionValue"]
+        self.solutionHash = state["solutionHash"]
+        self.areaKeys = state["areaKeys"]
+        self.rng.set_state(state["rng"])
+        self.iterations = state["iterations"]
+        self.budget.evaluations = state["evaluations"]
+        getattr(self, state["search"])(*state["args"], resume=state["loop"])
@@ -0,0 +1,65 @@
+# encoding: latin2
+"""Algorithm utilities
+G{packagetree core}
+"""
+__author__ = "Juan C. Duque"
+__credits__ = "Copyright (c) 2009-11 Juan C. Duque"
+__license__ = "New BSD License"
+__version__ = "1.0.0"
+__maintainer__ = "RiSE Group"
+__email__ = "contacto@rise-group.org"
+
+from time import time
+
+class SearchBudget:
+    """
+    Limits of a local search: a deadline, as given by time.time(), and a
+    maximum number of evaluations of the objective function for a move. The
+    searches check the budget between iterations, so they stop with the
+    best solution found so far once it is exhausted. The budget is
+    exhausted for good: self.reason keeps the first limit reached
+    ("timeLimit" or "maxEvaluations").
+    """
+    def __init__(self, deadline=None, maxEvaluations=None):
+        """
+        @type deadline: float
+        @keyword deadline: Time, in seconds since the epoch, after which the
+        searches stop, by default None (no time limit).
+
+        @type maxEvaluations: integer
+        @keyword maxEvaluations: Number of moves evaluated after which the
+        searches stop, by default None (no limit).
+        """
+        self.deadline = deadline
+        self.maxEvaluations = maxEvaluations
+        self.evaluations = 0
+        self.reason = None
+
+    def count(self, evaluations=1):
+        """
+        Record the evaluation of moves
+        """
+        self.evaluations += evaluations
+
+    def exhausted(self):
+        """
+        Return True if any of the limits has been reached
+        """
+        if self.reason is None:
+            if (self.maxEvaluations is not None and
+                self.evaluations >= self.maxEvaluations):
+                self.reason = "maxEvaluations"
+            elif self.deadline is not None and time() >= self.deadline:
+                self.reason = "timeLimit"
+        return self.reason is not None
+
+def makeDeadline(timeLimit, start=None):
+    """
+    Return the deadline of a search that may run for timeLimit seconds from
+    start (by default, now), or None if timeLimit is None
+    """
+    if timeLimit is None:
+        return None
+    if start is None:
+        start = time()
+    return start + timeLimit
@@ -0,0 +1,110 @@
+# encoding: latin2
+"""
+Seed selection types
+"""
+__author__ = "Juan C. Duque"
+__credits__ = "Copyright (c) 2009-11 Juan C. Duque"
+__license__ = "New BSD License"
+__version__ = "1.0.0"
+__maintainer__ = "RiSE Group"
+__email__ = "contacto@rise-group.org"
+
+import numpy as np
+
+def sampleAreas(weights, size=1, rng=np.random):
+    """
+    Draw areas with probability proportional to their weights
+    """
+    cumulative = np.cumsum(weights)
+    draws = rng.uniform(0, cumulative[-1], size)
+    picks = np.searchsorted(cumulative, draws, side="right")
+    return np.minimum(picks, len(weights) - 1)
+
+def seedWeights(minDistances, candidates, seeds):
+    """
+    Weight of each area to become the next seed: its distance to the
+    nearest seed. If all the candidates are at distance zero, the candidates
+    that are not seeds yet are weighted equally.
+    """
+    weights = minDistances * candidates
+    if weights.sum() <= 0:
+        weights = candidates.astype(float)
+        weights[seeds] = 0.0
+        if weights.sum() <= 0:
+            weights = candidates.astype(float)
+    return weights
+
+def kmeansSeeds(distance2Area, pRegions, candidates, trials=1, rng=np.random):
+    """
+    Select the seeds with k-means++: the first seed is drawn uniformly and
+    each next seed with probability proportional to the distance to the
+    nearest seed. With several trials per seed (greedy k-means++) the trial
+    that reduces the most the total distance to the seeds is kept.
+
+    @type distance2Area: function
+    @param distance2Area: Return the distances from all the areas to an area.
+
+    @type pRegions: integer
+    @param pRegions: Number of seeds.
+
+    @type candidates: numpy.ndarray
+    @param candidates: Boolean mask of the areas that can be seeds.
+
+    @type trials: integer
+    @keyword trials: Number of candidate seeds drawn per seed.
+
+    @type rng: numpy.random.RandomState
+    @keyword rng: Random number generator.
+    """
+    seeds = []
+    minDistances = None
+    for k in xrange(pRegions):
+        if minDistances is None:
+            seed = sampleAreas(candidates.astype(float), rng=rng)[0]
+            distances = distance2Area(seed)
+            minDistances = distances
+        else:
+            weights = seedWeights(minDistances, candidates, seeds)
+            bestPotential = None
+            for trial in sampleAreas(weights, trials, rng):
+                trialDistances = np.minimum(minDistances,
+                                            distance2Area(trial))
+                potential = trialDistances[candidates].sum()
+                if bestPotential is None or potential < bestPotential:
+                    bestPotential = potential
+                    seed = trial
+                    distances = trialDistances
+            minDistances = distances
+        seeds.append(int(seed))
+    return seeds
+
+def greedyKmeansSeeds(distance2Area, pRegions, candidates, rng=np.random):
+    """
+    Select the seeds with greedy k-means++, drawing 2 + log(p) trials per
+    seed
+    """
+    trials = 2 + int(np.log(max(pRegions, 1)))
+    return kmeansSeeds(distance2Area, pRegions, candidates, trials, rng)
+
+def farthestSeeds(distance2Area, pRegions, candidates, rng=np.random):
+    """
+    Select the seeds with farthest-first traversal: the first seed is drawn
+    uniformly and each next seed is the area farthest from its nearest seed
+    """
+    seeds = []
+    minDistances = None
+    for k in xrange(pRegions):
+        if minDistances is None:
+            seed = sampleAreas(candidates.astype(float), rng=rng)[0]
+            minDistances = distance2Area(seed)
+        else:
+            weights = seedWeights(minDistances, candidates, seeds)
+            seed = np.argmax(weights)
+            minDistances = np.minimum(minDistances, distance2Area(seed))
+        seeds.append(int(seed))
+    return seeds
+
+seedSelectionDispatcher = {}
+seedSelectionDispatcher["kmeans"] = kmeansSeeds
+seedSelectionDispatcher["greedyKmeans"] = greedyKmeansSeeds
+seedSelectionDispatcher["farthest"] = farthestSeeds
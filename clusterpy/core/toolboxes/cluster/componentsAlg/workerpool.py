@@ -0,0 +1,320 @@
+# encoding: latin2
+"""Algorithm utilities
+G{packagetree core}
+"""
+__author__ = "Juan C. Duque"
+__credits__ = "Copyright (c) 2009-11 Juan C. Duque"
+__license__ = "New BSD License"
+__version__ = "1.0.0"
+__maintainer__ = "RiSE Group"
+__email__ = "contacto@rise-group.org"
+
+import os
+import atexit
+import cPickle
+import hashlib
+import numpy as np
+from multiprocessing import Pool, cpu_count
+from time import time
+from regionmaker import RegionMaker
+from helperfunctions import makeRng
+from checkpoint import loadCheckpoint
+
+#  Problem solved by the worker processes: the area manager and the options
+#  of the region makers. It is given to the pool once, when the workers are
+#  forked, so the tasks only carry seeds and labels.
+
+sharedProblem = {}
+
+#  Worker pools kept between runs by sharedWorkerPool, by problem key. Only
+#  the pool of the last problem is kept.
+
+workerPools = {}
+
+def initWorker(problem):
+    """
+    Keep the problem in the worker process
+    """
+    sharedProblem.clear()
+    sharedProblem.update(problem)
+
+def makeRegionMaker(pRegions, initialSolution, seed, **options):
+    """
+    Create a region maker for the shared problem. The options override the
+    ones of the problem.
+    """
+    regionMakerOptions = dict(sharedProblem["options"])
+    regionMakerOptions.update(options)
+    return RegionMaker(sharedProblem["am"], pRegions,
+                       initialSolution=initialSolution,
+                       seed=seed,
+                       **regionMakerOptions)
+
+def constructSolution(pRegions, initialSolution, seed):
+    """
+    Construct an initial solution. Return its objective function value and
+    its labels.
+    """
+    rm = makeRegionMaker(pRegions, initialSolution, seed)
+    return rm.objInfo, rm.getLabels()
+
+def improveSolution(labels, seed, tabuLength, convTabu, deadline=None,
+                    maxEvaluations=None):
+    """
+    Improve a solution, given as a label array, with Tabu Search. The
+    search starts from that exact solution. Return the objective function
+    value, the regions, the number of moves evaluated and the reason why
+    the search stopped.
+    """
+    rm = makeRegionMaker(0, [], seed, initialLabels=labels,
+                         deadline=deadline, maxEvaluations=maxEvaluations)
+    rm.tabuMove(tabuLength=tabuLength, convTabu=convTabu)
+    return (rm.objInfo, rm.regions, rm.budget.evaluations,
+            rm.terminationReason)
+
+def growFeasibleRegions(seed, first=True):
+    """
+    Grow the feasible regions of a max-p solution. Return the number of
+    feasible regions, the objective function value of the partial solution,
+    the feasible region of each area (-1 for the enclaves) and the seed of
+    each feasible region. Once the deadline of the problem has passed, only
+    the first construction is run: the others return None.
+    """
+    deadline = sharedProblem["options"].get("deadline")
+    if not first and deadline is not None and time() >= deadline:
+        return None
+    rm = makeRegionMaker(0, [], seed)
+    rm.getObj()
+    labels = np.empty(rm.n, dtype=np.int32)
+    labels.fill(-1)
+    seeds = np.empty(len(rm.feasibleRegions), dtype=np.int32)
+    for regionId, growReg in enumerate(sorted(rm.feasibleRegions)):
+        labels[rm.feasibleRegions[growReg]] = regionId
+        seeds[regionId] = rm.feasibleRegions[growReg][0]
+    return len(rm.feasibleRegions), rm.objInfo, labels, seeds
+
+def improveFeasibleRegions(labels, seeds, seed, tabuLength, convTabu,
+                           typeTabu):
+    """
+    Assign the enclaves of a max-p solution, given by the labels and the
+    seeds returned by L{growFeasibleRegions}, and improve it with Tabu
+    Search. Return the same values as L{improveSolution}.
+    """
+    feasibleRegions = dict((regionId, [areaID]) for regionId, areaID
+                           in enumerate(seeds.tolist()))
+    for area in np.flatnonzero(labels >= 0).tolist():
+        regionId = int(labels[area])
+        if area != feasibleRegions[regionId][0]:
+            feasibleRegions[regionId].append(area)
+    rm = RegionMaker(sharedProblem["am"], 0, seed=seed,
+                     feasibleRegions=feasibleRegions,
+                     **sharedProblem["options"])
+    rm.tabuMove(tabuLength, convTabu=convTabu, typeTabu=typeTabu)
+    rm.calcObj()
+    return (rm.objInfo, rm.returnRegions(), rm.budget.evaluations,
+            rm.terminationReason)
+
+def localSearch(am, options, pRegions, initialSolution, seed, search,
+                searchArgs, recalcObj, checkpoint=None):
+    """
+    Construct a solution and improve it with a local search method of
+    L{RegionMaker}. Return the objective function value, the regions and the
+    statistics of the run. If the checkpoint file exists, the search saved
+    in it is continued instead; an error is raised if it was saved by a
+    different search. The checkpoint is removed when the search ends, unless
+    it was stopped by the time limit, so it can be continued by another run.
+
+    @type search: string
+    @param search: Name of the local search method (e.g. "AZPImproving").
+
+    @type searchArgs: tuple
+    @param searchArgs: Arguments of the local search method.
+
+    @type recalcObj: boolean
+    @param recalcObj: Recompute the objective function after the search.
+
+    @type checkpoint: string
+    @keyword checkpoint: File where the state of the search is saved.
+    """
+    start = time()
+    if checkpoint is not None and os.path.exists(checkpoint):
+        state = loadCheckpoint(checkpoint)
+        rm = RegionMaker(am, pRegions, initialSolution=state["labels"].tolist(),
+                         seed=seed, checkpoint=checkpoint, **options)
+        initialObj = None
+        rm.resumeSearch(state, pRegions, search, tuple(searchArgs))
+    else:
+        rm = RegionMaker(am, pRegions, initialSolution=initialSolution,
+                         seed=seed, checkpoint=checkpoint, **options)
+        initialObj = rm.objInfo
+        getattr(rm, search)(*searchArgs)
+    if (checkpoint is not None and rm.terminationReason != "timeLimit" and
+        os.path.exists(checkpoint)):
+        os.remove(checkpoint)
+    if recalcObj:
+        rm.calcObj()
+    stats = {"seed": seed,
+             "initialObjectiveFunction": initialObj,
+             "objectiveFunction": rm.objInfo,
+             "runningTime": time() - start,
+             "evaluations": rm.budget.evaluations,
+             "terminationReason": rm.terminationReason}
+    if search == "AZPSA":
+        stats["annealingStats"] = rm.annealingStats
+    return rm.objInfo, rm.returnRegions(), stats
+
+def runLocalSearch(pRegions, initialSolution, seed, search, searchArgs,
+                   recalcObj, checkpoint=None):
+    """
+    Run L{localSearch} on the shared problem
+    """
+    return localSearch(sharedProblem["am"], sharedProblem["options"],
+                       pRegions, initialSolution, seed, search, searchArgs,
+                       recalcObj, checkpoint)
+
+def multiStart(am, options, starts, nJobs=1):
+    """
+    Run several independent starts of L{localSearch}, in nJobs processes
+    that share the area manager. Return the results of the starts in order.
+
+    @type starts: list
+    @param starts: Arguments of L{localSearch} after am and options, one
+    tuple per start.
+    """
+    if nJobs <= 1:
+        return [localSearch(am, options, *start) for start in starts]
+    workerPool = WorkerPool(am, processes=min(nJobs, len(starts)), **options)
+    try:
+        return workerPool.run(runLocalSearch, starts)
+    finally:
+        workerPool.close()
+
+def startCheckpoints(checkpoint, restarts):
+    """
+    Return the checkpoint file of each start: the file itself for a single
+    start, or the file followed by the number of the start
+    """
+    if checkpoint is None:
+        return [None] * restarts
+    if restarts <= 1:
+        return [checkpoint]
+    return ["%s.%d" % (checkpoint, i) for i in xrange(restarts)]
+
+def startSeeds(seed, restarts):
+    """
+    Return the seed of each start: the seed itself for a single start, or
+    seeds drawn from it
+    """
+    if restarts <= 1:
+        return [seed]
+    return makeRng(seed).randint(0, 2 ** 31 - 1, size=restarts).tolist()
+
+def problemKey(y, w, **options):
+    """
+    Return a key that identifies a problem by its data, its contiguity
+    matrix and the options of its region makers
+    """
+    problem = (sorted(y.items()), sorted(w.items()), sorted(options.items()))
+    return hashlib.sha1(cPickle.dumps(problem, 2)).hexdigest()
+
+def sharedWorkerPool(key, makeAreaManager, processes=None, **options):
+    """
+    Return the worker pool of the problem identified by key. The pool is
+    created the first time, and kept for the next runs on the same problem
+    until another problem is solved or L{closeWorkerPools} is called.
+
+    @type key: string
+    @param key: Key of the problem, as returned by L{problemKey}.
+
+    @type makeAreaManager: function
+    @param makeAreaManager: Function that returns the area manager of the
+    problem. It is only called when the pool is created.
+
+    @type processes: integer
+    @keyword processes: Number of worker processes, by default the number
+    of CPUs.
+
+    @keyword options: Keyword arguments of the region makers.
+    """
+    if key not in workerPools:
+        closeWorkerPools()
+        workerPools[key] = WorkerPool(makeAreaManager(), processes, **options)
+    return workerPools[key]
+
+def closeWorkerPools():
+    """
+    Stop the worker processes of the pools kept by L{sharedWorkerPool}
+    """
+    for workerPool in workerPools.values():
+        workerPool.close()
+    workerPools.clear()
+
+atexit.register(closeWorkerPools)
+
+class WorkerPool:
+    """
+    Pool of processes that share one problem. The area manager is inherited
+    by the workers when they start instead of being pickled into every task,
+    and the tasks return label arrays and objective function values instead
+    of region makers. The pool can be used for several batches of tasks and
+    must be closed when it is not needed anymore.
+    """
+    def __init__(self, am, processes=None, **options):
+        """
+        @type am: AreaManager
+        @param am: Area manager object.
+
+        @type processes: integer
+        @keyword processes: Number of worker processes, by default the number
+        of CPUs.
+
+        @keyword options: Keyword arguments of the region makers.
+        """
+        if processes is None:
+            processes = cpu_count()
+        self.pool = Pool(processes=processes, initializer=initWorker,
+                         initargs=({"am": am, "options": options},))
+
+    def run(self, function, tasks):
+        """
+        Run a function of this module once per list of arguments in tasks
+        and return the results in the same order
+        """
+        procs = [self.pool.apply_async(function, args) for args in tasks]
+        return [p.get() for p in procs]
+
+    def close(self):
+        """
+        Stop the worker processes
+        """
+        self.pool.close()
+        self.pool.join()
+
+class LocalPool:
+    """
+    Pool with the interface of L{WorkerPool} that runs the tasks one after
+    another in the calling process, on the same shared problem, so they give
+    the same results as in a pool of worker processes.
+    """
+    def __init__(self, am, **options):
+        """
+        @type am: AreaManager
+        @param am: Area manager object.
+
+        @keyword options: Keyword arguments of the region makers.
+        """
+        self.problem = {"am": am, "options": options}
+
+    def run(self, function, tasks):
+        """
+        Run a function of this module once per list of arguments in tasks
+        and return the results in the same order
+        """
+        initWorker(self.problem)
+        return [function(*args) for args in tasks]
+
+    def close(self):
+        """
+        Release the shared problem
+        """
+        sharedProblem.clear()
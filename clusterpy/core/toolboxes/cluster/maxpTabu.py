@@ -14,10 +14,18 @@ import time as tm
 from componentsAlg import AreaManager
 from componentsAlg import BasicMemory
 from componentsAlg import RegionMaker
+from componentsAlg import makeRng
+from componentsAlg.searchbudget import makeDeadline
+from componentsAlg.workerpool import WorkerPool
+from componentsAlg.workerpool import LocalPool
+from componentsAlg.workerpool import growFeasibleRegions
+from componentsAlg.workerpool import improveFeasibleRegions
 
 __all__ = ['execMaxpTabu']
 
-def execMaxpTabu(y, w, threshold=100.0, maxit=2, tabuLength=5, typeTabu="exact"):
+def execMaxpTabu(y, w, threshold=100.0, maxit=2, tabuLength=5, typeTabu="exact",
+                 seed=None, scoringJobs=1, timeLimit=None,
+                 maxEvaluations=None, nJobs=1):
     """Max-p-regions model (Tabu) 
 
     The max-p-regions model, devised by [Duque_Anselin_Rey2010]_ ,
@@ -39,7 +47,7 @@ def execMaxpTabu(y, w, threshold=100.0, maxit=2, tabuLength=5, typeTabu="exact")
     For this version, the tabu search algorithm will stop after
     max(10,N/maxP) nonimproving moves. ::
 
-        layer.cluster('maxpTabu',vars,<threshold>,<wType>,<std>,<maxit>,<tabuLength>,<typeTabu>,<dissolve>,<dataOperations>)
+        layer.cluster('maxpTabu',vars,<threshold>,<wType>,<std>,<maxit>,<tabuLength>,<typeTabu>,<seed>,<scoringJobs>,<timeLimit>,<maxEvaluations>,<nJobs>,<dissolve>,<dataOperations>)
 
     :keyword vars: Area attribute(s). Important: the last variable in vars correspond to the spatially extensive attribute that will be constrained to be above the predefined threshold value (e.g. ['SAR1','SAR2','POP'])  
     :type vars: list
@@ -55,6 +63,16 @@ def execMaxpTabu(y, w, threshold=100.0, maxit=2, tabuLength=5, typeTabu="exact")
     :type tabuLength: integer
     :keyword typeTabu: Type of tabu search: (a) exact: chooses the best neighbouring solution for evaluation (it implies the enumeration of all the neighbouring solution at each iteration); (b) "random": evaluates a neighbouring solution selected at random and (See Ricca, F.  and Simeone (2008) for more on the difference between exact and random tabu). Default value typeTabu = "exact". 
     :type typeTabu: string 
+    :keyword seed: Seed of the random number generator. Runs with the same seed follow the same search trajectory. Default value seed = None (the generator is seeded from the operating system).
+    :type seed: integer
+    :keyword scoringJobs: Number of processes used to score the neighbouring solutions of the tabu search. The solution does not depend on it. Default value scoringJobs = 1.
+    :type scoringJobs: integer
+    :keyword timeLimit: Number of seconds after which the search stops with the best solution found so far. No new initial solution is constructed after the time limit, but at least one is constructed and has its enclaves assigned. Default value timeLimit = None (no time limit).
+    :type timeLimit: float
+    :keyword maxEvaluations: Number of moves evaluated after which each tabu search stops with the best solution found so far. Default value maxEvaluations = None (no limit).
+    :type maxEvaluations: integer
+    :keyword nJobs: Number of processes. The constructions run in parallel, and then the enclave assignment and the tabu search of every solution with the maximum number of regions run in parallel too. Each construction and each tabu search uses its own seed, drawn from seed, so the solution does not depend on the number of processes. Default value nJobs = 1.
+    :type nJobs: integer
     :keyword dissolve: If = 1, then you will get a "child" instance of the layer that contains the new regions. Default value = 0. Note: Each child layer is saved in the attribute layer.results. The first algorithm that you run with dissolve=1 will have a child layer in layer.results[0]; the second algorithm that you run with dissolve=1 will be in layer.results[1], and so on. You can export a child as a shapefile with layer.result[<1,2,3..>].exportArcData('filename')
     :type dissolve: binary
     :keyword dataOperations: Dictionary which maps a variable to a list of operations to run on it. The dissolved layer will contains in it's data all the variables specified in this dictionary. Be sure to check the input layer's fieldNames before use this utility.
@@ -90,101 +108,25 @@ def execMaxpTabu(y, w, threshold=100.0, maxit=2, tabuLength=5, typeTabu="exact")
     #  print y
 
     am = AreaManager(w, y, distanceType)
-    maxP = 0
-    bestCandidates = {}
-    for i in range(maxit):
-
-        #  print "**** Iteration %d of %d ..."%(i+1,maxit)
-
-        rm = RegionMaker(am,
-                        distanceType = distanceType,
-                        distanceStat = distanceStat,
-                        selectionType = selectionType,
-                        objectiveFunctionType = objectiveFunctionType,
-                        numRegionsType = numRegionsType,
-                        threshold = threshold)
-        numRegions = len(rm.feasibleRegions)
-        rm.getObj()
-
-        #  print "rm.feasibleRegions",rm.feasibleRegions
-        #  print "obj",rm.getObj()
-
-        if numRegions > maxP:
-            bestCandidates = {}
-            maxP = numRegions
-            obj = rm.objInfo
-            bestCandidates[obj] = rm.feasibleRegions
-        if numRegions == maxP:
-            obj = rm.objInfo
-            if obj in bestCandidates:
-                pass
-            else:
-                bestCandidates[obj] = rm.feasibleRegions
-        else:
-            pass
-
-    #   print "bestCandidates", bestCandidates
-
-    ofValues = bestCandidates.keys()
-    basicMemory = BasicMemory()
-    while len(ofValues) >= 1:
-
-        #  RECREATE SOLUTION
-
-        rm.resetNow()
-        minOfValue = min(ofValues)
-        ofValues.remove(minOfValue)
-        partialSolution = bestCandidates[minOfValue]
-
-        #  print "ASSIGNING ENCLAVES"
-        #  print partialSolution
-
-        regionId = 0
-        for growReg in partialSolution:
-            seedGrowReg = partialSolution[growReg][0]
-            rm.assignSeeds(seedGrowReg, regionId)
-            partialSolution[growReg].remove(seedGrowReg)
-            if len(partialSolution[growReg]) >= 1:
-                for areaInGrow in partialSolution[growReg]:
-                    rm.assignArea(areaInGrow, regionId)
-            regionId += 1
-
-        # CONSTRUCTION PHASE 2: ENCLAVES ASSIGNATION
-
-        rm.feasibleRegions = copy.deepcopy(rm.region2Area)
-        rm.getIntraBorderingAreas()
-        rm.newExternal = set(rm.unassignedAreas)
-        if len(rm.unassignedAreas) != 0:
-            rm.constructionStage = "enclaves"
-            while len(rm.unassignedAreas) != 0:
-                rm.constructRegions()
-        rm.objInfo = rm.getObjective(rm.region2Area)
-        rm.feasibleRegions = copy.deepcopy(rm.region2Area)
-        rm.getIntraBorderingAreas()
-
-        #  print "ASSIGNED SOLUTION"
-        #  print "OBJ: ", rm.getObjective(rm.region2Area), rm.returnRegions()
-
-        rm.calculateRegionValueThreshold()
-
-        #  LOCAL SEARCH
-
-        rm.calcObj()
-        convTabu = min(10,len(y)/maxP)  #   convTabu=230*numpy.sqrt(maxP)
-
-        #  print "###ENTERING TABU",rm.objInfo,rm.returnRegions()
-
-        rm.tabuMove(tabuLength, convTabu = convTabu, typeTabu=typeTabu)
-        rm.calcObj()
-
-        #  print "***** AFTER TABU",rm.objInfo,rm.returnRegions()
-        #  EVALUATE SOLUTION
-
-        if rm.objInfo < basicMemory.objInfo:
-            basicMemory.updateBasicMemory(rm)
+    rng = makeRng(seed)
+    deadline = makeDeadline(timeLimit, start)
+    if nJobs > 1:
+        scoringJobs = 1
+    options = {"distanceType": distanceType,
+               "distanceStat": distanceStat,
+               "selectionType": selectionType,
+               "objectiveFunctionType": objectiveFunctionType,
+               "numRegionsType": numRegionsType,
+               "threshold": threshold,
+               "scoringJobs": scoringJobs,
+               "deadline": deadline,
+               "maxEvaluations": maxEvaluations}
+    results = maxpTabuPool(am, options, rng, len(y), maxit, tabuLength,
+                           typeTabu, nJobs)
+    best = min(results, key=lambda result: result[0])
+    Of, Sol, dummy, terminationReason = best
+    evaluations = sum([result[2] for result in results])
     time = tm.time() - start
-    Sol = basicMemory.regions
-    Of = basicMemory.objInfo
     print "FINAL SOLUTION: ", Sol
     print "FINAL OF: ", Of
     output = { "objectiveFunction": Of,
@@ -195,8 +137,45 @@ def execMaxpTabu(y, w, threshold=100.0, maxit=2, tabuLength=5, typeTabu="exact")
         "distanceType": distanceType,
         "distanceStat": distanceStat,
         "selectionType": selectionType,
-        "ObjectiveFuncionType": objectiveFunctionType}
+        "ObjectiveFuncionType": objectiveFunctionType,
+        "terminationReason": terminationReason,
+        "evaluations": evaluations}
     print "Done"
     return output
 
 
+
+def maxpTabuPool(am, options, rng, n, maxit, tabuLength, typeTabu, nJobs):
+    """
+    Run the constructions of the max-p-regions model in a pool of nJobs
+    processes, or in this process if nJobs is 1, and then the enclave
+    assignment and the tabu search of the solutions with the maximum number
+    of regions (one per objective function value). Each construction and
+    each tabu search uses its own seed, drawn from rng, so the results do
+    not depend on nJobs. Return the results of the tabu searches, as given
+    by L{improveFeasibleRegions}.
+    """
+    constructionSeeds = rng.randint(0, 2 ** 31 - 1, size=maxit)
+    if nJobs > 1:
+        workerPool = WorkerPool(am, processes=nJobs, **options)
+    else:
+        workerPool = LocalPool(am, **options)
+    try:
+        constructions = workerPool.run(growFeasibleRegions,
+                                       [(int(s), i == 0) for i, s
+                                        in enumerate(constructionSeeds)])
+        constructions = [c for c in constructions if c is not None]
+        maxP = max([construction[0] for construction in constructions])
+        bestCandidates = {}
+        for numRegions, obj, labels, seeds in constructions:
+            if numRegions == maxP and obj not in bestCandidates:
+                bestCandidates[obj] = (labels, seeds)
+        ofValues = sorted(bestCandidates)
+        tabuSeeds = rng.randint(0, 2 ** 31 - 1, size=len(ofValues))
+        convTabu = min(10, n / maxP)
+        return workerPool.run(improveFeasibleRegions,
+                              [bestCandidates[obj] + (int(s), tabuLength,
+                                                      convTabu, typeTabu)
+                               for obj, s in zip(ofValues, tabuSeeds)])
+    finally:
+        workerPool.close()
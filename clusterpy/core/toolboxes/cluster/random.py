@@ -14,13 +14,13 @@ from componentsAlg import RegionMaker
 
 __all__ = ['execRandom']
 
-def execRandom(y, w, regions):
+def execRandom(y, w, regions, seed=None):
     """Generate random regions
     
     This algorithm aggregates, at random, a set of areas into a predefined
     number of spatially contiguous regions. ::
 
-        layer.cluster('random',vars,regions,<wType>,<dissolve>,<dataOperations>)
+        layer.cluster('random',vars,regions,<wType>,<seed>,<dissolve>,<dataOperations>)
 
     :keyword vars: Area attribute(s) (e.g. ['SAR1','SAR2']) 
     :type vars: list
@@ -28,6 +28,8 @@ def execRandom(y, w, regions):
     :type regions: integer
     :keyword wType: Type of first-order contiguity-based spatial matrix: 'rook' or 'queen'. Default value wType = 'rook'. 
     :type wType: string
+    :keyword seed: Seed of the random number generator. Runs with the same seed follow the same search trajectory. Default value seed = None (the generator is seeded from the operating system).
+    :type seed: integer
     :keyword dissolve: If = 1, then you will get a "child" instance of the layer that contains the new regions. Default value = 0. Note:. Each child layer is saved in the attribute layer.results. The first algorithm that you run with dissolve=1 will have a child layer in layer.results[0]; the second algorithm that you run with dissolve=1 will be in layer.results[1], and so on. You can export a child as a shapefile with layer.result[<1,2,3..>].exportArcData('filename')
     :type dissolve: binary
     :keyword dataOperations: Dictionary which maps a variable to a list of operations to run on it. The dissolved layer will contains in it's data all the variables specified in this dictionary. Be sure to check the input layer's fieldNames before use this utility.
@@ -65,7 +67,8 @@ def execRandom(y, w, regions):
                     distanceType = distanceType,
                     distanceStat = distanceStat,
                     selectionType = selectionType,
-                    objectiveFunctionType = objectiveFunctionType)
+                    objectiveFunctionType = objectiveFunctionType,
+                    seed = seed)
     time = tm.time() - start
     Sol = rm.returnRegions()
     Of = rm.objInfo
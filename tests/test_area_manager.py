@@ -124,3 +124,25 @@ class TestAreaManager(TestCase):
         am = AreaManager(self.Wrook, self.Y)
         result = am.checkFeasibility(possible_solution)
         self.assertTrue(result)
+
+    def test_array_storage_csr_contiguity(self):
+        """
+        The array storage keeps the contiguity as CSR arrays and the data as
+        a single matrix.
+        """
+        am = AreaManager(self.Wrook, self.Y, storage="arrays")
+        self.assertEqual(am.dataMatrix.shape, (8, 1))
+        self.assertEqual(am.indptr.tolist(), [0, 2, 5, 8, 10, 12, 15, 18, 20])
+        self.assertEqual(am.areas[5].neighs, [1, 4, 6])
+        self.assertEqual(am.areas[5].data[0], pi * 5)
+
+    def test_array_storage_feasibility(self):
+        """
+        Feasibility checks give the same result with both storages.
+        """
+        solutions = [[0, 0, 1, 1, 0, 1, 0, 1], [0, 1, 1, 2, 0, 0, 0, 2]]
+        for solution in solutions:
+            amObjects = AreaManager(self.Wrook, self.Y)
+            amArrays = AreaManager(self.Wrook, self.Y, storage="arrays")
+            self.assertEqual(amObjects.checkFeasibility(solution),
+                             amArrays.checkFeasibility(solution))
@@ -0,0 +1,58 @@
+"""
+Testing clustering algorithms in Clusterpy -Helper functions-
+Tests for the memory of the local search algorithms.
+"""
+
+from unittest import TestCase
+from clusterpy.core.toolboxes.cluster.componentsAlg.memory import TabuMemory
+
+class TestTabuMemory(TestCase):
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_moves_expire_after_tenure(self):
+        """
+        A move remains tabu for as many additions as the tenure.
+        """
+        tabuList = TabuMemory(2)
+        tabuList.add((1, 0))
+        tabuList.add((2, 0))
+        self.assertTrue((1, 0) in tabuList)
+        self.assertTrue((2, 0) in tabuList)
+
+        tabuList.add((3, 0))
+        self.assertFalse((1, 0) in tabuList)
+        self.assertTrue((2, 0) in tabuList)
+
+        tabuList.age()
+        self.assertFalse((2, 0) in tabuList)
+        self.assertTrue((3, 0) in tabuList)
+        self.assertEqual(len(tabuList), 1)
+
+    def test_repeated_move_keeps_latest_addition(self):
+        """
+        Adding a move again extends the period it remains tabu.
+        """
+        tabuList = TabuMemory(2)
+        tabuList.add((1, 0))
+        tabuList.add((1, 0))
+        tabuList.add((2, 0))
+        self.assertTrue((1, 0) in tabuList)
+
+        tabuList.add((3, 0))
+        self.assertFalse((1, 0) in tabuList)
+
+    def test_tenure_change(self):
+        """
+        A new tenure is applied with the next addition.
+        """
+        tabuList = TabuMemory(3)
+        for area in range(3):
+            tabuList.add((area, 0))
+        tabuList.tenure = 1
+        tabuList.add((3, 0))
+        self.assertEqual(len(tabuList), 1)
+        self.assertTrue((3, 0) in tabuList)
@@ -3,10 +3,18 @@ Testing clustering algorithms in Clusterpy -Helper functions-
 Tests for one of the core classes in clusterpy. Region Maker.
 """
 
-from unittest import TestCase, skip
+from unittest import TestCase
 from clusterpy import importArcData
 from clusterpy.core.toolboxes.cluster.componentsAlg import AreaManager
 from clusterpy.core.toolboxes.cluster.componentsAlg import RegionMaker
+from clusterpy.core.toolboxes.cluster.componentsAlg.workerpool import WorkerPool
+from clusterpy.core.toolboxes.cluster.componentsAlg.workerpool import constructSolution
+from clusterpy.core.toolboxes.cluster.componentsAlg.workerpool import improveSolution
+from clusterpy.core.toolboxes.cluster.componentsAlg.workerpool import workerPools
+from clusterpy.core.toolboxes.cluster.componentsAlg.workerpool import closeWorkerPools
+from clusterpy.core.toolboxes.cluster.arisel import execArisel
+from clusterpy.core.toolboxes.cluster.azpTabu import execAZPTabu
+from clusterpy.core.toolboxes.cluster.maxpTabu import execMaxpTabu
 
 map_type = 'n100'
 max_num_regions = 10
@@ -38,6 +46,73 @@ class TestMulticore(TestCase):
             for regionj in xrange(regioni + 1, len(regions)):
                 self.assertNotEqual(regions[regioni], regions[regionj])
 
-    @skip
     def test_randomness_on_multiple_processes(self):
-        pass
+        """Workers sharing one problem construct different solutions for
+        different seeds and the same solution for the same seed"""
+        am = AreaManager(self.Wrook, self.Y)
+        workerPool = WorkerPool(am, processes=2)
+        try:
+            solutions = workerPool.run(constructSolution,
+                                       [(max_num_regions, [], seed)
+                                        for seed in [1, 2, 1]])
+            improved = workerPool.run(improveSolution,
+                                      [(solutions[0][1], 5, 10, 10)])
+        finally:
+            workerPool.close()
+        self.assertEqual(solutions[0][1].tolist(), solutions[2][1].tolist())
+        self.assertNotEqual(solutions[0][1].tolist(), solutions[1][1].tolist())
+        objInfo, regions, evaluations, reason = improved[0]
+        self.assertTrue(am.checkFeasibility(regions))
+        self.assertTrue(objInfo <= solutions[0][0] + 1e-6)
+
+    def test_region_maker_starts_from_the_given_labels(self):
+        """A region maker built from the labels of another one starts from
+        its exact solution"""
+        am = AreaManager(self.Wrook, self.Y)
+        rm = RegionMaker(am, pRegions=max_num_regions, seed=4)
+        rebuilt = RegionMaker(am, 0, seed=4, initialLabels=rm.getLabels())
+        self.assertEqual(rebuilt.getLabels().tolist(), rm.getLabels().tolist())
+        self.assertEqual(rebuilt.pRegions, max_num_regions)
+        self.assertAlmostEqual(rebuilt.objInfo, rm.objInfo)
+
+    def test_arisel_reuses_the_worker_pool_of_the_problem(self):
+        """Runs of ARiSeL on the same problem share one worker pool, which
+        is kept until it is closed"""
+        try:
+            first = execArisel(self.Y, self.Wrook, 10, inits=2, seed=5)
+            workerPool = workerPools.values()[0]
+            second = execArisel(self.Y, self.Wrook, 10, inits=2, seed=5)
+            self.assertEqual(workerPools.values(), [workerPool])
+            self.assertEqual(first["r2a"], second["r2a"])
+        finally:
+            closeWorkerPools()
+        self.assertEqual(len(workerPools), 0)
+
+    def test_restarts_do_not_depend_on_the_number_of_jobs(self):
+        """Independent starts run in several processes return the same best
+        solution and statistics as when they run in one process"""
+        serial = execAZPTabu(self.Y, self.Wrook, 10, seed=7, restarts=3)
+        parallel = execAZPTabu(self.Y, self.Wrook, 10, seed=7, restarts=3,
+                               nJobs=2)
+        self.assertEqual(serial["r2a"], parallel["r2a"])
+        self.assertEqual(len(parallel["starts"]), 3)
+        self.assertEqual([stats["objectiveFunction"] for stats in serial["starts"]],
+                         [stats["objectiveFunction"] for stats in parallel["starts"]])
+        self.assertEqual(serial["objectiveFunction"],
+                         min([stats["objectiveFunction"] for stats in serial["starts"]]))
+
+    def test_parallel_maxp_does_not_depend_on_the_number_of_jobs(self):
+        """The parallel max-p-regions model returns regions above the
+        threshold, and the same solution for any number of processes,
+        including one"""
+        y = dict((area, [values[0], 1]) for area, values in self.Y.items())
+        solutions = [execMaxpTabu(y, self.Wrook, threshold=5, maxit=6,
+                                  seed=3, nJobs=nJobs)
+                     for nJobs in [1, 2, 3]]
+        for solution in solutions[1:]:
+            self.assertEqual(solutions[0]["r2a"], solution["r2a"])
+            self.assertEqual(solutions[0]["objectiveFunction"],
+                             solution["objectiveFunction"])
+        regions = solutions[0]["r2a"]
+        for region in set(regions):
+            self.assertTrue(regions.count(region) >= 5)
@@ -0,0 +1,77 @@
+"""
+Testing clustering algorithms in Clusterpy -Helper functions-
+Tests for the objective functions and their cache.
+"""
+
+from unittest import TestCase
+from clusterpy import importArcData
+from clusterpy.core.toolboxes.cluster.componentsAlg import AreaManager
+from clusterpy.core.toolboxes.cluster.componentsAlg import RegionMaker
+from clusterpy.core.toolboxes.cluster.componentsAlg.objFunctions import ObjectiveCache
+from clusterpy.core.toolboxes.cluster.componentsAlg.objFunctions import getRegionKey
+from clusterpy.core.toolboxes.cluster.componentsAlg.objFunctions import makeObjDict
+
+map_type = 'n100'
+into_regions = 10
+sample_input_path = "clusterpy/data_examples/" + map_type
+
+class TestObjectiveCache(TestCase):
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_cache_returns_stored_values(self):
+        """
+        A lookup returns the stored value, or None if there is none.
+        """
+        cache = ObjectiveCache()
+        self.assertEqual(cache.get(1), None)
+        cache.put(1, 3.5)
+        self.assertEqual(cache.get(1), 3.5)
+
+    def test_cache_evicts_least_recently_used(self):
+        """
+        The least recently used value is evicted when the memory budget is
+        exceeded.
+        """
+        cache = ObjectiveCache(maxMemory=2 * ObjectiveCache.entrySize)
+        cache.put(1, 1.0)
+        cache.put(2, 2.0)
+        cache.get(1)
+        cache.put(3, 3.0)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get(2), None)
+        self.assertEqual(cache.get(1), 1.0)
+
+class TestObjectiveFunctions(TestCase):
+    def setUp(self):
+        self.layer = importArcData(sample_input_path)
+
+    def tearDown(self):
+        pass
+
+    def test_region_key_does_not_depend_on_order(self):
+        """
+        The cache key of a region is the same for any order of its areas and
+        the caller list is not modified.
+        """
+        am = AreaManager(self.layer.Wrook, self.layer.Y)
+        rm = RegionMaker(am, pRegions=into_regions)
+        areaList = [5, 3, 9, 1]
+        key = getRegionKey(rm, areaList)
+        self.assertEqual(key, getRegionKey(rm, [1, 3, 5, 9]))
+        self.assertEqual(areaList, [5, 3, 9, 1])
+
+    def test_each_region_maker_owns_its_cache(self):
+        """
+        Region makers do not share cached objective function values.
+        """
+        am = AreaManager(self.layer.Wrook, self.layer.Y)
+        rm1 = RegionMaker(am, pRegions=into_regions)
+        rm2 = RegionMaker(am, pRegions=into_regions)
+        rm1.objDict = makeObjDict(rm1)
+        rm1.recalcObj(rm1.region2Area, [0, 1])
+        self.assertTrue(len(rm1.objCache) > 0)
+        self.assertEqual(len(rm2.objCache), 0)
@@ -5,9 +5,12 @@ Tests for one of the core classes in clusterpy. Region Maker.
 
 from unittest import TestCase, skip
 from math import pi
+import os
+import tempfile
 from clusterpy import importArcData
 from clusterpy.core.toolboxes.cluster.componentsAlg import AreaManager
 from clusterpy.core.toolboxes.cluster.componentsAlg import RegionMaker
+from clusterpy.core.toolboxes.cluster.azpTabu import execAZPTabu
 
 map_type = 'n100'
 max_num_regions = 10
@@ -54,13 +57,62 @@ class TestRegionMaker(TestCase):
 
         self.assertIsNotNone(rm)
 
-    @skip
     def test_grow_endogenous_threshold_regions(self):
         """Number of regions is endogenous with a threshold value"""
-        am = AreaManager(self.Wqueen, self.Y)
-        rm = RegionMaker(am)
+        y = dict((area, [values[0], 1]) for area, values in self.Y.items())
+        for storage in ["objects", "arrays"]:
+            am = AreaManager(self.Wqueen, y, storage=storage)
+            rm = RegionMaker(am, numRegionsType="EndogenousThreshold",
+                             threshold=5, seed=2)
+            self.assertEqual(rm.unassignedAreas, [])
+            self.assertTrue(am.checkFeasibility(rm.returnRegions()))
+            self.assertTrue(len(rm.feasibleRegions) > 1)
+            for region, areas in rm.feasibleRegions.items():
+                self.assertTrue(len(areas) >= 5)
+                self.assertEqual(rm.regionValue[region], len(areas))
+                for area in areas:
+                    self.assertEqual(rm.area2Region[area], region)
 
-        self.assertIsNotNone(rm)
+    def test_frontier_growth_finds_as_many_regions_as_candidate_growth(self):
+        """The frontier growth of max-p regions finds, on average, as many
+        feasible regions as the generic construction"""
+        class CandidateGrowth(RegionMaker):
+            def growThresholdRegions(self):
+                self.growCandidateRegions()
+
+        y = dict((area, [values[0], 1]) for area, values in self.Y.items())
+        am = AreaManager(self.Wrook, y)
+        seeds = range(20)
+        for threshold in [3, 5, 8]:
+            counts = []
+            for maker in [RegionMaker, CandidateGrowth]:
+                counts.append([len(maker(am, numRegionsType="EndogenousThreshold",
+                                         threshold=threshold,
+                                         seed=seed).feasibleRegions)
+                               for seed in seeds])
+            frontier, candidate = counts
+            self.assertTrue(abs(sum(frontier) - sum(candidate)) <= 0.5 * len(seeds))
+            self.assertTrue(min(frontier) >= min(candidate) - 1)
+            self.assertTrue(max(frontier) <= max(candidate) + 1)
+
+    def test_rebuild_endogenous_threshold_regions(self):
+        """A max-p solution rebuilt from its feasible regions keeps them and
+        assigns the enclaves"""
+        y = dict((area, [values[0], 1]) for area, values in self.Y.items())
+        am = AreaManager(self.Wqueen, y)
+        grown = RegionMaker(am, numRegionsType="EndogenousThreshold",
+                            threshold=5, seed=2)
+        feasibleRegions = dict((region, list(areas)) for region, areas
+                               in enumerate(grown.feasibleRegions.values()))
+        rm = RegionMaker(am, numRegionsType="EndogenousThreshold",
+                         threshold=5, seed=2, feasibleRegions=feasibleRegions)
+        regions = rm.returnRegions()
+        self.assertEqual(len(set(regions)), len(feasibleRegions))
+        self.assertTrue(am.checkFeasibility(regions))
+        for region, areas in feasibleRegions.items():
+            self.assertEqual(rm.area2Region[areas[0]], region)
+            self.assertEqual(set([regions[area] for area in areas]),
+                             set([region]))
 
     @skip
     def test_grow_endogenous_range_regions(self):
@@ -69,3 +121,203 @@ class TestRegionMaker(TestCase):
         rm = RegionMaker(am)
 
         self.assertIsNotNone(rm)
+
+    def test_grow_regions_with_array_storage(self):
+        """Regions grown over an array backed area manager share its data"""
+        am = AreaManager(self.Wrook, self.Y, storage="arrays")
+        rm = RegionMaker(am, pRegions=max_num_regions)
+        self.assertEqual(max_num_regions, len(rm.region2Area))
+        self.assertTrue(am.checkFeasibility(rm.returnRegions()))
+        self.assertTrue(rm.areas is am.areas)
+
+    def test_candidate_heap_returns_latest_distances(self):
+        """Outdated and removed construction candidates are never selected"""
+        am = AreaManager(self.Wrook, self.Y)
+        rm = RegionMaker(am, pRegions=max_num_regions)
+        rm.candidateInfo = {}
+        rm.candidateHeap = []
+        rm.potentialRegions4Area = {1: set([0, 1]), 2: set([0])}
+
+        rm.setCandidate(1, 0, 1.0)
+        rm.setCandidate(1, 1, 3.0)
+        rm.setCandidate(2, 0, 2.0)
+        rm.setCandidate(1, 0, 4.0)
+        self.assertEqual(rm.popCandidate(), (2, 0))
+
+        rm.removeCandidateArea(2)
+        self.assertEqual(rm.popCandidate(), (1, 1))
+        rm.removeCandidateArea(1)
+        self.assertIsNone(rm.popCandidate())
+
+    def test_centroid_distances_match_distance_to_region(self):
+        """Distances from the running centroids match the region averages"""
+        am = AreaManager(self.Wrook, self.Y)
+        rm = RegionMaker(am, pRegions=max_num_regions)
+        candidates = [(areaID, region) for region in rm.region2Area
+                      for areaID in range(0, 100, 7)]
+        rm.initCentroidSums()
+        distances = rm.getCandidateDistances(candidates)
+        for (areaID, region), distance in zip(candidates, distances):
+            expected = am.getDistance2Region(am.areas[areaID],
+                                             rm.region2Area[region])
+            self.assertAlmostEqual(distance, expected)
+
+    def test_same_seed_gives_same_solution(self):
+        """Region makers with the same seed follow the same trajectory"""
+        am = AreaManager(self.Wrook, self.Y)
+        solutions = []
+        for dummy in range(2):
+            rm = RegionMaker(am, pRegions=max_num_regions, seed=13)
+            rm.AZPImproving()
+            solutions.append(rm.returnRegions())
+        self.assertEqual(solutions[0], solutions[1])
+
+    def test_search_budget_stops_with_best_solution(self):
+        """The local searches stop when the budget is exhausted, keep the best
+        solution found so far and record why they stopped"""
+        am = AreaManager(self.Wrook, self.Y)
+        rm = RegionMaker(am, pRegions=max_num_regions, seed=13,
+                         maxEvaluations=1)
+        initialObj = rm.objInfo
+        rm.tabuMove(tabuLength=10, convTabu=100)
+        self.assertEqual(rm.terminationReason, "maxEvaluations")
+        self.assertTrue(rm.objInfo <= initialObj)
+        self.assertTrue(am.checkFeasibility(rm.returnRegions()))
+
+        rm = RegionMaker(am, pRegions=max_num_regions, seed=13, deadline=0)
+        initialRegions = rm.returnRegions()
+        rm.AZPSA(0.85, 2)
+        self.assertEqual(rm.terminationReason, "timeLimit")
+        self.assertEqual(rm.returnRegions(), initialRegions)
+
+        rm = RegionMaker(am, pRegions=max_num_regions, seed=13)
+        rm.AZPImproving()
+        self.assertEqual(rm.terminationReason, "convergence")
+
+    def test_resumed_search_follows_same_trajectory(self):
+        """A search continued from its last checkpoint ends in the same
+        solution, with the same counters and random state, as the search
+        that saved it"""
+        am = AreaManager(self.Wrook, self.Y)
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            for search, args in [("tabuMove", (10, 50)),
+                                 ("reactiveTabuMove", (50,)),
+                                 ("AZPSA", (0.85, 2))]:
+                rm = RegionMaker(am, pRegions=8, seed=5, checkpoint=path,
+                                 checkpointEvery=2)
+                getattr(rm, search)(*args)
+                resumed = RegionMaker(am, pRegions=8, seed=6,
+                                      checkpoint=path)
+                resumed.resumeSearch()
+                self.assertEqual(rm.returnRegions(), resumed.returnRegions())
+                self.assertEqual(rm.objInfo, resumed.objInfo)
+                self.assertEqual(rm.budget.evaluations,
+                                 resumed.budget.evaluations)
+                self.assertEqual(rm.rng.randint(0, 2 ** 30),
+                                 resumed.rng.randint(0, 2 ** 30))
+        finally:
+            os.remove(path)
+
+    def test_checkpoint_of_another_search_is_not_resumed(self):
+        """A checkpoint saved by a search with another number of regions
+        raises an error instead of being continued, and the checkpoint of a
+        finished run is removed"""
+        am = AreaManager(self.Wrook, self.Y)
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            rm = RegionMaker(am, pRegions=4, seed=1, checkpoint=path,
+                             checkpointEvery=1)
+            rm.AZPTabuMove(10, 20)
+            resumed = RegionMaker(am, pRegions=8, seed=1, checkpoint=path)
+            self.assertRaises(Exception, resumed.resumeSearch, None, 8,
+                              "AZPTabuMove", (10, 20))
+            self.assertRaises(Exception, execAZPTabu, self.Y, self.Wrook, 8,
+                              seed=1, convTabu=20, checkpoint=path)
+            execAZPTabu(self.Y, self.Wrook, 4, seed=1, convTabu=20,
+                        checkpoint=path)
+            self.assertFalse(os.path.exists(path))
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_annealing_restores_best_solution(self):
+        """AZP-SA ends in the best solution it visited, with consistent
+        region statistics, and counts the moves of every temperature"""
+        am = AreaManager(self.Wrook, self.Y)
+        rm = RegionMaker(am, pRegions=max_num_regions, seed=3)
+        initialObj = rm.objInfo
+        rm.AZPSA(0.85, 2)
+        obj = rm.objInfo
+        self.assertTrue(obj <= initialObj + 1e-6)
+        rm.calcObj()
+        self.assertAlmostEqual(obj, rm.objInfo, places=6)
+        self.assertTrue(am.checkFeasibility(rm.returnRegions()))
+        self.assertTrue(len(rm.annealingStats) >= 3)
+        for stats in rm.annealingStats:
+            self.assertTrue(0 <= stats["acceptedMoves"] <= stats["totalMoves"])
+
+    def test_azp_without_dont_look_bits_follows_baseline_passes(self):
+        """AZP without don't-look bits makes the same passes, and ends in the
+        same solution, as Openshaw's loop it replaces"""
+        def baselineAZP(rm):
+            improve = 1
+            while improve == 1:
+                regions = range(0, rm.pRegions)
+                while len(regions) > 0:
+                    if len(regions) > 1:
+                        randomRegion = rm.rng.randint(0, len(regions))
+                    else:
+                        randomRegion = 0
+                    region = regions[randomRegion]
+                    regions.remove(region)
+                    borderingAreas = sorted(rm.returnBorderingAreas(region))
+                    improve = 0
+                    while len(borderingAreas) > 0:
+                        randomArea = rm.rng.randint(0, len(borderingAreas))
+                        area = borderingAreas[randomArea]
+                        borderingAreas.remove(area)
+                        posibleMove = sorted(rm.intraBorderingAreas[area])
+                        if len(rm.region2Area[region]) >= 2:
+                            f = rm.checkFeasibility(region, area, rm.region2Area)
+                        else:
+                            f = 0
+                        if f == 1:
+                            for move in posibleMove:
+                                obj = rm.evaluateMove(area, move)
+                                if obj <= rm.objInfo:
+                                    rm.moveArea(area, move)
+                                    improve = 1
+                                    borderingAreas = sorted(rm.returnBorderingAreas(region))
+                                    break
+
+        am = AreaManager(self.Wrook, self.Y)
+        for seed in [13, 21]:
+            expected = RegionMaker(am, pRegions=max_num_regions, seed=seed)
+            baselineAZP(expected)
+            rm = RegionMaker(am, pRegions=max_num_regions, seed=seed)
+            rm.AZPImproving()
+            self.assertEqual(rm.getLabels().tolist(),
+                             expected.getLabels().tolist())
+            self.assertEqual(rm.objInfo, expected.objInfo)
+            self.assertEqual(rm.budget.evaluations, expected.budget.evaluations)
+
+    def test_dont_look_bits_end_in_local_optimum(self):
+        """AZP with don't-look bits stops only when no bordering area can be
+        moved to improve the objective function"""
+        am = AreaManager(self.Wrook, self.Y)
+        rm = RegionMaker(am, pRegions=max_num_regions, seed=13)
+        rm.AZPImproving(dontLookBits=True)
+        self.assertEqual(rm.terminationReason, "convergence")
+        self.assertTrue(am.checkFeasibility(rm.returnRegions()))
+        for region in xrange(rm.pRegions):
+            if len(rm.region2Area[region]) < 2:
+                continue
+            for area in rm.returnBorderingAreas(region):
+                if rm.checkFeasibility(region, area, rm.region2Area) != 1:
+                    continue
+                for move in rm.intraBorderingAreas[area]:
+                    obj = rm.evaluateMove(area, move)
+                    self.assertTrue(obj >= rm.objInfo - 1e-10)
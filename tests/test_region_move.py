@@ -7,6 +7,7 @@ from unittest import TestCase
 from clusterpy import importArcData
 from clusterpy.core.toolboxes.cluster.componentsAlg import AreaManager
 from clusterpy.core.toolboxes.cluster.componentsAlg import RegionMaker
+from copy import deepcopy
 import numpy
 
 map_type = 'n100' # When changing this input map, solution sizes must change too
@@ -116,3 +117,211 @@ class TestContiguosRegionsMove(TestCase):
         feasible = rm.checkFeasibility(1, 47, rm.region2Area)
 
         assert not feasible
+
+    def test_incremental_objective_after_move(self):
+        """
+        The objective function updated from the region statistics matches a
+        full evaluation after moving an area.
+        """
+        am = AreaManager(self.layer.Wrook, self.layer.Y)
+        rm = RegionMaker(am, initialSolution = self.possible_rook_solution)
+
+        """ Moving area 29 from region 1 to region 0"""
+        expected = rm.evaluateMove(29, 0)
+        rm.moveArea(29, 0)
+
+        self.assertAlmostEqual(expected, rm.objInfo)
+        self.assertAlmostEqual(rm.getObjective(rm.region2Area), rm.objInfo)
+
+    def test_articulation_points_match_contiguity_search(self):
+        """
+        The articulation point index gives the same feasibility as a search
+        over the donor region, also after moving areas.
+        """
+        am = AreaManager(self.layer.Wqueen, self.layer.Y)
+        rm = RegionMaker(am, pRegions = into_regions)
+        for area, region in rm.allMoves():
+            if rm.checkFeasibility(rm.area2Region[area], area):
+                rm.moveArea(area, region)
+                break
+
+        for area, region in rm.area2Region.items():
+            if len(rm.region2Area[region]) > 1:
+                region2AreaCopy = deepcopy(rm.region2Area)
+                self.assertEqual(rm.checkFeasibility(region, area),
+                                 rm.checkFeasibility(region, area,
+                                                     region2AreaCopy))
+
+    def test_undo_trial_moves(self):
+        """
+        Reverting trial moves from the journal restores the solution.
+        """
+        am = AreaManager(self.layer.Wrook, self.layer.Y)
+        rm = RegionMaker(am, initialSolution = self.possible_rook_solution)
+        expected = rm.returnRegions()
+        objInfo = rm.objInfo
+
+        rm.trialMove(29, 0)
+        rm.trialMove(28, 0)
+        self.assertEqual(rm.area2Region[28], 0)
+        rm.undoMove()
+        rm.undoMove()
+
+        self.assertEqual(rm.returnRegions(), expected)
+        self.assertEqual(rm.moveJournal, [])
+        self.assertAlmostEqual(rm.getObjective(rm.region2Area), objInfo)
+
+    def test_label_array_matches_membership(self):
+        """
+        The label array and the region membership stay consistent after
+        moving areas and after restoring a solution from its labels.
+        """
+        am = AreaManager(self.layer.Wrook, self.layer.Y)
+        rm = RegionMaker(am, initialSolution = self.possible_rook_solution)
+        labels = rm.getLabels()
+
+        rm.moveArea(29, 0)
+        rm.moveArea(28, 0)
+        self.assertEqual(rm.returnRegions()[28], 0)
+        for region, areas in rm.region2Area.items():
+            for index, area in enumerate(areas):
+                self.assertEqual(rm.area2Region[area], region)
+                self.assertEqual(rm.region2Area.position[area], index)
+
+        rm.setLabels(labels)
+        self.assertEqual(rm.returnRegions(), self.possible_rook_solution)
+        self.assertEqual(sorted(rm.region2Area[0]),
+                         [i for i in range(100)
+                          if self.possible_rook_solution[i] == 0])
+
+    def test_vectorized_border_moves_match_full_evaluation(self):
+        """
+        The batched deltas of the border moves match a full evaluation of
+        the objective function after each move.
+        """
+        am = AreaManager(self.layer.Wrook, self.layer.Y)
+        rm = RegionMaker(am, pRegions = into_regions)
+        areas, regions, deltas = rm.scoreBorderMoves()
+
+        self.assertEqual(len(areas), len(deltas))
+        for area, region, delta in zip(areas, regions, deltas)[:20]:
+            rm.trialMove(area, region)
+            obj = rm.getObjective(rm.region2Area)
+            rm.undoMove()
+            self.assertAlmostEqual(rm.objInfo + delta, obj)
+
+    def test_parallel_border_moves_match_serial_scan(self):
+        """
+        The border moves scored by several processes are the same, in the
+        same order and with the same values, as the moves scored by one
+        process, and they are the moves given by the bordering areas.
+        """
+        am = AreaManager(self.layer.Wqueen, self.layer.Y)
+        rm = RegionMaker(am, pRegions = into_regions, scoringJobs = 3)
+        labels = rm.getLabels()
+        areas, regions, deltas = rm.scoreBorderMoves()
+        rm.closeScoringPool()
+        rm.scoringJobs = 1
+        serial = rm.scoreBorderMoves()
+
+        self.assertEqual(areas.tolist(), serial[0].tolist())
+        self.assertEqual(regions.tolist(), serial[1].tolist())
+        self.assertEqual(deltas.tolist(), serial[2].tolist())
+        expected = set([(area, region) for area, regions4Move
+                        in rm.intraBorderingAreas.iteritems()
+                        for region in regions4Move
+                        if len(rm.region2Area[labels[area]]) > 1])
+        self.assertEqual(set(zip(areas.tolist(), regions.tolist())), expected)
+
+    def test_move_queue_matches_fresh_scan_after_move(self):
+        """
+        After a move, the updated queue of moves holds the same moves and
+        values as a queue built from scratch.
+        """
+        am = AreaManager(self.layer.Wqueen, self.layer.Y)
+        rm = RegionMaker(am, pRegions = into_regions)
+        queue = rm.buildMoveQueue()
+        delta, area, region = queue.pop()
+        rm.queuedMoves.append((delta, area, region))
+        oldRegion = rm.area2Region[area]
+        rm.moveArea(area, region)
+        rm.updateMoveQueue(queue, [oldRegion, region])
+
+        fresh = rm.buildMoveQueue()
+        self.assertEqual(len(queue), len(fresh))
+        entries = sorted([queue.pop() for i in range(len(queue))],
+                         key=lambda entry: entry[1:])
+        expected = sorted([fresh.pop() for i in range(len(fresh))],
+                          key=lambda entry: entry[1:])
+        self.assertEqual([entry[1:] for entry in entries],
+                         [entry[1:] for entry in expected])
+        for entry, other in zip(entries, expected):
+            self.assertAlmostEqual(entry[0], other[0])
+        self.assertEqual(queue.pop(), None)
+
+    def test_solution_hash_updated_on_moves(self):
+        """
+        The hash of the solution updated on each move matches the hash
+        computed from the labels, and returns to its value when the moves
+        are reverted.
+        """
+        am = AreaManager(self.layer.Wrook, self.layer.Y)
+        rm = RegionMaker(am, initialSolution = self.possible_rook_solution)
+        initialHash = rm.getSolutionHash()
+
+        rm.moveArea(29, 0)
+        rm.moveArea(28, 0)
+        movedHash = rm.getSolutionHash()
+        self.assertNotEqual(movedHash, initialHash)
+        rm.solutionHash = None
+        self.assertEqual(rm.getSolutionHash(), movedHash)
+
+        rm.moveArea(28, 1)
+        rm.moveArea(29, 1)
+        self.assertEqual(rm.getSolutionHash(), initialHash)
+
+    def test_border_index_matches_full_rebuild(self):
+        """
+        The intrabordering areas updated on each move, and when a solution
+        is restored from its labels, match a full rebuild.
+        """
+        am = AreaManager(self.layer.Wqueen, self.layer.Y)
+        rm = RegionMaker(am, pRegions = into_regions)
+        labels = rm.getLabels()
+        moved = 0
+        for area, region in rm.allMoves():
+            if (rm.area2Region[area] != region and
+                region in rm.intraBorderingAreas.get(area, ()) and
+                len(rm.region2Area[rm.area2Region[area]]) > 1 and
+                rm.checkFeasibility(rm.area2Region[area], area)):
+                rm.moveArea(area, region)
+                moved += 1
+            if moved == 5:
+                break
+
+        incremental = deepcopy(rm.intraBorderingAreas)
+        rm.getIntraBorderingAreas()
+        self.assertEqual(incremental, rm.intraBorderingAreas)
+
+        rm.setLabels(labels)
+        incremental = deepcopy(rm.intraBorderingAreas)
+        rm.getIntraBorderingAreas()
+        self.assertEqual(incremental, rm.intraBorderingAreas)
+
+    def test_region_borders_match_region_scan(self):
+        """
+        The bordering areas of each region, updated on each move, are the
+        areas of the region with neighbours in other regions.
+        """
+        am = AreaManager(self.layer.Wrook, self.layer.Y)
+        rm = RegionMaker(am, pRegions = into_regions, seed = 2)
+        rm.AZPSA(0.85, 1)
+        for region in rm.region2Area:
+            expected = set([area for area in rm.region2Area[region]
+                            if rm.intraBorderingAreas.get(area)])
+            self.assertEqual(rm.returnBorderingAreas(region), expected)
+        rm.getIntraBorderingAreas()
+        for region in rm.region2Area:
+            expected = set([area for area in rm.region2Area[region]
+                            if rm.intraBorderingAreas.get(area)])
+            self.assertEqual(rm.returnBorderingAreas(region), expected)
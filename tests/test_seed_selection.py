@@ -0,0 +1,46 @@
+"""
+Testing clustering algorithms in Clusterpy -Helper functions-
+Tests for the selection of the initial seeds of the regions.
+"""
+
+from unittest import TestCase
+import numpy as np
+from clusterpy.core.toolboxes.cluster.componentsAlg.seedSelectionFunctions import seedSelectionDispatcher
+
+class TestSeedSelection(TestCase):
+    def setUp(self):
+        self.data = np.array([[0.0], [0.1], [0.2], [10.0], [10.1], [20.0]])
+        self.distance2Area = lambda areaID: ((self.data - self.data[areaID]) ** 2).sum(1)
+
+    def tearDown(self):
+        pass
+
+    def test_seeds_are_distinct_candidates(self):
+        """
+        Every seeder returns p distinct seeds among the candidate areas.
+        """
+        candidates = np.array([True, True, True, True, True, False])
+        for seedSelection, seeder in seedSelectionDispatcher.items():
+            for repetition in range(10):
+                seeds = seeder(self.distance2Area, 3, candidates)
+                self.assertEqual(len(set(seeds)), 3)
+                self.assertFalse(5 in seeds)
+
+    def test_farthest_seeds_cover_clusters(self):
+        """
+        Farthest-first selects one seed in each group of areas.
+        """
+        seeds = seedSelectionDispatcher["farthest"](self.distance2Area, 3,
+                                                    np.ones(6, dtype=bool))
+        groups = set([int(self.data[seed, 0] // 10) for seed in seeds])
+        self.assertEqual(groups, set([0, 1, 2]))
+
+    def test_duplicated_areas_still_give_distinct_seeds(self):
+        """
+        When all the candidates are at distance zero of the seeds, the seeds
+        are drawn among the areas that are not seeds yet.
+        """
+        distance2Area = lambda areaID: np.zeros(4)
+        seeds = seedSelectionDispatcher["kmeans"](distance2Area, 4,
+                                                  np.ones(4, dtype=bool))
+        self.assertEqual(sorted(seeds), [0, 1, 2, 3])